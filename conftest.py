@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# Columns of the season tables stored before the generator's current metrics
+LEGACY_METRICS = ['total_score', 'score_diff', 'closeness', 'lead_changes', 'times_tied', 'largest_lead',
+                  'threes_made', 'three_pt_pct', 'fast_break_pts', 'paint_pts', 'to_pts', 'star', 'steals',
+                  'blocks', 'clutch_ending', 'overtime']
+LEGACY_COMPONENTS = ['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']
+
+
+@pytest.fixture
+def legacy_table():
+    """
+    Builds a season table in the legacy schema, without most of the
+    generator's ranked metrics.
+    """
+    def build(num_games, seed=0, season='2024-25'):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({
+            'game_id': [f"00224{i + 1:05d}" for i in range(num_games)],
+            'game_date': pd.date_range('2024-10-22', periods=num_games, freq='D').strftime('%Y-%m-%d'),
+            'home_team': rng.choice(['BOS', 'NYK', 'LAL'], num_games),
+            'away_team': rng.choice(['MIA', 'DEN', 'PHX'], num_games),
+        })
+        for col in LEGACY_METRICS:
+            df[col] = rng.integers(0, 100, num_games).astype(float)
+        for col in LEGACY_METRICS:
+            df[f'PR_{col}'] = df[col].rank(pct=True)
+        for col in LEGACY_COMPONENTS:
+            df[col] = rng.random(num_games)
+        df['season'] = season
+        return df
+    return build
+
+
+@pytest.fixture
+def ranked_games():
+    """
+    Builds minimal watch index rows for the game store and the pages.
+    """
+    def build(num_games, season='2024-25'):
+        return pd.DataFrame({
+            'game_id': [f"00224{i + 1:05d}" for i in range(num_games)],
+            'season': season,
+            'game_date': pd.date_range('2024-10-22', periods=num_games, freq='D'),
+            'home_team': ['BOS', 'NYK', 'LAL'] * (num_games // 3) + ['BOS'] * (num_games % 3),
+            'away_team': 'MIA',
+            # Ties on purpose, pages still follow one order
+            'WatchIndex': [(i % 7) / 7 for i in range(num_games)],
+        })
+    return build
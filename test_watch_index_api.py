@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from watch_index_api import QueryError, WatchIndexAPI
+from watch_index_data import clear_shared
+from watch_index_store import write_season
+
+
+@pytest.fixture
+def api(tmp_path, legacy_table):
+    root = str(tmp_path / "store")
+    games = legacy_table(30)
+    write_season(games, '2024-25', root)
+    yield WatchIndexAPI(nba_root=root), games
+    clear_shared()
+
+
+def test_game_includes_the_raw_metrics(api):
+    api, games = api
+    game = json.loads(api.game('nba', games['game_id'].iat[3]))
+
+    assert game['game_id'] == int(games['game_id'].iat[3])
+    assert game['lead_changes'] == games['lead_changes'].iat[3]
+    assert game['PR_lead_changes'] == pytest.approx(games['PR_lead_changes'].iat[3])
+    assert game['WatchIndex'] == pytest.approx(games['WatchIndex'].iat[3])
+
+
+def test_limit_keeps_the_top_games(api):
+    api, games = api
+    body = json.loads(api.top_games('nba', {'limit': ['5']}))
+
+    assert body['count'] == len(games)
+    assert len(body['games']) == 5
+    assert [game['game_id'] for game in body['games']] == games.nlargest(5, 'WatchIndex')['game_id'].astype(int).tolist()
+
+
+@pytest.mark.parametrize('limit', ['0', '-3', 'ten'])
+def test_invalid_limit_is_rejected(api, limit):
+    api, _ = api
+    with pytest.raises(QueryError) as error:
+        api.answer('/nba/games', {'limit': [limit]})
+    assert error.value.status == 400
@@ -0,0 +1,68 @@
+import copy
+import json
+
+import pytest
+
+from watch_index_bench import BASELINE_PATH, benchmark, compare
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def slowed(results, factor, stage=None):
+    """
+    Copy of results with one stage (every stage when None) factor times slower.
+    """
+    results = copy.deepcopy(results)
+    for result in results.values():
+        for name, stats in result['stages'].items():
+            if stage is None or name == stage:
+                for key in stats:
+                    stats[key] *= factor
+        if stage is None:
+            result['games_per_second'] /= factor
+    return results
+
+
+def test_baseline_does_not_regress_against_itself(baseline):
+    assert compare(baseline['results'], baseline) == []
+
+
+def test_slower_stage_is_flagged(baseline):
+    regressions = compare(slowed(baseline['results'], 2, 'score'), baseline)
+
+    assert len(regressions) == len(baseline['results'])
+    assert all(', score: p50' in message for message in regressions)
+
+
+def test_slower_run_is_flagged(baseline):
+    regressions = compare(slowed({'1230': baseline['results']['1230']}, 1.5), baseline)
+
+    assert any('games/s' in message for message in regressions)
+    assert any('dashboard_load' in message for message in regressions)
+    # Within the tolerance nothing is flagged
+    assert compare(slowed(baseline['results'], 1.2), baseline) == []
+
+
+def test_noise_under_the_floor_is_ignored(baseline):
+    # fetch at 100 games is under a millisecond, doubling it stays below floor_ms
+    regressions = compare(slowed({'100': baseline['results']['100']}, 2, 'fetch'), baseline)
+    assert regressions == []
+
+
+def test_more_memory_is_flagged(baseline):
+    results = copy.deepcopy(baseline['results'])
+    results['100']['peak_memory_mb'] *= 2
+    assert compare(results, baseline) == [f"100 games: peak {results['100']['peak_memory_mb']:.1f} MB vs "
+                                          f"{baseline['results']['100']['peak_memory_mb']:.1f} MB"]
+
+
+def test_benchmark_results_match_the_baseline_layout(baseline):
+    result = benchmark(100, repeats=1)
+
+    assert set(result['stages']) == set(baseline['results']['100']['stages'])
+    assert compare({'100': result}, baseline, tolerance=float('inf')) == []
+    assert compare(slowed({'100': result}, 1e3, 'score'), baseline)
@@ -0,0 +1,36 @@
+import pytest
+
+import watch_index_data as data
+from watch_index_bench import synthetic_endpoints
+from watch_index_data import build_compact_nba, default_memory, stored_default_memory
+from watch_index_generation import compute_watch_index, score_games
+from watch_index_store import read_watch_index, write_season
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("store"))
+    game_ids, endpoints = synthetic_endpoints(40)
+    watch_df = compute_watch_index(score_games(game_ids, endpoints=endpoints).assign(season='2015-16'))
+    write_season(watch_df, '2015-16', root)
+    return root
+
+
+def test_compact_load_reads_only_the_view(store, monkeypatch):
+    reads = []
+
+    def read(root, columns=None, **filters):
+        reads.append(columns)
+        return read_watch_index(root, columns=columns, **filters)
+    monkeypatch.setattr(data, 'read_watch_index', read)
+
+    view = build_compact_nba(store)
+    assert reads and all(columns is not None for columns in reads)
+    assert 'star_player' not in view.columns and 'total_score' not in view.columns
+
+
+def test_memory_estimate_matches_the_full_table(store):
+    full = default_memory(read_watch_index(store))
+    view = read_watch_index(store, columns=['game_id', 'season', 'home_team', 'away_team', 'WatchIndex'])
+
+    assert stored_default_memory(store, view) == pytest.approx(full, rel=0.1)
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from watch_index_data import nba_game_store_matches
+from watch_index_db import count_games, matches_table, top_games, upsert_games
+
+
+def test_upsert_replaces_games(tmp_path, ranked_games):
+    path = str(tmp_path / "games.db")
+    upsert_games(ranked_games(30), path)
+    upsert_games(ranked_games(30).assign(WatchIndex=0.5).head(3), path)
+
+    assert count_games(path) == 30
+    assert (top_games(path).set_index('game_id').loc[ranked_games(3)['game_id'], 'WatchIndex'] == 0.5).all()
+
+
+def test_pages_cover_the_ranking(tmp_path, ranked_games):
+    path = str(tmp_path / "games.db")
+    upsert_games(ranked_games(30), path)
+
+    ranked = top_games(path, teams=['BOS'], columns=['game_id', 'WatchIndex'])
+    pages = [top_games(path, n=4, offset=offset, teams=['BOS'], columns=['game_id', 'WatchIndex'])
+             for offset in range(0, len(ranked), 4)]
+
+    assert len(ranked) == count_games(path, teams=['BOS']) == 10
+    assert ranked['WatchIndex'].is_monotonic_decreasing
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), ranked)
+    assert len(top_games(path, offset=28)) == 2
+
+
+def test_missing_store_is_empty(tmp_path):
+    path = str(tmp_path / "missing.db")
+    assert count_games(path) == 0
+    assert list(top_games(path, columns=['game_id']).columns) == ['game_id']
+
+
+def test_store_matches_its_table(tmp_path, ranked_games):
+    path = str(tmp_path / "games.db")
+    table = ranked_games(30)
+    upsert_games(table, path)
+    assert matches_table(table, path)
+
+    # A season rewritten in Parquet whose upsert failed
+    assert not matches_table(table.assign(WatchIndex=table['WatchIndex'] + 0.1), path)
+    assert not matches_table(pd.concat([table, ranked_games(31).tail(1)]), path)
+    assert not matches_table(table.head(29), path)
+    assert not matches_table(table, str(tmp_path / "missing.db"))
+
+
+def test_committed_stores_agree():
+    assert nba_game_store_matches()
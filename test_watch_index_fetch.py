@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from watch_index_fetch import RateLimiter, fetch_game, fetch_games
+
+
+def stub_endpoints(calls=None, delay=0.0, fail=()):
+    """
+    Endpoints returning one small frame per game, after a random delay of up
+    to delay seconds, failing for the game ids in fail.
+    """
+    lock = threading.Lock()
+
+    def endpoint(name):
+        def call(game_id):
+            with lock:
+                if calls is not None:
+                    calls.append((time.monotonic(), name, game_id))
+            time.sleep(random.uniform(0, delay))
+            if game_id in fail:
+                raise ValueError(f"no data for {game_id}")
+            return [pd.DataFrame({'GAME_ID': [game_id], 'ENDPOINT': [name]})]
+        return call
+
+    return {name: endpoint(name) for name in ['BoxScoreSummaryV2', 'PlayByPlayV2']}
+
+
+def as_records(results):
+    return [(game_id, None if frames is None else {name: frame[0].to_dict('records') for name, frame in frames.items()},
+             None if error is None else str(error))
+            for game_id, frames, error in results]
+
+
+def test_fetch_game_returns_every_endpoint():
+    frames = fetch_game('0022400001', endpoints=stub_endpoints())
+    assert list(frames) == ['BoxScoreSummaryV2', 'PlayByPlayV2']
+    assert frames['PlayByPlayV2'][0]['GAME_ID'].tolist() == ['0022400001']
+
+
+def test_concurrent_fetch_keeps_game_order_and_results():
+    game_ids = [f"00224{i:05d}" for i in range(40)]
+    fail = {game_ids[3], game_ids[17]}
+
+    serial = as_records(fetch_games(game_ids, endpoints=stub_endpoints(fail=fail), max_workers=1))
+    concurrent = as_records(fetch_games(game_ids, endpoints=stub_endpoints(delay=0.005, fail=fail), max_workers=8))
+
+    assert [game_id for game_id, _, _ in concurrent] == game_ids
+    assert concurrent == serial
+    assert [game_id for game_id, frames, _ in concurrent if frames is None] == [game_ids[3], game_ids[17]]
+
+
+def test_rate_limiter_paces_requests():
+    calls = []
+    rate = 100.0
+    game_ids = [f"00224{i:05d}" for i in range(20)]
+    limiter = RateLimiter(rate=rate, burst=1)
+
+    list(fetch_games(game_ids, endpoints=stub_endpoints(calls), rate_limiter=limiter, max_workers=4))
+
+    # 40 requests through a bucket of one token refilled 100 times a second
+    times = sorted(t for t, _, _ in calls)
+    assert len(times) == 40
+    assert times[-1] - times[0] >= 0.9 * (len(times) - 1) / rate
+
+
+def test_rate_limiter_allows_burst():
+    limiter = RateLimiter(rate=1.0, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+def test_rate_limiter_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import watch_index_generation as generation
+from watch_index_bench import synthetic_endpoints
+from watch_index_checkpoint import CheckpointLog
+from watch_index_generation import (COMPONENT_COLUMNS, RANK_COLUMNS, compute_watch_index, load_season_table,
+                                    merge_season_records, new_ranker, process_single_season, rankable,
+                                    refresh_watch_index, save_season, score_games, score_games_tiered,
+                                    update_watch_index)
+from watch_index_ranking import PercentileRanker
+
+
+SEASON = '2024-25'
+
+
+@pytest.fixture(scope='module')
+def synthetic_games():
+    game_ids, endpoints = synthetic_endpoints(12)
+    return game_ids, endpoints, score_games(game_ids, endpoints=endpoints)
+
+
+def test_legacy_rows_are_not_rankable(synthetic_games, legacy_table):
+    _, _, new_df = synthetic_games
+    assert not rankable(legacy_table(5)).any()
+    assert rankable(new_df).all()
+
+
+def test_update_keeps_legacy_scores(synthetic_games, legacy_table):
+    _, _, new_df = synthetic_games
+    stored = legacy_table(40)
+
+    merged, changed = update_watch_index(stored, new_df.assign(season=SEASON), new_ranker(), tolerance=0)
+
+    assert len(merged) == len(stored) + len(new_df)
+    assert merged['WatchIndex'].notna().all()
+    assert sorted(changed) == sorted(new_df['game_id'])
+
+    legacy = merged.set_index('game_id').loc[stored['game_id']]
+    for col in [col for col in stored.columns if col.startswith('PR_') or col in COMPONENT_COLUMNS]:
+        np.testing.assert_allclose(legacy[col].to_numpy(dtype=float), stored[col].to_numpy(dtype=float))
+
+
+def test_refresh_over_legacy_store(tmp_path, monkeypatch, synthetic_games, legacy_table):
+    game_ids, endpoints, _ = synthetic_games
+    stored = legacy_table(40)
+    save_season(stored, SEASON, str(tmp_path))
+
+    games_df = pd.DataFrame({'GAME_ID': list(stored['game_id']) + game_ids})
+    monkeypatch.setattr(generation, 'get_game_log', lambda season, cache=None: games_df)
+
+    merged = refresh_watch_index(SEASON, checkpoint_dir=str(tmp_path), endpoints=endpoints, max_workers=1)
+    assert len(merged) == len(stored) + len(game_ids)
+    assert merged['WatchIndex'].notna().all()
+
+    # The store holds the same scores, legacy rows unchanged
+    reloaded = load_season_table(SEASON, str(tmp_path)).set_index('game_id')
+    assert reloaded['WatchIndex'].notna().all()
+    np.testing.assert_allclose(reloaded.loc[stored['game_id'], 'WatchIndex'].to_numpy(dtype=float),
+                               stored['WatchIndex'].to_numpy(dtype=float), rtol=1e-6)
+    assert reloaded.loc[game_ids, [f'PR_{col}' for col in RANK_COLUMNS]].notna().all().all()
+
+
+def test_merge_logged_records_into_legacy_table(tmp_path, synthetic_games, legacy_table):
+    _, _, new_df = synthetic_games
+    stored = legacy_table(40)
+
+    season_df, ranker = merge_season_records(SEASON, stored, new_df.assign(season=SEASON), str(tmp_path))
+
+    assert len(season_df) == len(stored) + len(new_df)
+    assert season_df['WatchIndex'].notna().all()
+    legacy = season_df.set_index('game_id').loc[stored['game_id']]
+    np.testing.assert_allclose(legacy['WatchIndex'].to_numpy(dtype=float), stored['WatchIndex'].to_numpy(dtype=float))
+    assert all(game_id in ranker for game_id in new_df['game_id'])
+
+
+def test_log_is_kept_until_the_ranker_is_saved(tmp_path, monkeypatch, synthetic_games):
+    game_ids, endpoints, _ = synthetic_games
+    monkeypatch.setattr(generation, 'get_game_log', lambda season, cache=None: pd.DataFrame({'GAME_ID': game_ids}))
+    log_path = tmp_path / f"records{SEASON}.jsonl"
+
+    def crash(self, path):
+        raise OSError("disk full")
+    with monkeypatch.context() as patch:
+        patch.setattr(PercentileRanker, 'save', crash)
+        with pytest.raises(OSError):
+            process_single_season(SEASON, checkpoint_dir=str(tmp_path), endpoints=endpoints, max_workers=1)
+    assert len(CheckpointLog(str(log_path)).replay()) == len(game_ids)
+
+    # The rerun finds every game in the log and finishes the compaction
+    season_df = process_single_season(SEASON, checkpoint_dir=str(tmp_path), endpoints=endpoints, max_workers=1)
+    assert sorted(season_df['game_id']) == sorted(game_ids)
+    assert (tmp_path / f"ranks{SEASON}.npz").exists()
+    assert len(CheckpointLog(str(log_path)).replay()) == 0
+
+
+def test_stored_table_reranks_like_a_fresh_run(tmp_path, synthetic_games):
+    _, _, new_df = synthetic_games
+    fresh = compute_watch_index(new_df.assign(season=SEASON))
+    save_season(fresh, SEASON, str(tmp_path))
+
+    # The ranked metrics come back exactly, so re-ranking without a ranks file matches
+    stored = load_season_table(SEASON, str(tmp_path))
+    for col in RANK_COLUMNS:
+        np.testing.assert_array_equal(stored[col].to_numpy(dtype=float), fresh[col].to_numpy(dtype=float))
+
+    season_df, _ = merge_season_records(SEASON, stored, pd.DataFrame(), str(tmp_path))
+    season_df = season_df.set_index('game_id').loc[fresh['game_id']]
+    for col in [f'PR_{col}' for col in RANK_COLUMNS] + ['WatchIndex']:
+        np.testing.assert_array_equal(season_df[col].to_numpy(dtype=float), fresh[col].to_numpy(dtype=float))
+
+
+def synthetic_game_log(game_ids, endpoints):
+    """
+    LeagueGameLog rows (one per team per game) of synthetic games.
+    """
+    rows = []
+    for game_id in game_ids:
+        game_info, line_score = endpoints['BoxScoreSummaryV2'](game_id)
+        totals = endpoints['BoxScoreTraditionalV2'](game_id)[0].groupby('TEAM_ID').sum(numeric_only=True)
+        home_id = game_info['HOME_TEAM_ID'].iat[0]
+        teams = dict(zip(line_score['TEAM_ID'], line_score['TEAM_ABBREVIATION']))
+        minutes = 265 if game_info['GAME_STATUS_TEXT'].iat[0].startswith('Final/OT') else 240
+        for team_id, points in zip(line_score['TEAM_ID'], line_score['PTS']):
+            opponent = [team for other, team in teams.items() if other != team_id][0]
+            rows.append({
+                'GAME_ID': game_id, 'GAME_DATE': game_info['GAME_DATE_EST'].iat[0][:10], 'TEAM_ID': team_id,
+                'TEAM_ABBREVIATION': teams[team_id], 'PTS': points, 'MIN': minutes,
+                'MATCHUP': f"{teams[team_id]} vs. {opponent}" if team_id == home_id else f"{teams[team_id]} @ {opponent}",
+                'FG3M': totals.at[team_id, 'FG3M'], 'FG3A': totals.at[team_id, 'FG3A'], 'BLK': totals.at[team_id, 'BLK'],
+                'TOV': totals.at[team_id, 'TO'], 'STL': totals.at[team_id, 'STL'], 'FTA': totals.at[team_id, 'FTA'],
+            })
+    return pd.DataFrame(rows)
+
+
+def test_tiered_scoring_stores_the_same_dates(synthetic_games):
+    game_ids, endpoints, new_df = synthetic_games
+    games_df = synthetic_game_log(game_ids, endpoints)
+
+    tiered = score_games_tiered(games_df, endpoints=endpoints).set_index('game_id').loc[new_df['game_id']]
+    provisional = score_games_tiered(games_df, tier2_quantile=1.0, endpoints=endpoints).set_index('game_id')
+
+    assert tiered['game_date'].tolist() == new_df['game_date'].tolist()
+    assert provisional.loc[new_df['game_id'], 'game_date'].tolist() == new_df['game_date'].tolist()
+    assert (provisional['tier'] == 1).any()
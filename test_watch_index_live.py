@@ -0,0 +1,105 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from watch_index_bench import synthetic_game
+from watch_index_cache import ResponseCache
+from watch_index_generation import compute_pbp_metrics
+from watch_index_live import LiveGame, LiveSlate, replay_events, run_live
+
+
+PBP_METRICS = ['lead_changes', 'times_tied', 'largest_lead', 'clutch_time', 'dunks']
+
+
+@pytest.fixture(scope='module')
+def games():
+    return dict(synthetic_game(index) for index in range(4))
+
+
+def events(frames):
+    return frames['PlayByPlayV2'][0].to_dict('records')
+
+
+def test_live_game_matches_the_batch_kernel(games):
+    for game_id, frames in games.items():
+        game = LiveGame(game_id)
+        for event in events(frames):
+            assert game.apply(event)
+
+        expected = compute_pbp_metrics(frames['PlayByPlayV2'][0]).loc[game_id]
+        metrics = game.metrics()
+        for col in PBP_METRICS:
+            assert metrics[col] == pytest.approx(expected[col]), col
+
+
+def test_repeated_events_are_skipped(games):
+    game_id, frames = next(iter(games.items()))
+    plays = events(frames)
+    once, twice = LiveGame(game_id), LiveGame(game_id)
+    for event in plays:
+        once.apply(event)
+
+    # Overlapping polls: every round returns the whole play-by-play so far
+    for end in range(50, len(plays) + 50, 50):
+        applied = [twice.apply(event) for event in plays[:end]]
+        assert sum(applied) == len(plays[end - 50:end])
+    assert twice.metrics() == once.metrics()
+
+
+def test_late_events_are_applied(games):
+    game_id, frames = next(iter(games.items()))
+    plays = events(frames)
+    game = LiveGame(game_id)
+
+    # A corrected play inserted behind later ones still counts
+    late = [play for play in plays if 'dunk' in str(play['HOMEDESCRIPTION']).lower()][0]
+    for event in plays:
+        if event is not late:
+            game.apply(event)
+    dunks = game.metrics()['dunks']
+    assert game.apply(late)
+    assert game.metrics()['dunks'] == dunks + 1
+    assert not game.apply(late)
+
+
+def test_slate_snapshot_ranks_every_game(games):
+    slate = LiveSlate(teams={game_id: ('BOS', 'NYK') for game_id in games})
+    for game_id, frames in games.items():
+        for event in events(frames)[:200]:
+            slate.apply(game_id, event)
+
+    snapshot = slate.snapshot()
+    assert sorted(snapshot['game_id']) == sorted(games)
+    assert snapshot['WatchIndex'].notna().all()
+    assert snapshot['WatchIndex'].is_monotonic_decreasing
+    assert (snapshot['home_team'] == 'BOS').all()
+    assert (snapshot['period'] < 4).all()
+
+
+def test_run_live_publishes_on_interval(games):
+    game_id, frames = next(iter(games.items()))
+    stream = [(game_id, event) for event in events(frames)[:10]] + [(None, None)]
+    ticks = itertools.count()
+    published = []
+
+    slate = run_live(stream, published.append, interval=3, clock=lambda: next(ticks))
+
+    # Every third event plus the final snapshot
+    assert len(published) == 4
+    assert slate.games[game_id].events == 10
+
+
+def test_replay_skips_uncached_games(games, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cached_ids = list(games)[:2]
+    for game_id in cached_ids:
+        cache.put('PlayByPlayV2', {'game_id': game_id}, games[game_id]['PlayByPlayV2'])
+
+    offline = ResponseCache(str(tmp_path), offline=True)
+    replayed = list(replay_events(cached_ids + ['0029999999'], offline, speed=None))
+
+    assert {game_id for game_id, _ in replayed} == set(cached_ids)
+    assert len(replayed) == sum(len(games[game_id]['PlayByPlayV2'][0]) for game_id in cached_ids)
+    elapsed = pd.Series([event['ELAPSED'] for _, event in replayed])
+    assert elapsed.is_monotonic_increasing
@@ -0,0 +1,52 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from watch_index_db import top_games, upsert_games
+from watch_index_pages import export_file, query_chunks, query_page, table_chunks, table_page
+
+
+COLUMNS = ['game_id', 'home_team', 'WatchIndex']
+
+
+def test_query_pages_follow_the_store_ranking(tmp_path, ranked_games):
+    path = str(tmp_path / "games.db")
+    upsert_games(ranked_games(30), path)
+    query = partial(top_games, path, columns=COLUMNS)
+    ranked = query()
+
+    page = query_page(query, page=2, page_size=10, percent_columns=['WatchIndex'])
+    assert page['game_id'].tolist() == ranked['game_id'].iloc[10:20].tolist()
+    assert page['WatchIndex'].tolist() == round(ranked['WatchIndex'].iloc[10:20] * 100, 2).tolist()
+
+    chunks = list(query_chunks(query, chunk_size=8))
+    assert [len(chunk) for chunk in chunks] == [8, 8, 8, 6]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), ranked)
+
+    # A result that fills its last chunk exactly adds no empty chunk
+    assert [len(chunk) for chunk in query_chunks(query, chunk_size=10)] == [10, 10, 10]
+
+
+def test_empty_exports_keep_their_columns(ranked_games):
+    view = ranked_games(6).assign(game_date=lambda df: pd.to_datetime(df['game_date']))
+    columns = ['game_id', 'game_date', 'WatchIndex']
+    chunks = partial(table_chunks, view, [], columns, percent_columns=['WatchIndex'], date_columns=['game_date'])
+
+    assert table_page(view, [], columns).columns.tolist() == columns
+    assert export_file(chunks(), 'csv').read().decode().strip() == ','.join(columns)
+    exported = pq.read_table(export_file(chunks(), 'parquet'))
+    assert exported.num_rows == 0 and exported.column_names == columns
+
+
+def test_export_round_trips_in_chunks(ranked_games):
+    view = ranked_games(30).assign(game_date=lambda df: pd.to_datetime(df['game_date']))
+    rows = np.argsort(-view['WatchIndex'].to_numpy(), kind='stable')
+    columns = ['game_id', 'game_date', 'WatchIndex']
+    chunks = partial(table_chunks, view, rows, columns, chunk_size=7, date_columns=['game_date'])
+
+    expected = pd.concat(chunks(), ignore_index=True)
+    assert len(expected) == 30
+    pd.testing.assert_frame_equal(pd.read_csv(export_file(chunks(), 'csv'), dtype={'game_id': str}), expected, check_dtype=False)
+    pd.testing.assert_frame_equal(pd.read_parquet(export_file(chunks(), 'parquet')), expected, check_dtype=False)
@@ -0,0 +1,46 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import watch_index_generation as generation
+from watch_index_bench import synthetic_endpoints
+from watch_index_predict import FEATURE_COLUMNS, MODEL_PATH, WatchPredictor
+from watch_index_store import read_watch_index
+
+
+@pytest.fixture(scope='module')
+def stored():
+    return read_watch_index()
+
+
+def test_shipped_model_uses_generator_features():
+    predictor = WatchPredictor.load(MODEL_PATH)
+    assert set(predictor.feature_columns) <= set(FEATURE_COLUMNS)
+    assert set(predictor.feature_columns) <= set(generation.METRIC_COLUMNS + generation.COMPONENT_COLUMNS)
+
+
+def test_refresh_new_season_against_shipped_model(tmp_path, monkeypatch):
+    shutil.copy(MODEL_PATH, tmp_path)
+    game_ids, endpoints = synthetic_endpoints(12)
+    monkeypatch.setattr(generation, 'get_game_log', lambda season, cache=None: pd.DataFrame({'GAME_ID': game_ids}))
+
+    generation.refresh_watch_index('2026-27', checkpoint_dir=str(tmp_path), endpoints=endpoints, max_workers=1)
+
+    predictor = WatchPredictor.load(str(tmp_path / "watch_predictor.npz"))
+    assert set(game_ids) <= predictor.game_ids
+
+
+def test_missing_features_leave_the_team_means(stored):
+    # A model of an older schema keeps working on tables without its columns
+    predictor = WatchPredictor(['total_score', 'star'], ['WatchIndex']).fit(stored)
+    means = predictor.means.copy()
+    row = predictor.teams['BOS']
+
+    game = stored[stored['home_team'] == 'BOS'].head(1).assign(game_id='0022699999').drop(columns=['star'])
+    predictor.update(game)
+
+    assert predictor.means[row, 1] == means[row, 1]
+    assert predictor.means[row, 0] != means[row, 0]
+    assert np.isfinite(predictor.predict(['BOS'], ['NYK']).to_numpy()).all()
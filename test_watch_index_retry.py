@@ -0,0 +1,108 @@
+import random
+import threading
+
+import pandas as pd
+import pytest
+
+from watch_index_bench import synthetic_endpoints
+from watch_index_generation import score_games
+from watch_index_retry import AdaptiveRateLimiter, BackoffPolicy, DeadLetterQueue, is_throttle
+
+
+class Throttled(Exception):
+    """Stand-in for an HTTP error with a 503 response."""
+
+    class response:
+        status_code = 503
+
+
+def faulty_endpoints(endpoints, failure_rate=0.3, seed=0, broken=()):
+    """
+    Wrap endpoints to fail a share of their calls with the errors a
+    throttled upstream answers with, and to always fail the games in broken.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    faults = [TimeoutError("read timed out"), ConnectionError("connection reset"), Throttled("503")]
+
+    def wrap(call):
+        def faulty(game_id):
+            if game_id in broken:
+                raise Throttled("503")
+            with lock:
+                fault = rng.choice(faults) if rng.random() < failure_rate else None
+            if fault is not None:
+                raise fault
+            return call(game_id)
+        return faulty
+
+    return {name: wrap(call) for name, call in endpoints.items()}
+
+
+def fast_retry():
+    return BackoffPolicy(max_attempts=8, base_delay=0.001, max_delay=0.005, rng=random.Random(0))
+
+
+@pytest.fixture(scope='module')
+def games():
+    return synthetic_endpoints(20)
+
+
+def test_faults_do_not_change_the_results(games):
+    game_ids, endpoints = games
+    clean = score_games(game_ids, endpoints=endpoints)
+
+    dead_letter = DeadLetterQueue()
+    faulty = score_games(game_ids, endpoints=faulty_endpoints(endpoints), max_workers=4, requests_per_second=1e4,
+                         retry=fast_retry(), dead_letter=dead_letter)
+
+    pd.testing.assert_frame_equal(faulty, clean)
+    assert len(dead_letter) == 0
+
+
+def test_games_that_keep_failing_are_queued(games, tmp_path):
+    game_ids, endpoints = games
+    broken = {game_ids[2], game_ids[11]}
+    path = str(tmp_path / "failed_games.json")
+
+    df = score_games(game_ids, endpoints=faulty_endpoints(endpoints, failure_rate=0, broken=broken),
+                     requests_per_second=1e4, retry=fast_retry(), dead_letter=DeadLetterQueue(path))
+
+    assert sorted(df['game_id']) == sorted(set(game_ids) - broken)
+    dead_letter = DeadLetterQueue(path)
+    assert set(dead_letter.ids()) == broken
+    # Fetched twice: once in order, once requeued at the end
+    assert all(dead_letter.entries[game_id]['attempts'] == 2 for game_id in broken)
+
+
+def test_games_that_fail_scoring_are_queued(games, tmp_path):
+    game_ids, endpoints = games
+    unscoreable = game_ids[5]
+
+    def no_advanced_stats(game_id):
+        frames = endpoints['BoxScoreAdvancedV2'](game_id)
+        return [frames[0].drop(columns=['TS_PCT'])] if game_id == unscoreable else frames
+    path = str(tmp_path / "failed_games.json")
+
+    df = score_games(game_ids, endpoints={**endpoints, 'BoxScoreAdvancedV2': no_advanced_stats},
+                     dead_letter=DeadLetterQueue(path), requeue=False)
+
+    assert unscoreable not in set(df['game_id'])
+    dead_letter = DeadLetterQueue(path)
+    assert dead_letter.ids() == [unscoreable]
+    assert 'TS_PCT' in dead_letter.entries[unscoreable]['error']
+
+    # Scoring it later takes it off the queue
+    score_games([unscoreable], endpoints=endpoints, dead_letter=dead_letter)
+    assert len(DeadLetterQueue(path)) == 0
+
+
+def test_adaptive_limiter_backs_off_on_throttling():
+    limiter = AdaptiveRateLimiter(rate=8.0, cooldown=0)
+    limiter.record(0.1)
+    assert limiter.rate > 8.0
+    rate = limiter.rate
+    limiter.record(0.1, Throttled("503"))
+    assert limiter.rate == pytest.approx(rate / 2)
+    assert not limiter.slow_start
+    assert is_throttle(TimeoutError()) and not is_throttle(KeyError('GAME_ID'))
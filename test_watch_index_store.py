@@ -0,0 +1,18 @@
+import glob
+import os
+
+import pyarrow.parquet as pq
+
+from watch_index_store import STORE_DIR, column_type, read_watch_index
+
+
+def test_committed_partitions_use_the_store_schema():
+    partitions = sorted(glob.glob(os.path.join(STORE_DIR, "season=*", "part-0.parquet")))
+    assert partitions
+
+    df = read_watch_index()
+    schemas = [pq.read_schema(path) for path in partitions]
+    for schema in schemas:
+        assert schema == schemas[0]
+        for field in schema:
+            assert field.type == column_type(field.name, df[field.name]), field.name
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from watch_index_bench import synthetic_endpoints
+from watch_index_data import nba_watch_index
+from watch_index_generation import compute_watch_index, score_games
+from watch_index_weights import COMPONENT_WEIGHTS, WEIGHT_PROFILES, WeightEngine
+
+
+def scored_table(num_games=12):
+    game_ids, endpoints = synthetic_endpoints(num_games)
+    return compute_watch_index(score_games(game_ids, endpoints=endpoints).assign(season='2015-16'))
+
+
+def test_default_weights_reproduce_the_stored_index():
+    df = scored_table()
+    engine = WeightEngine(df)
+
+    assert engine.complete and engine.missing == {}
+    assert list(engine.components) == list(COMPONENT_WEIGHTS)
+    np.testing.assert_allclose(engine.scores(), df['WatchIndex'].to_numpy(dtype=float), rtol=1e-5)
+    rows, _ = engine.ranked()
+    np.testing.assert_array_equal(rows, np.argsort(-df['WatchIndex'].to_numpy(dtype=float), kind='stable'))
+
+
+def test_profiles_only_weigh_the_components():
+    df = scored_table()
+    engine = WeightEngine(df)
+    weights = WEIGHT_PROFILES['Close games only']
+    np.testing.assert_allclose(engine.scores(weights), df['Competitiveness'].to_numpy(dtype=float), rtol=1e-5)
+
+
+def test_legacy_tables_reweight_the_stored_components(legacy_table):
+    df = legacy_table(20)
+    engine = WeightEngine(df)
+
+    assert not engine.complete
+    assert set(engine.missing) == set(COMPONENT_WEIGHTS)
+    assert list(engine.components) == ['Scoring', 'Competitiveness', 'Highlights']
+    np.testing.assert_allclose(engine.scores({'Highlights': 1}), df['Highlights'].to_numpy(dtype=float), rtol=1e-6)
+
+
+def test_committed_store_is_reweighted():
+    df = nba_watch_index()
+    engine = WeightEngine(df)
+    stored = df['WatchIndex'].to_numpy(dtype=float)
+
+    # The stored index is recovered from the stored components, and every profile ranks all games
+    assert list(engine.components) == ['Scoring', 'Competitiveness', 'Highlights']
+    np.testing.assert_allclose(engine.scores(), stored, atol=1e-6)
+    for weights in WEIGHT_PROFILES.values():
+        rows, scores = engine.ranked(weights)
+        assert sorted(rows) == list(range(len(df)))
+        assert np.isfinite(scores).all()
+    rows, _ = engine.ranked(WEIGHT_PROFILES['Close games only'])
+    assert df['Competitiveness'].take(rows).is_monotonic_decreasing
+
+
+def test_dashboard_offers_the_profiles():
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "watch_index_streamlit.py"),
+                            default_timeout=120).run()
+    profile = [box for box in app.selectbox if box.label == "Select a weighting profile"][0]
+
+    profile.set_value('Custom').run()
+    assert not app.exception
+    assert [slider.value for slider in app.slider] == [1.5, 3.5, 1.0]
+
+
+def test_tables_mixing_schemas_are_not_reweighted():
+    df = scored_table()
+    mixed = df.reindex(list(df.index) + [len(df)])
+    assert not WeightEngine(mixed).complete
@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from watch_index_data import (file_signature, nba_filter_index, nba_raw_columns, nba_watch_index, nfl_filter_index,
+                              nfl_raw_columns, nfl_watch_index)
+from watch_index_store import STORE_DIR, stored_columns
+
+
+# Columns returned for a list of games, and the extra ones of a single game's breakdown
+NFL_COLUMNS = ['game_id', 'season', 'week', 'playoff', 'home_team', 'away_team', 'player.x', 'player.y',
+               'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']
+NFL_BREAKDOWN = ['Closeness', 'Excitement']
+NBA_COLUMNS = ['game_id', 'season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness',
+               'Highlights', 'Pace', 'StarPower', 'WatchIndex']
+
+DEFAULT_LIMIT = 25
+
+
+class QueryError(Exception):
+    """Raised on a request the API cannot answer (carries the HTTP status)."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _values(params, name):
+    # Repeated and comma separated values both work: ?team=BOS&team=NYK or ?team=BOS,NYK
+    return [value for raw in params.get(name, []) for value in raw.split(',') if value != '']
+
+
+def _number(params, name, cast, default=None):
+    values = _values(params, name)
+    if not values:
+        return default
+    try:
+        return cast(values[-1])
+    except ValueError:
+        raise QueryError(400, f"{name} must be a number")
+
+
+def _to_json(df):
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%d')
+    return df.to_json(orient='records', double_precision=6)
+
+
+class WatchIndexAPI:
+    """
+    Read-only queries over the NFL and NBA watch index tables.
+
+    Tables come from the same shared loaders as the dashboard, so they are
+    reloaded when their files change. Answers are kept in an LRU cache keyed
+    on the normalized query (path and sorted parameters) and on the
+    mtime/size signature of the data files, so a changed file never serves
+    a stale answer.
+
+    Parameters:
+    ----------
+    nfl_path : str
+        RDS file with the NFL watch index
+    nba_root : str
+        Parquet store with the NBA watch index
+    cache_size : int
+        Answers kept in the LRU cache
+    """
+
+    def __init__(self, nfl_path='WatchData.rds', nba_root=STORE_DIR, cache_size=1024):
+        self.nfl_path = nfl_path
+        self.nba_root = nba_root
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, sport):
+        if sport == 'nfl':
+            return [self.nfl_path]
+        if sport == 'nba':
+            return [self.nba_root]
+        raise QueryError(404, f"unknown sport '{sport}', use nfl or nba")
+
+    def _nfl_rows(self, params):
+        index = nfl_filter_index(self.nfl_path)
+        filters = []
+        seasons = _values(params, 'season')
+        if seasons:
+            try:
+                filters.append(index.match('season', [int(season) for season in seasons]))
+            except ValueError:
+                raise QueryError(400, "season must be a year")
+        teams = _values(params, 'team')
+        if teams:
+            filters.append(index.match('team', teams))
+        # Every QB given must be in the matchup
+        for qb in _values(params, 'qb'):
+            filters.append(index.match('qb', [qb]))
+        playoff = (_values(params, 'playoff') or ['yes'])[-1].lower()
+        if playoff == 'only':
+            filters.append(index.match('playoff', [1]))
+        elif playoff == 'no':
+            filters.append(index.match('playoff', [0]))
+        elif playoff != 'yes':
+            raise QueryError(400, "playoff must be yes, only or no")
+        min_war = _number(params, 'min_war', float)
+        if min_war is not None:
+            filters.append(index.at_least('PRWAR', min_war))
+        min_epa = _number(params, 'min_epa', float)
+        if min_epa is not None:
+            filters.append(index.at_least('PREPA', min_epa))
+        return index.rows(*filters)
+
+    def _nba_rows(self, params):
+        index = nba_filter_index(self.nba_root)
+        filters = []
+        seasons = _values(params, 'season')
+        if seasons:
+            filters.append(index.match('season', seasons))
+        teams = _values(params, 'team')
+        if teams:
+            filters.append(index.match('team', teams))
+        try:
+            for name, compare in (('start_date', index.at_least), ('end_date', index.at_most)):
+                dates = _values(params, name)
+                if dates:
+                    filters.append(compare('game_date', dates[-1]))
+        except ValueError:
+            raise QueryError(400, "dates must be YYYY-MM-DD")
+        return index.rows(*filters)
+
+    def _table(self, sport):
+        if sport == 'nfl':
+            df = nfl_watch_index(self.nfl_path)
+            return df, [col for col in NFL_COLUMNS if col in df.columns], self._nfl_rows
+        df = nba_watch_index(self.nba_root)
+        return df, [col for col in NBA_COLUMNS if col in df.columns], self._nba_rows
+
+    def top_games(self, sport, params):
+        """
+        Body of /<sport>/games: matching games ranked by WatchIndex.
+        """
+        df, columns, find_rows = self._table(sport)
+        limit = _number(params, 'limit', int, DEFAULT_LIMIT)
+        if limit < 1:
+            raise QueryError(400, "limit must be at least 1")
+        rows = find_rows(params)
+        count = len(rows)
+        rows = rows[:limit]
+        return f'{{"count": {count}, "games": {_to_json(df[columns].take(rows))}}}'
+
+    def game(self, sport, game_id):
+        """
+        Body of /<sport>/games/<game_id>: one game with its component breakdown and raw metrics.
+        """
+        df, columns, _ = self._table(sport)
+        if sport == 'nba':
+            try:
+                game_id = int(game_id)
+            except ValueError:
+                raise QueryError(404, f"no game {game_id}")
+            columns = columns + [col for col in df.columns if col.startswith('PR_')]
+        matches = np.flatnonzero(df['game_id'].to_numpy() == game_id)
+        if len(matches) == 0:
+            raise QueryError(404, f"no game {game_id}")
+
+        game = df[columns].take(matches[:1])
+        if sport == 'nfl':
+            extra = [col for col in NFL_BREAKDOWN if col not in columns]
+            if extra:
+                game = pd.concat([game, nfl_raw_columns(extra, self.nfl_path).take(matches[:1])], axis=1)
+        else:
+            # The raw metrics behind the PR columns are not in the compact table
+            extra = [col for col in stored_columns(self.nba_root) if col not in df.columns]
+            if extra:
+                game = pd.concat([game, nba_raw_columns(extra, self.nba_root).take(matches[:1])], axis=1)
+        return _to_json(game)[1:-1]
+
+    def random_game(self, sport, params):
+        """
+        Body of /<sport>/random: one game drawn at random among the matches.
+        """
+        df, columns, find_rows = self._table(sport)
+        rows = find_rows(params)
+        if len(rows) == 0:
+            raise QueryError(404, "no game matches the filters")
+        return _to_json(df[columns].take([np.random.choice(rows)]))[1:-1]
+
+    def answer(self, path, params):
+        """
+        Answer a request path and its query parameters.
+
+        Parameters:
+        ----------
+        path : str
+            Request path, e.g. '/nba/games'
+        params : dict
+            Parameter name to list of values, as parsed by parse_qs
+
+        Returns:
+        -------
+        tuple
+            (JSON body, ETag or None when the answer must not be cached)
+        """
+        parts = [part for part in path.split('/') if part]
+        if len(parts) < 2:
+            raise QueryError(404, "use /<sport>/games, /<sport>/games/<game_id> or /<sport>/random")
+        sport = parts[0].lower()
+        paths = self._paths(sport)
+
+        if parts[1:] == ['random']:
+            return self.random_game(sport, params), None
+
+        # Normalized query: sorted names, sorted values, split lists
+        key = (tuple(parts), tuple(sorted((name, tuple(sorted(_values(params, name)))) for name in params)),
+               file_signature(paths))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        if parts[1:] == ['games']:
+            body = self.top_games(sport, params)
+        elif len(parts) == 3 and parts[1] == 'games':
+            body = self.game(sport, parts[2])
+        else:
+            raise QueryError(404, f"unknown endpoint {path}")
+
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest()[:20] + '"'
+        with self._lock:
+            self._cache[key] = (body, etag)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return body, etag
+
+
+class WatchIndexHandler(BaseHTTPRequestHandler):
+    """
+    GET handler of the API, bound to a WatchIndexAPI through the server.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            body, etag = self.server.api.answer(url.path, parse_qs(url.query))
+        except QueryError as e:
+            return self._send(e.status, json.dumps({'error': str(e)}))
+        except Exception as e:
+            return self._send(500, json.dumps({'error': f"{type(e).__name__}: {e}"}))
+
+        if etag is not None and etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if etag is None:
+            self.send_header('Cache-Control', 'no-store')
+        else:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host='127.0.0.1', port=8502, api=None):
+    """
+    Build the threaded API server (call serve_forever on it to run).
+
+    Parameters:
+    ----------
+    host : str
+        Interface to listen on
+    port : int
+        Port to listen on, 0 picks a free one
+    api : WatchIndexAPI, optional
+        Query engine, one over the default data files by default
+
+    Returns:
+    -------
+    ThreadingHTTPServer
+        The bound server
+    """
+    server = ThreadingHTTPServer((host, port), WatchIndexHandler)
+    server.daemon_threads = True
+    server.api = WatchIndexAPI() if api is None else api
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the NFL and NBA watch index")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--nfl-path', default='WatchData.rds')
+    parser.add_argument('--nba-root', default=STORE_DIR)
+    parser.add_argument('--cache-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, WatchIndexAPI(args.nfl_path, args.nba_root, args.cache_size))
+    print(f"Serving the watch index on http://{args.host}:{server.server_address[1]}")
+    server.serve_forever()
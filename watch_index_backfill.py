@@ -0,0 +1,269 @@
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from watch_index_cache import ResponseCache
+from watch_index_checkpoint import CheckpointLog
+from watch_index_fetch import SharedRateLimiter
+from watch_index_generation import (current_season, get_game_log, load_season_table, merge_season_records,
+                                    normalize_game_ids, save_season, score_games, store_dir)
+from watch_index_metrics import METRICS, instrumented
+from watch_index_retry import DeadLetterQueue
+
+
+# Set in every worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(rate_limiter, endpoints, cache, metrics=None):
+    _worker['rate_limiter'] = rate_limiter
+    _worker['endpoints'] = endpoints
+    _worker['cache'] = cache
+
+    # Instrument the worker like the parent, its totals go back with each shard
+    METRICS.disable()
+    METRICS.reset()
+    if metrics is not None:
+        METRICS.enable(metrics['log_path'])
+
+
+def _shard_paths(shard_dir, season, shard):
+    return (os.path.join(shard_dir, f"records{season}.shard{shard}.jsonl"),
+            os.path.join(shard_dir, f"failed_games{season}.shard{shard}.json"))
+
+
+def score_shard(season, shard, game_ids, shard_dir, max_workers=4, batch_size=25):
+    """
+    Score one shard of a season's games in a worker process.
+
+    Records are appended to the shard's own checkpoint log and failures to
+    its own dead letter queue, so shards never write to the same file.
+
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY'
+    shard : int
+        Shard number within the season
+    game_ids : list
+        Games of the shard still to score
+    shard_dir : str
+        Directory holding the per-shard outputs
+    max_workers : int
+        Number of games fetched concurrently by this worker
+    batch_size : int
+        Games scored and logged together
+
+    Returns:
+    -------
+    tuple
+        (season, shard, number of games logged, METRICS snapshot of the shard)
+    """
+    log_path, dead_letter_path = _shard_paths(shard_dir, season, shard)
+    log = CheckpointLog(log_path)
+    dead_letter = DeadLetterQueue(dead_letter_path)
+
+    logged = 0
+    for start in range(0, len(game_ids), batch_size):
+        batch = game_ids[start:start + batch_size]
+        batch_df = score_games(batch, max_workers=max_workers, endpoints=_worker['endpoints'],
+                               cache=_worker['cache'], rate_limiter=_worker['rate_limiter'],
+                               dead_letter=dead_letter, requeue=False)
+        if len(batch_df) > 0:
+            batch_df['season'] = season
+            log.append(batch_df)
+            logged += len(batch_df)
+
+    # Retry the shard's failed games once more at the end
+    shard_ids = set(game_ids)
+    requeue_ids = [g for g in dead_letter.ids() if g in shard_ids]
+    if len(requeue_ids) > 0:
+        retry_df = score_games(requeue_ids, max_workers=max_workers, endpoints=_worker['endpoints'],
+                               cache=_worker['cache'], rate_limiter=_worker['rate_limiter'],
+                               dead_letter=dead_letter, requeue=False)
+        if len(retry_df) > 0:
+            retry_df['season'] = season
+            log.append(retry_df)
+            logged += len(retry_df)
+
+    metrics = METRICS.snapshot()
+    METRICS.reset()
+    return season, shard, logged, metrics
+
+
+def merge_shards(season, game_ids, checkpoint_dir="checkpoints"):
+    """
+    Merge a season's shard outputs into its stored watch index.
+
+    Logged records are put back in game log order before ranking, so the
+    result does not depend on how the season was sharded.
+
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY'
+    game_ids : list
+        The season's game ids in game log order
+    checkpoint_dir : str
+        Directory holding the checkpoint files
+
+    Returns:
+    -------
+    pd.DataFrame
+        The season's watch index
+    """
+    shard_dir = os.path.join(checkpoint_dir, "backfill")
+    log_paths = sorted(glob.glob(os.path.join(shard_dir, f"records{season}.shard*.jsonl")))
+    dead_letter_paths = sorted(glob.glob(os.path.join(shard_dir, f"failed_games{season}.shard*.json")))
+
+    logged = [CheckpointLog(path).replay() for path in log_paths]
+    logged = [frame for frame in logged if len(frame) > 0]
+    logged_df = pd.concat(logged, ignore_index=True) if logged else pd.DataFrame()
+    if len(logged_df) > 0:
+        logged_df['game_id'] = normalize_game_ids(logged_df['game_id'])
+        position = {game_id: i for i, game_id in enumerate(game_ids)}
+        logged_df = logged_df.iloc[logged_df['game_id'].map(position).argsort(kind='stable')].reset_index(drop=True)
+
+    stored_df = load_season_table(season, checkpoint_dir)
+    season_df, ranker = merge_season_records(season, stored_df, logged_df, checkpoint_dir)
+    if ranker is not None:
+        save_season(season_df, season, checkpoint_dir)
+        ranker.save(os.path.join(checkpoint_dir, f"ranks{season}.npz"))
+
+    # Fold the shard dead letter queues into the season's queue
+    dead_letter = DeadLetterQueue(os.path.join(checkpoint_dir, f"failed_games{season}.json"))
+    scored = set(season_df['game_id']) if len(season_df) > 0 else set()
+    for game_id in scored:
+        dead_letter.discard(game_id)
+    for path in dead_letter_paths:
+        for game_id, entry in DeadLetterQueue(path).entries.items():
+            if game_id not in scored:
+                dead_letter.entries[game_id] = entry
+    dead_letter.save()
+
+    for path in log_paths + dead_letter_paths:
+        os.remove(path)
+
+    return season_df
+
+
+def backfill(seasons=None, checkpoint_dir="checkpoints", processes=None, shards_per_season=1, max_workers=4,
+             requests_per_second=4.0, endpoints=None, cache=None, batch_size=25):
+    """
+    Backfill several seasons on a pool of worker processes.
+
+    Every season is split into shards_per_season shards of game ids and
+    each shard is scored in its own process. All processes draw from one
+    SharedRateLimiter, so the request budget is global. Shards write to
+    their own files under checkpoint_dir/backfill, which are merged into the
+    Parquet store season by season once every shard is done. A rerun skips
+    games already stored or logged by a shard.
+
+    Parameters:
+    ----------
+    seasons : list, optional
+        Seasons in format 'YYYY-YY', defaults to the last 5 seasons
+    checkpoint_dir : str
+        Directory holding the checkpoint files
+    processes : int, optional
+        Worker processes, defaults to one per shard
+    shards_per_season : int
+        Shards each season's games are split into
+    max_workers : int
+        Number of games fetched concurrently by each process
+    requests_per_second : float
+        Request rate shared by every process
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+        (must be picklable unless workers are forked)
+    cache : ResponseCache, optional
+        Raw response cache shared by every process
+    batch_size : int
+        Games scored and logged together
+
+    Returns:
+    -------
+    pd.DataFrame
+        Watch index for all seasons
+    """
+    if seasons is None:
+        start_year = int(current_season()[:4])
+        seasons = [f"{year}-{str(year + 1)[-2:]}" for year in range(start_year, start_year - 5, -1)]
+
+    shard_dir = os.path.join(checkpoint_dir, "backfill")
+    Path(shard_dir).mkdir(parents=True, exist_ok=True)
+
+    # Game logs are fetched up front, workers only get game ids
+    season_ids = {}
+    tasks = []
+    for season in seasons:
+        games_df = get_game_log(season, cache=cache)
+        game_ids = normalize_game_ids(pd.Series(games_df['GAME_ID'].unique(), dtype=object)).tolist()
+        season_ids[season] = game_ids
+
+        done = set()
+        stored_df = load_season_table(season, checkpoint_dir)
+        if len(stored_df) > 0:
+            done |= set(normalize_game_ids(stored_df['game_id']))
+        for path in glob.glob(os.path.join(shard_dir, f"records{season}.shard*.jsonl")):
+            logged_df = CheckpointLog(path).replay()
+            if len(logged_df) > 0:
+                done |= set(normalize_game_ids(logged_df['game_id']))
+
+        todo = [g for g in game_ids if g not in done]
+        print(f"{len(todo)} games left to process for {season}")
+        for shard in range(shards_per_season):
+            if len(todo[shard::shards_per_season]) > 0:
+                tasks.append((season, shard, todo[shard::shards_per_season]))
+
+    if len(tasks) > 0:
+        rate_limiter = SharedRateLimiter(rate=requests_per_second, burst=max(4, max_workers))
+        processes = len(tasks) if processes is None else processes
+        metrics = {'log_path': METRICS.log_path} if METRICS.enabled else None
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(rate_limiter, endpoints, cache, metrics)) as pool:
+            futures = [pool.submit(score_shard, season, shard, game_ids, shard_dir, max_workers, batch_size)
+                       for season, shard, game_ids in tasks]
+            for future in as_completed(futures):
+                season, shard, logged, shard_metrics = future.result()
+                METRICS.merge(shard_metrics)
+                print(f"Shard {shard} of {season} done, {logged} games logged")
+
+    season_dfs = []
+    for season in seasons:
+        season_df = merge_shards(season, season_ids[season], checkpoint_dir)
+        if len(season_df) > 0:
+            season_dfs.append(season_df)
+
+    if len(season_dfs) == 0:
+        return pd.DataFrame()
+
+    all_results = pd.concat(season_dfs, ignore_index=True)
+    all_results = all_results.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    print(f"Stored {len(all_results)} games across {len(season_dfs)} seasons in {store_dir(checkpoint_dir)}")
+
+    return all_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the NBA watch index for several seasons in parallel")
+    parser.add_argument('seasons', nargs='*', help="Seasons in format YYYY-YY, defaults to the last 5")
+    parser.add_argument('--checkpoint-dir', default="checkpoints")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--shards-per-season', type=int, default=1)
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--requests-per-second', type=float, default=4.0)
+    parser.add_argument('--cache-dir', default="checkpoints/raw_cache")
+    parser.add_argument('--metrics-log', default=None, help="JSON lines log of every timing span and event")
+    parser.add_argument('--metrics-textfile', default=None, help="Prometheus textfile written at the end of the run")
+    parser.add_argument('--profile', default=None, help="cProfile stats file of the parent process")
+    args = parser.parse_args()
+
+    with instrumented(args.metrics_log, args.metrics_textfile, args.profile):
+        backfill(args.seasons or None, checkpoint_dir=args.checkpoint_dir, processes=args.processes,
+                 shards_per_season=args.shards_per_season, max_workers=args.max_workers,
+                 requests_per_second=args.requests_per_second, cache=ResponseCache(args.cache_dir))
@@ -0,0 +1,399 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from watch_index_data import clear_shared, nba_filter_index, nba_watch_index, nba_weight_engine
+from watch_index_fetch import GAME_ENDPOINTS, fetch_games
+from watch_index_generation import (BOXSCORE_COLUMNS, PBP_EVENT_COLUMNS, _stack, compute_boxscore_metrics,
+                                    compute_games_metrics, compute_pbp_metrics, compute_watch_index, team_colors)
+from watch_index_store import write_season
+from watch_index_weights import WEIGHT_PROFILES
+
+
+BASELINE_PATH = "checkpoints/benchmark_baseline.json"
+SIZES = [100, 1230, 10000]
+
+# Games in a regular season, the fixtures roll over to the next season after it
+SEASON_GAMES = 1230
+
+TEAMS = sorted(team_colors)
+TEAM_IDS = {team: 1610612737 + i for i, team in enumerate(TEAMS)}
+
+# Share of play-by-play rows that score, and the split of their points (FT, 2, 3)
+SCORING_SHARE = 0.25
+POINT_SHARES = [0.29, 0.49, 0.22]
+DUNK_SHARE = 0.08
+
+SHOT_TEMPLATES = {1: " Free Throw 1 of 2", 2: " Driving Layup Shot", 3: " 26' 3PT Jump Shot"}
+OTHER_TEMPLATES = [" REBOUND (Off:0 Def:1)", " Bad Pass Turnover (P1.T1)", " S.FOUL (P1.T1)",
+                   " MISS 18' Jump Shot", " MISS 25' 3PT Jump Shot", " BLOCK (1 BLK)", " STEAL (1 STL)"]
+
+
+def _clock(seconds):
+    seconds = np.maximum(seconds, 0).astype(int)
+    return [f"{m}:{s:02d}" for m, s in zip(seconds // 60, seconds % 60)]
+
+
+def synthetic_game(index, seed=0):
+    """
+    Deterministic fake endpoint frames of one game.
+
+    The frames have the columns and value formats of the nba_api endpoints
+    ('AWAY - HOME' SCORE strings on scoring plays, 'MM:SS' minutes, team ids
+    and abbreviations) with realistic volumes: ~450 play-by-play rows, about
+    a quarter of them scoring, 13 players a side, overtime in ~6% of games.
+
+    Parameters:
+    ----------
+    index : int
+        Position of the game in the fixture schedule (sets the season, date
+        and teams)
+    seed : int
+        Fixture seed, the same (index, seed) always gives the same game
+
+    Returns:
+    -------
+    tuple
+        (game_id, endpoint name to list of DataFrames, like fetch_game)
+    """
+    rng = np.random.default_rng([seed, index])
+    season, number = divmod(index, SEASON_GAMES)
+    year = 2015 + season
+    game_id = f"002{year % 100:02d}{number + 1:05d}"
+    game_date = pd.Timestamp(year, 10, 22) + pd.Timedelta(days=number * 170 // SEASON_GAMES)
+
+    home, away = rng.choice(len(TEAMS), 2, replace=False)
+    home, away = TEAMS[home], TEAMS[away]
+    periods = 4 + int(rng.random() < 0.06) * int(rng.integers(1, 3))
+
+    # PLAY BY PLAY
+    # ---------------------------------------
+    per_period = rng.integers(105, 120, periods)
+    per_period[4:] = rng.integers(25, 35, periods - 4)
+    n = int(per_period.sum())
+    period = np.repeat(np.arange(1, periods + 1), per_period)
+    length = np.where(period <= 4, 720, 300)
+    position = np.concatenate([np.sort(rng.random(k))[::-1] for k in per_period])
+
+    home_side = rng.random(n) < 0.51
+    scoring = rng.random(n) < SCORING_SHARE
+    points = np.where(scoring, rng.choice([1, 2, 3], n, p=POINT_SHARES), 0)
+    home_score = np.cumsum(np.where(home_side, points, 0))
+    away_score = np.cumsum(np.where(home_side, 0, points))
+
+    rosters = {side: np.array([f"{side}{k:02d} Player" for k in range(13)], dtype=object) for side in (home, away)}
+    players = np.where(home_side, rosters[home][rng.integers(0, 9, n)], rosters[away][rng.integers(0, 9, n)])
+    dunk = (points == 2) & (rng.random(n) < DUNK_SHARE)
+    action = np.array(OTHER_TEMPLATES, dtype=object)[rng.integers(0, len(OTHER_TEMPLATES), n)]
+    for value, template in SHOT_TEMPLATES.items():
+        action = np.where(points == value, template, action)
+    action = np.where(dunk, " Driving Dunk", action)
+    description = players + action
+
+    score = np.full(n, None, dtype=object)
+    score[scoring] = [f"{a} - {h}" for a, h in zip(away_score[scoring], home_score[scoring])]
+    margin = home_score - away_score
+    score_margin = np.full(n, None, dtype=object)
+    score_margin[scoring] = np.where(margin[scoring] == 0, 'TIE', margin[scoring].astype(str))
+
+    pbp = pd.DataFrame({
+        'GAME_ID': game_id,
+        'EVENTNUM': np.cumsum(rng.integers(1, 3, n)),
+        'EVENTMSGTYPE': np.where(scoring, np.where(points == 1, 3, 1), 4),
+        'PERIOD': period,
+        'PCTIMESTRING': _clock(position * length),
+        'HOMEDESCRIPTION': np.where(home_side, description, None),
+        'NEUTRALDESCRIPTION': None,
+        'VISITORDESCRIPTION': np.where(home_side, None, description),
+        'SCORE': score,
+        'SCOREMARGIN': score_margin,
+    })
+
+    # BOX SCORES
+    # ---------------------------------------
+    final = {home: int(home_score[-1]), away: int(away_score[-1])}
+    traditional = []
+    advanced = []
+    threes = {home: int(((points == 3) & home_side).sum()), away: int(((points == 3) & ~home_side).sum())}
+    for team in (home, away):
+        minutes = np.zeros(13)
+        minutes[:10] = np.minimum(rng.dirichlet(np.linspace(6, 1, 10)) * 5 * (48 + 5 * (periods - 4)), 44)
+        made_threes = rng.multinomial(threes[team], minutes / minutes.sum())
+        points_scored = rng.multinomial(final[team], minutes / minutes.sum())
+        attempts = np.round(points_scored / 1.1 + rng.integers(0, 4, 13) * (minutes > 0)).astype(int)
+        traditional.append(pd.DataFrame({
+            'GAME_ID': game_id,
+            'TEAM_ID': TEAM_IDS[team],
+            'TEAM_ABBREVIATION': team,
+            'PLAYER_NAME': rosters[team],
+            'MIN': np.where(minutes > 0, _clock(minutes * 60), None),
+            'PTS': points_scored,
+            'FGM': np.minimum(points_scored // 2, attempts),
+            'FGA': attempts,
+            'FTM': points_scored % 2 + rng.integers(0, 3, 13) * (minutes > 0),
+            'FTA': points_scored % 2 + rng.integers(0, 5, 13) * (minutes > 0),
+            'OREB': rng.poisson(minutes / 24),
+            'DREB': rng.poisson(minutes / 8),
+            'STL': rng.poisson(minutes / 40),
+            'AST': rng.poisson(minutes / 12),
+            'BLK': rng.poisson(minutes / 48),
+            'PF': rng.poisson(minutes / 16),
+            'TO': rng.poisson(minutes / 24),
+            'FG3M': made_threes,
+            'FG3A': made_threes + rng.poisson(minutes / 11),
+        }))
+        advanced.append(pd.DataFrame({
+            'GAME_ID': game_id,
+            'TEAM_ID': TEAM_IDS[team],
+            'PLAYER_NAME': rosters[team],
+            'POSS': np.round(minutes * 2.1, 0),
+            'TS_PCT': np.where(minutes > 0, np.round(rng.normal(0.57, 0.08, 13), 3), np.nan),
+            'NET_RATING': np.where(minutes > 0, np.round(rng.normal(0, 12, 13), 1), np.nan),
+        }))
+
+    game_summary = pd.DataFrame({
+        'GAME_ID': [game_id],
+        'GAME_DATE_EST': [game_date.strftime('%Y-%m-%dT00:00:00')],
+        'GAME_STATUS_TEXT': ['Final' if periods == 4 else 'Final/OT'],
+        'HOME_TEAM_ID': [TEAM_IDS[home]],
+        'VISITOR_TEAM_ID': [TEAM_IDS[away]],
+        'SEASON': [str(year)],
+    })
+    line_score = pd.DataFrame({
+        'GAME_ID': game_id,
+        'TEAM_ID': [TEAM_IDS[home], TEAM_IDS[away]],
+        'TEAM_ABBREVIATION': [home, away],
+        'PTS': [final[home], final[away]],
+    })
+
+    return game_id, {
+        'BoxScoreSummaryV2': [game_summary, line_score],
+        'BoxScoreTraditionalV2': [pd.concat(traditional, ignore_index=True)],
+        'BoxScoreAdvancedV2': [pd.concat(advanced, ignore_index=True)],
+        'PlayByPlayV2': [pbp],
+    }
+
+
+def synthetic_endpoints(num_games, seed=0):
+    """
+    Endpoint stubs serving num_games synthetic games, no network needed.
+
+    The fixtures are generated up front so the benchmark only times the
+    pipeline.
+
+    Returns:
+    -------
+    tuple
+        (game_ids, endpoint name to callable(game_id), like GAME_ENDPOINTS)
+    """
+    games = dict(synthetic_game(index, seed) for index in range(num_games))
+    endpoints = {name: (lambda game_id, name=name: games[game_id][name]) for name in GAME_ENDPOINTS}
+    return list(games), endpoints
+
+
+def percentiles(samples):
+    """
+    p50/p95/max of a list of latencies in seconds, in milliseconds.
+    """
+    samples = np.asarray(samples, dtype=float) * 1000
+    return {'p50': round(float(np.percentile(samples, 50)), 3),
+            'p95': round(float(np.percentile(samples, 95)), 3),
+            'max': round(float(samples.max()), 3)}
+
+
+def _timed(samples, name, call, *args, **kwargs):
+    start = time.perf_counter()
+    result = call(*args, **kwargs)
+    samples.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_pipeline(game_ids, endpoints, samples=None):
+    """
+    Fetch (from the stubs), score and rank games, timing every stage.
+
+    Stages are fetch, pbp and boxscore (the two kernels on the stacked
+    frames), score (compute_games_metrics, stacking and both kernels) and
+    rank (compute_watch_index).
+
+    Returns:
+    -------
+    pd.DataFrame
+        The ranked watch index
+    """
+    samples = {} if samples is None else samples
+    frames_by_game = _timed(samples, 'fetch', lambda: {
+        game_id: frames for game_id, frames, error in fetch_games(game_ids, endpoints=endpoints) if error is None
+    })
+    for frames in frames_by_game.values():
+        frames['PlayByPlayV2'] = [frames['PlayByPlayV2'][0][PBP_EVENT_COLUMNS]]
+
+    ids = list(frames_by_game)
+    pbp = _stack([frames['PlayByPlayV2'][0] for frames in frames_by_game.values()], ids, PBP_EVENT_COLUMNS)
+    _timed(samples, 'pbp', compute_pbp_metrics, pbp, game_ids=ids)
+    stacked = {
+        name: _stack([frames[endpoint][position] for frames in frames_by_game.values()], ids, BOXSCORE_COLUMNS[name])
+        for name, (endpoint, position) in {
+            'game_info': ('BoxScoreSummaryV2', 0), 'line_score': ('BoxScoreSummaryV2', 1),
+            'traditional_stats': ('BoxScoreTraditionalV2', 0), 'advanced_stats': ('BoxScoreAdvancedV2', 0),
+        }.items()
+    }
+    _timed(samples, 'boxscore', compute_boxscore_metrics, **stacked)
+
+    df = _timed(samples, 'score', compute_games_metrics, frames_by_game)
+    return _timed(samples, 'rank', compute_watch_index, df)
+
+
+def run_dashboard(watch_df, root, samples=None):
+    """
+    Time a cold dashboard load and its filter/re-rank queries over a store.
+
+    dashboard_load reads the compact table and builds the filter index and
+    weight engine; every dashboard_filter sample is one team and season
+    query ranked under a weighting profile, as the NBA tab does on a rerun.
+    """
+    samples = {} if samples is None else samples
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    seasons = watch_df['game_id'].str[3:5].map(lambda year: f"20{year}-{int(year) + 1:02d}")
+    for season, season_df in watch_df.assign(season=seasons).groupby('season'):
+        write_season(season_df, season, root)
+
+    def load():
+        clear_shared()
+        return nba_watch_index(root), nba_filter_index(root), nba_weight_engine(root)
+    view, index, engine = _timed(samples, 'dashboard_load', load)
+
+    columns = ['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights']
+    for season in index.values('season'):
+        for team, weights in zip(TEAMS, list(WEIGHT_PROFILES.values()) * len(TEAMS)):
+            def query():
+                rows = index.rows(index.match('season', [season]), index.match('team', [team]))
+                rows, scores = engine.ranked(weights, rows)
+                return view[columns].take(rows).assign(WatchIndex=scores[rows])
+            _timed(samples, 'dashboard_filter', query)
+    return samples
+
+
+def benchmark(num_games, repeats=3, seed=0):
+    """
+    Benchmark the pipeline and the dashboard on num_games synthetic games.
+
+    Parameters:
+    ----------
+    num_games : int
+        Fixture size
+    repeats : int
+        Pipeline and dashboard load runs per size (latency percentiles are
+        taken over them)
+    seed : int
+        Fixture seed
+
+    Returns:
+    -------
+    dict
+        games_per_second (fetch, score and rank), per-stage p50/p95/max in
+        ms, and the pipeline's peak traced memory in MB
+    """
+    game_ids, endpoints = synthetic_endpoints(num_games, seed)
+    root = tempfile.mkdtemp(prefix="watch_index_bench_")
+    samples = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeats):
+                watch_df = run_pipeline(game_ids, endpoints, samples)
+            for _ in range(repeats):
+                run_dashboard(watch_df, root, samples)
+
+            # Peak memory from a separate traced run, tracing slows the timed ones
+            tracemalloc.start()
+            run_pipeline(game_ids, endpoints)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        clear_shared()
+
+    pipeline = np.sum([samples[stage] for stage in ('fetch', 'score', 'rank')], axis=0)
+    return {
+        'games': len(watch_df),
+        'games_per_second': round(num_games / float(np.median(pipeline)), 1),
+        'stages': {stage: percentiles(values) for stage, values in samples.items()},
+        'peak_memory_mb': round(peak / 1e6, 1),
+    }
+
+
+def compare(results, baseline, tolerance=0.25, floor_ms=1.0):
+    """
+    Regressions of results against a stored baseline.
+
+    A stage regresses when its p50 is more than tolerance slower than the
+    baseline's and at least floor_ms slower (to ignore timer noise); peak
+    memory and games per second are held to the same tolerance.
+
+    Returns:
+    -------
+    list
+        One message per regression, empty when there is none
+    """
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get('results', {}).get(size)
+        if base is None:
+            continue
+        for stage, stats in result['stages'].items():
+            base_p50 = base['stages'].get(stage, {}).get('p50')
+            if base_p50 is not None and stats['p50'] > base_p50 * (1 + tolerance) and stats['p50'] - base_p50 >= floor_ms:
+                regressions.append(f"{size} games, {stage}: p50 {stats['p50']:.1f} ms vs {base_p50:.1f} ms")
+        if result['games_per_second'] < base['games_per_second'] / (1 + tolerance):
+            regressions.append(f"{size} games: {result['games_per_second']:.0f} games/s vs {base['games_per_second']:.0f}")
+        if result['peak_memory_mb'] > base['peak_memory_mb'] * (1 + tolerance):
+            regressions.append(f"{size} games: peak {result['peak_memory_mb']:.1f} MB vs {base['peak_memory_mb']:.1f} MB")
+    return regressions
+
+
+def print_results(results):
+    for size, result in results.items():
+        print(f"\n{size} games: {result['games_per_second']:.0f} games/s, peak {result['peak_memory_mb']:.1f} MB")
+        for stage, stats in result['stages'].items():
+            print(f"  {stage:<17} p50 {stats['p50']:>10.2f} ms   p95 {stats['p95']:>10.2f} ms   max {stats['max']:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the watch index pipeline and dashboard on synthetic games")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a stage regresses")
+    args = parser.parse_args()
+
+    results = {str(size): benchmark(size, repeats=args.repeats, seed=args.seed) for size in args.sizes}
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                            'processor': platform.machine(), 'cpus': os.cpu_count()},
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), tolerance=args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        print(f"\n{len(regressions)} regressions against {args.baseline}")
+        raise SystemExit(1 if regressions else 0)
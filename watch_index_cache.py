@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+# Entries for games that are not final yet (and the daily scoreboard) are only
+# trusted for a minute, the season game log for a few hours. Finished games
+# never change, so their entries never expire.
+LIVE_TTL = 60
+GAME_LOG_TTL = 6 * 60 * 60
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+def game_ttl(frames):
+    """
+    Time to live for the endpoint responses of a single game.
+
+    Parameters:
+    ----------
+    frames : dict
+        Endpoint name to list of DataFrames for the game
+
+    Returns:
+    -------
+    int or None
+        None (never expire) when the game is final, LIVE_TTL otherwise
+    """
+    summary = frames.get('BoxScoreSummaryV2')
+    if summary:
+        status = summary[0]['GAME_STATUS_TEXT']
+        if len(status) > 0 and str(status.iloc[0]).startswith('Final'):
+            return None
+    return LIVE_TTL
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of raw nba_api endpoint responses.
+
+    Each response is stored once as gzip-compressed JSON under a key derived
+    from the endpoint name and its parameters (which include the game_id for
+    per-game endpoints).
+
+    Parameters:
+    ----------
+    cache_dir : str
+        Directory holding the cache entries
+    offline : bool
+        When True, only answer from the cache (expired entries included) and
+        raise CacheMiss instead of touching the network
+    """
+
+    def __init__(self, cache_dir="checkpoints/raw_cache", offline=False):
+        self.cache_dir = Path(cache_dir)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint, params):
+        payload = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, endpoint, params):
+        key = self.key(endpoint, params)
+        return self.cache_dir / endpoint / key[:2] / f"{key}.json.gz"
+
+    def get(self, endpoint, params):
+        """
+        Look up a cached response.
+
+        Returns:
+        -------
+        list or None
+            The endpoint's list of DataFrames, or None when missing or expired
+        """
+        path = self._path(endpoint, params)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        expired = entry is not None and entry['expires_at'] is not None and entry['expires_at'] < time.time()
+        if entry is None or (expired and not self.offline):
+            self.misses += 1
+            if self.offline:
+                raise CacheMiss(f"{endpoint} {params} is not cached")
+            return None
+
+        self.hits += 1
+        return [pd.DataFrame(frame['data'], columns=frame['headers']) for frame in entry['frames']]
+
+    def put(self, endpoint, params, frames, ttl=None):
+        """
+        Store a response, replacing any existing entry atomically.
+
+        Parameters:
+        ----------
+        endpoint : str
+            Endpoint name
+        params : dict
+            Parameters the endpoint was called with
+        frames : list
+            The endpoint's list of DataFrames
+        ttl : float, optional
+            Seconds until the entry expires, None never expires
+        """
+        now = time.time()
+        entry = {
+            'endpoint': endpoint,
+            'params': params,
+            'fetched_at': now,
+            'expires_at': None if ttl is None else now + ttl,
+            'frames': [{'headers': list(df.columns), 'data': df.values.tolist()} for df in frames],
+        }
+
+        path = self._path(endpoint, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    def fetch(self, endpoint, params, call, ttl=None):
+        """
+        Return the cached response or fetch and store it.
+
+        Parameters:
+        ----------
+        endpoint : str
+            Endpoint name
+        params : dict
+            Parameters the endpoint is called with
+        call : callable
+            Zero-argument callable performing the request
+        ttl : float, optional
+            Seconds until the stored entry expires, None never expires
+
+        Returns:
+        -------
+        list
+            The endpoint's list of DataFrames
+        """
+        frames = self.get(endpoint, params)
+        if frames is None:
+            frames = call()
+            self.put(endpoint, params, frames, ttl=ttl)
+        return frames
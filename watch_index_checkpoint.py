@@ -0,0 +1,118 @@
+import json
+import os
+
+import pandas as pd
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL log of per-game records for one season.
+
+    Every append is flushed and fsynced, so a crash loses at most the batch
+    being written. A torn last line left by a crash is cut off when the log
+    is opened. Compaction writes the season table atomically and only then
+    empties the log, so resuming replays just the records added since the
+    last compaction.
+
+    Parameters:
+    ----------
+    path : str
+        Log file (e.g., 'checkpoints/records2024-25.jsonl')
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._repair()
+
+    def _repair(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append(self, df):
+        """
+        Append one record per row and fsync.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Records to append (one game per row)
+        """
+        if len(df) == 0:
+            return
+
+        # json.dumps keeps floats exact (to_json rounds them)
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in df.to_dict(orient='records'))
+
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self):
+        """
+        Read every complete record in the log.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per logged record, in append order
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return pd.DataFrame(records)
+
+    def compact(self, table, write_table):
+        """
+        Atomically write the final season table, then empty the log.
+
+        Parameters:
+        ----------
+        table : pd.DataFrame
+            Season table built from the previous table and the replayed log
+        write_table : callable or str
+            Atomic writer called with the table, or a CSV path
+        """
+        if callable(write_table):
+            write_table(table)
+        else:
+            write_csv_atomic(table, write_table)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def write_csv_atomic(df, path):
+    """
+    Write a CSV through a fsynced temporary file and an atomic rename.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Table to write
+    path : str
+        Destination CSV
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
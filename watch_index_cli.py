@@ -0,0 +1,208 @@
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+
+
+# Modules each subcommand needs, imported only when it runs so every
+# invocation pays for its own dependencies and nothing else
+COMMAND_MODULES = {
+    'backfill': ['watch_index_backfill', 'watch_index_cache'],
+    'refresh': ['watch_index_generation', 'watch_index_cache'],
+    'preview': ['watch_index_generation', 'watch_index_cache', 'watch_index_predict'],
+    'recompute-from-cache': ['watch_index_generation'],
+    'export': ['watch_index_store'],
+}
+
+# Startup budget of a subcommand (interpreter start plus its imports), in ms
+IMPORT_BUDGET_MS = 1000
+
+
+def import_command(command):
+    """
+    Import the modules a subcommand needs.
+    """
+    for name in COMMAND_MODULES[command]:
+        importlib.import_module(name)
+
+
+def _cache(cache_dir, offline=False):
+    if cache_dir is None:
+        return None
+    from watch_index_cache import ResponseCache
+    return ResponseCache(cache_dir, offline=offline)
+
+
+def run_backfill(args):
+    from watch_index_backfill import backfill
+
+    backfill(args.seasons or None, checkpoint_dir=args.checkpoint_dir, processes=args.processes,
+             shards_per_season=args.shards_per_season, max_workers=args.max_workers,
+             requests_per_second=args.requests_per_second, cache=_cache(args.cache_dir))
+
+
+def run_refresh(args):
+    from watch_index_generation import current_season, refresh_watch_index
+
+    season = args.season or current_season()
+    season_df = refresh_watch_index(season, checkpoint_dir=args.checkpoint_dir, max_workers=args.max_workers,
+                                    requests_per_second=args.requests_per_second, cache=_cache(args.cache_dir))
+    if len(season_df) == 0:
+        print(f"No games stored for {season}")
+        return
+
+    import pandas as pd
+    start = (pd.Timestamp.now() - pd.Timedelta(days=args.days_back)).strftime('%Y-%m-%d')
+    recent = season_df[pd.to_datetime(season_df['game_date'].astype(str).str[:10]) >= start]
+    columns = [col for col in ['game_date', 'home_team', 'away_team', 'home_score', 'away_score', 'WatchIndex',
+                               'lead_changes', 'clutch_time', 'overtime'] if col in recent.columns]
+    print(f"Top {args.top} most watchable games of the last {args.days_back} days:")
+    print(recent.sort_values('WatchIndex', ascending=False)[columns].head(args.top).to_string(index=False))
+
+
+def run_preview(args):
+    from watch_index_generation import get_watchability_preview
+    from watch_index_predict import load_predictor
+
+    predictor = None if args.no_predict else load_predictor(args.model_path)
+    preview = get_watchability_preview(args.date, cache=_cache(args.cache_dir), predictor=predictor)
+    if args.no_predict:
+        preview = preview[['game_id', 'home_team', 'away_team', 'game_time']]
+    print(preview.to_string(index=False) if len(preview) > 0 else "No games scheduled.")
+
+
+def run_recompute(args):
+    from watch_index_generation import recompute_from_cache, save_season
+
+    df = recompute_from_cache(args.seasons, cache_dir=args.cache_dir)
+    print(f"Recomputed {len(df)} games from {args.cache_dir}")
+    if args.save:
+        for season, season_df in df.groupby('season', sort=False):
+            save_season(season_df.reset_index(drop=True), season, args.checkpoint_dir)
+            print(f"Stored {len(season_df)} games of {season}")
+
+
+def run_export(args):
+    from watch_index_store import read_watch_index
+
+    df = read_watch_index(args.store_dir, seasons=args.seasons, teams=args.teams,
+                          start_date=args.start_date, end_date=args.end_date, columns=args.columns)
+    df = df.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    file_format = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    if file_format == 'parquet':
+        df.to_parquet(args.output, index=False)
+    else:
+        df.to_csv(sys.stdout if args.output == '-' else args.output, index=False)
+    print(f"Exported {len(df)} games to {args.output}", file=sys.stderr)
+
+
+def check_import_time(args):
+    """
+    Time each subcommand's startup in fresh interpreters (best of repeats)
+    and fail when one is over the budget.
+    """
+    unknown = [command for command in args.commands if command not in COMMAND_MODULES]
+    if unknown:
+        raise SystemExit(f"Unknown subcommands {unknown}, choose from {list(COMMAND_MODULES)}")
+
+    over = []
+    for command in args.commands or list(COMMAND_MODULES):
+        code = f"import watch_index_cli; watch_index_cli.import_command({command!r})"
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True)
+            timings.append(1000 * (time.perf_counter() - start))
+        best = min(timings)
+        print(f"{command:<22} {best:>8.0f} ms")
+        if best > args.budget_ms:
+            over.append(command)
+
+    if over:
+        print(f"Over the {args.budget_ms} ms budget: {', '.join(over)}")
+        raise SystemExit(1)
+
+
+def build_parser():
+    """
+    The CLI's argument parser, one subparser per batch job.
+    """
+    metrics = argparse.ArgumentParser(add_help=False)
+    metrics.add_argument('--metrics-log', default=None, help="JSON lines log of every timing span and event")
+    metrics.add_argument('--metrics-textfile', default=None, help="Prometheus textfile written at the end of the run")
+    metrics.add_argument('--profile', default=None, help="cProfile stats file of the run")
+
+    parser = argparse.ArgumentParser(description="Batch jobs of the NBA watch index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backfill = commands.add_parser('backfill', parents=[metrics], help="Backfill seasons on a process pool")
+    backfill.add_argument('seasons', nargs='*', help="Seasons in format YYYY-YY, defaults to the last 5")
+    backfill.add_argument('--checkpoint-dir', default="checkpoints")
+    backfill.add_argument('--processes', type=int, default=None)
+    backfill.add_argument('--shards-per-season', type=int, default=1)
+    backfill.add_argument('--max-workers', type=int, default=4)
+    backfill.add_argument('--requests-per-second', type=float, default=4.0)
+    backfill.add_argument('--cache-dir', default="checkpoints/raw_cache")
+    backfill.set_defaults(run=run_backfill)
+
+    refresh = commands.add_parser('refresh', parents=[metrics], help="Score a season's new games into the store")
+    refresh.add_argument('--season', default=None, help="Season in format YYYY-YY, defaults to the current one")
+    refresh.add_argument('--checkpoint-dir', default="checkpoints")
+    refresh.add_argument('--max-workers', type=int, default=4)
+    refresh.add_argument('--requests-per-second', type=float, default=4.0)
+    refresh.add_argument('--cache-dir', default=None)
+    refresh.add_argument('--days-back', type=int, default=14, help="Window of the printed top games")
+    refresh.add_argument('--top', type=int, default=10)
+    refresh.set_defaults(run=run_refresh)
+
+    preview = commands.add_parser('preview', parents=[metrics], help="Predicted watchability of a day's games")
+    preview.add_argument('--date', default=None, help="Date in format MM/DD/YYYY, defaults to today")
+    preview.add_argument('--cache-dir', default=None)
+    preview.add_argument('--model-path', default="checkpoints/watch_predictor.npz")
+    preview.add_argument('--no-predict', action='store_true', help="List the games without predictions")
+    preview.set_defaults(run=run_preview)
+
+    recompute = commands.add_parser('recompute-from-cache', parents=[metrics],
+                                    help="Rescore cached seasons without the network")
+    recompute.add_argument('seasons', nargs='+', help="Seasons in format YYYY-YY")
+    recompute.add_argument('--cache-dir', default="checkpoints/raw_cache")
+    recompute.add_argument('--checkpoint-dir', default="checkpoints")
+    recompute.add_argument('--save', action='store_true', help="Replace the seasons in the store")
+    recompute.set_defaults(run=run_recompute)
+
+    export = commands.add_parser('export', parents=[metrics], help="Write stored games to CSV or Parquet")
+    export.add_argument('output', help="Output file, '-' writes CSV to stdout")
+    export.add_argument('--store-dir', default="checkpoints/watch_index_store")
+    export.add_argument('--format', choices=['csv', 'parquet'], default=None,
+                        help="Defaults to parquet for .parquet outputs, csv otherwise")
+    export.add_argument('--seasons', nargs='+', default=None)
+    export.add_argument('--teams', nargs='+', default=None)
+    export.add_argument('--start-date', default=None, help="YYYY-MM-DD")
+    export.add_argument('--end-date', default=None, help="YYYY-MM-DD")
+    export.add_argument('--columns', nargs='+', default=None)
+    export.set_defaults(run=run_export)
+
+    timing = commands.add_parser('import-time', help="Check every subcommand starts within the import budget")
+    timing.add_argument('commands', nargs='*', help="Subcommands to time, defaults to all")
+    timing.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    timing.add_argument('--repeats', type=int, default=3)
+    timing.set_defaults(run=check_import_time)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command not in COMMAND_MODULES:
+        return args.run(args)
+
+    from watch_index_metrics import instrumented
+
+    import_command(args.command)
+    with instrumented(args.metrics_log, args.metrics_textfile, args.profile):
+        return args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import glob
+import hashlib
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from watch_index_db import DB_PATH, matches_table
+from watch_index_filters import FilterIndex
+from watch_index_similar import SimilarityIndex
+from watch_index_store import STORE_DIR, read_watch_index, stored_columns
+from watch_index_weights import WeightEngine
+
+
+# Process-wide cache of the dashboard tables: name -> (signature, digest, frame).
+# Every session gets the same frame, so it must be treated as read-only.
+_CACHE = {}
+_LOCK = threading.RLock()
+
+# Columns the dashboard views read (plus the PR columns), every other column
+# is only loaded on demand by nfl_raw_columns / nba_raw_columns
+NFL_VIEW_COLUMNS = ['game_id', 'season', 'week', 'playoff', 'home_team', 'away_team', 'player.x', 'player.y',
+                    'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']
+NBA_VIEW_COLUMNS = ['game_id', 'season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness',
+                    'Highlights', 'Pace', 'StarPower', 'WatchIndex']
+
+# Dataset name -> (bytes with pandas' default dtypes for every column, bytes held)
+MEMORY_REPORT = {}
+
+
+def _files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(f for f in sorted(glob.glob(os.path.join(path, "**", "*"), recursive=True)) if os.path.isfile(f))
+        else:
+            files.append(path)
+    return files
+
+
+def file_signature(paths):
+    """
+    Cheap change signature of a set of files.
+
+    Parameters:
+    ----------
+    paths : list
+        Files (or directories, whose files are all included)
+
+    Returns:
+    -------
+    tuple
+        (path, mtime_ns, size) of every file, missing files included as None
+    """
+    signature = []
+    for path in _files(paths):
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def file_digest(paths):
+    """
+    sha256 of the contents of a set of files (missing files are skipped).
+    """
+    digest = hashlib.sha256()
+    for path in _files(paths):
+        if not os.path.exists(path):
+            continue
+        digest.update(path.encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_shared(name, paths, build):
+    """
+    Build a table once per process and reuse it until its files change.
+
+    The mtime/size signature is checked on every call. When it changed the
+    files are hashed, and the table is only rebuilt if their contents did
+    (a touched or re-copied file keeps the cached table).
+
+    Parameters:
+    ----------
+    name : hashable
+        Cache key of the table
+    paths : list
+        Source files the table is built from
+    build : callable
+        Called without arguments to (re)build the table
+
+    Returns:
+    -------
+    object
+        The shared table, rebuilt only when the contents of paths changed
+    """
+    signature = file_signature(paths)
+    cached = _CACHE.get(name)
+    if cached is not None and cached[0] == signature:
+        return cached[2]
+
+    with _LOCK:
+        # Another session may have rebuilt it while we waited
+        cached = _CACHE.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[2]
+
+        digest = file_digest(paths)
+        if cached is not None and cached[1] == digest:
+            _CACHE[name] = (signature, digest, cached[2])
+            return cached[2]
+
+        table = build()
+        _CACHE[name] = (signature, digest, table)
+        return table
+
+
+def clear_shared():
+    """
+    Drop every cached table.
+    """
+    with _LOCK:
+        _CACHE.clear()
+
+
+def default_memory(df):
+    """
+    Bytes a frame takes with pandas' default dtypes, as read from a CSV
+    (64-bit numbers, object strings).
+    """
+    total = df.index.memory_usage()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            total += 8 * len(series)
+        else:
+            total += series.astype(object).memory_usage(deep=True, index=False)
+    return int(total)
+
+
+def stored_default_memory(root, df):
+    """
+    Bytes the whole Parquet store would take with pandas' default dtypes,
+    without reading the columns df does not hold.
+
+    The columns of df (read from the store) are measured. Every other column
+    is estimated from the file metadata: 8 bytes per value for numbers, and
+    for text its uncompressed size plus a pointer and string header per
+    value.
+    """
+    total = default_memory(df)
+    for path in sorted(glob.glob(os.path.join(root, "season=*", "*.parquet"))):
+        metadata = pq.ParquetFile(path).metadata
+        schema = metadata.schema.to_arrow_schema()
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                chunk = row_group.column(j)
+                name = chunk.path_in_schema
+                if name in df.columns:
+                    continue
+                arrow_type = schema.field(name).type
+                if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_boolean(arrow_type):
+                    total += 8 * chunk.num_values
+                else:
+                    total += chunk.total_uncompressed_size + (8 + sys.getsizeof('')) * chunk.num_values
+    return int(total)
+
+
+def compact_frame(df, categories=(), dates=(), ints=(), ids=()):
+    """
+    Copy of a frame in its compact representation.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Table to convert
+    categories : list
+        Columns stored as categorical codes (whole-number floats become ints first)
+    dates : list
+        Columns parsed to datetime64
+    ints : list
+        Whole-number columns stored as int32
+    ids : list
+        Numeric id strings stored as int32 (e.g. NBA game ids)
+
+    Returns:
+    -------
+    pd.DataFrame
+        Same rows and columns, other numbers as float32 / int32
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in categories:
+            if pd.api.types.is_float_dtype(series) and series.notna().all() and (series % 1 == 0).all():
+                series = series.astype(np.int32)
+            series = series.astype('category')
+        elif col in dates:
+            series = pd.to_datetime(series)
+        elif col in ids:
+            series = pd.to_numeric(series.astype(str)).astype(np.int32)
+        elif col in ints:
+            series = series.astype(np.int32)
+        elif pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_integer_dtype(series):
+            series = series.astype(np.int32)
+        elif pd.api.types.is_float_dtype(series):
+            series = series.astype(np.float32)
+        columns[col] = series
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+
+def report_memory(name, full_bytes, frame):
+    """
+    Record and print how much smaller a compact table is than the full one.
+    """
+    held = int(frame.memory_usage(deep=True).sum())
+    MEMORY_REPORT[name] = (full_bytes, held)
+    print(f"{name}: {full_bytes / 1e6:.2f} MB -> {held / 1e6:.2f} MB ({full_bytes / max(held, 1):.1f}x smaller)")
+
+
+def build_nfl_watch_index(path):
+    """
+    Read the NFL watch index and flag playoff games.
+
+    Weeks after 17 (after 18 from 2021 on) are playoff games.
+
+    Parameters:
+    ----------
+    path : str
+        RDS file with the NFL watch index
+
+    Returns:
+    -------
+    pd.DataFrame
+        Deduplicated games with a 0/1 playoff column
+    """
+    import pyreadr
+
+    nfl_df = pyreadr.read_r(path)[None].drop_duplicates().reset_index(drop=True)
+    last_regular_week = np.where(nfl_df['season'] < 2021, 17, 18)
+    nfl_df['playoff'] = (nfl_df['week'] > last_regular_week).astype(int)
+    return nfl_df
+
+
+def build_compact_nfl(path):
+    """
+    NFL view columns in compact form: categorical season, teams and QBs,
+    int32 weeks, float32 ranks.
+    """
+    nfl_df = build_nfl_watch_index(path)
+    view = compact_frame(nfl_df[[col for col in NFL_VIEW_COLUMNS if col in nfl_df.columns]],
+                         categories=['season', 'home_team', 'away_team', 'player.x', 'player.y'],
+                         ints=['week', 'playoff'])
+    report_memory(f"NFL watch index ({path})", default_memory(nfl_df), view)
+    return view
+
+
+def build_compact_nba(root):
+    """
+    NBA view and PR columns in compact form: categorical season and teams,
+    datetime64 dates, int32 game ids, float32 scores.
+    """
+    available = stored_columns(root)
+    columns = [col for col in NBA_VIEW_COLUMNS if col in available] + [col for col in available if col.startswith('PR_')]
+    nba_df = read_watch_index(root, columns=columns or None).reset_index(drop=True)
+    view = compact_frame(nba_df, categories=['season', 'home_team', 'away_team'], dates=['game_date'], ids=['game_id'])
+
+    # The full table is estimated from the file metadata, the raw metrics are only read by nba_raw_columns
+    report_memory(f"NBA watch index ({root})", stored_default_memory(root, nba_df), view)
+    return view
+
+
+def nfl_watch_index(path='WatchData.rds'):
+    """
+    Shared compact NFL watch index, re-read only when the RDS file changes.
+    """
+    return load_shared(('nfl', path), [path], lambda: build_compact_nfl(path))
+
+
+def nba_watch_index(root=STORE_DIR):
+    """
+    Shared compact NBA watch index, re-read only when the Parquet store changes.
+    """
+    return load_shared(('nba', root), [root], lambda: build_compact_nba(root))
+
+
+def nfl_raw_columns(columns, path='WatchData.rds'):
+    """
+    Further NFL columns, row-aligned with nfl_watch_index(path) and loaded
+    on first use.
+    """
+    columns = tuple(columns)
+    return load_shared(('nfl_raw', path, columns), [path],
+                       lambda: compact_frame(build_nfl_watch_index(path)[list(columns)]))
+
+
+def nba_raw_columns(columns, root=STORE_DIR):
+    """
+    Further NBA columns, row-aligned with nba_watch_index(root) and loaded
+    on first use.
+    """
+    columns = tuple(columns)
+    def build():
+        raw = read_watch_index(root, columns=['game_id'] + [col for col in columns if col != 'game_id'])
+        raw = raw.assign(game_id=pd.to_numeric(raw['game_id']).astype(np.int32)).set_index('game_id')
+        return compact_frame(raw.reindex(nba_watch_index(root)['game_id'])[list(columns)].reset_index(drop=True))
+    return load_shared(('nba_raw', root, columns), [root], build)
+
+
+def nfl_filter_index(path='WatchData.rds'):
+    """
+    Shared FilterIndex over nfl_watch_index(path), rebuilt with it.
+    """
+    return load_shared(('nfl_index', path), [path], lambda: FilterIndex(
+        nfl_watch_index(path),
+        keys={'season': ['season'], 'team': ['home_team', 'away_team'],
+              'qb': ['player.x', 'player.y'], 'playoff': ['playoff']},
+        ranges=['PRWAR', 'PREPA'],
+    ))
+
+
+def nba_filter_index(root=STORE_DIR):
+    """
+    Shared FilterIndex over nba_watch_index(root), rebuilt with it.
+    """
+    return load_shared(('nba_index', root), [root], lambda: FilterIndex(
+        nba_watch_index(root),
+        keys={'season': ['season'], 'team': ['home_team', 'away_team']},
+        ranges=['game_date'],
+    ))
+
+
+def nba_weight_engine(root=STORE_DIR):
+    """
+    Shared WeightEngine over nba_watch_index(root), rebuilt with it.
+    """
+    return load_shared(('nba_weights', root), [root], lambda: WeightEngine(nba_watch_index(root)))
+
+
+def nba_game_store_matches(root=STORE_DIR, path=DB_PATH):
+    """
+    Whether the SQLite game store agrees with nba_watch_index(root),
+    rechecked only when either changes.
+    """
+    return load_shared(('nba_db_matches', root, path), [root, path],
+                       lambda: matches_table(nba_watch_index(root), path))
+
+
+def nfl_similarity_index(path='WatchData.rds'):
+    """
+    Shared SimilarityIndex over the NFL games' PR columns.
+    """
+    return load_shared(('nfl_similar', path), [path], lambda: SimilarityIndex(
+        nfl_watch_index(path), ['PREPA', 'PRWAR', 'PRWacky', 'PRPenalties']))
+
+
+def nba_similarity_index(root=STORE_DIR):
+    """
+    Shared SimilarityIndex over every PR_* column of the NBA games.
+    """
+    def build():
+        df = nba_watch_index(root)
+        return SimilarityIndex(df, [col for col in df.columns if col.startswith('PR_')])
+    return load_shared(('nba_similar', root), [root], build)
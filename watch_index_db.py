@@ -0,0 +1,271 @@
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from watch_index_store import STORE_DIR, read_watch_index
+
+
+DB_PATH = "checkpoints/watch_index.db"
+
+# Columns every row has, the metric columns are added as they show up
+KEY_COLUMNS = {
+    'game_id': 'TEXT PRIMARY KEY',
+    'season': 'TEXT',
+    'game_date': 'TEXT',
+    'home_team': 'TEXT',
+    'away_team': 'TEXT',
+    'WatchIndex': 'REAL',
+}
+
+INDEXES = {
+    'games_season_date': '(season, game_date)',
+    'games_home_team': '(home_team)',
+    'games_away_team': '(away_team)',
+    'games_watch_index': '(WatchIndex DESC)',
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(series):
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'REAL'
+    return 'TEXT'
+
+
+def connect(path=DB_PATH):
+    """
+    Open the game store, creating the table and its indexes if needed.
+
+    Parameters:
+    ----------
+    path : str
+        SQLite file
+
+    Returns:
+    -------
+    sqlite3.Connection
+        Connection to the store
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    columns = ', '.join(f"{_quote(name)} {sql_type}" for name, sql_type in KEY_COLUMNS.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS games ({columns})")
+    for name, columns in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON games {columns}")
+    return conn
+
+
+def table_columns(conn):
+    """
+    Columns of the games table, in order.
+    """
+    return [row[1] for row in conn.execute("PRAGMA table_info(games)")]
+
+
+def upsert_games(df, path=DB_PATH):
+    """
+    Insert new games and overwrite stored games with the same game_id.
+
+    Columns the table does not have yet are added first. Stored columns
+    missing from df keep their values for updated games.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Watch index rows with game_id and season
+    path : str
+        SQLite file
+
+    Returns:
+    -------
+    int
+        Number of rows written
+    """
+    if len(df) == 0:
+        return 0
+
+    df = df.drop_duplicates(subset=['game_id'], keep='last')
+    df = df.assign(game_id=df['game_id'].astype(str).str.zfill(10))
+    if 'game_date' in df.columns:
+        df['game_date'] = pd.to_datetime(df['game_date'].astype(str).str[:10]).dt.strftime('%Y-%m-%d')
+
+    conn = connect(path)
+    try:
+        with conn:
+            existing = set(table_columns(conn))
+            for name in df.columns:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE games ADD COLUMN {_quote(name)} {_sql_type(df[name])}")
+
+            columns = list(df.columns)
+            updates = ', '.join(f"{_quote(name)} = excluded.{_quote(name)}" for name in columns if name != 'game_id')
+            statement = (
+                f"INSERT INTO games ({', '.join(_quote(name) for name in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(game_id) DO UPDATE SET {updates}"
+            )
+            values = df.astype(object).where(df.notna(), None)
+            rows = [tuple(value.item() if isinstance(value, np.generic) else value for value in row)
+                    for row in values.itertuples(index=False, name=None)]
+            conn.executemany(statement, rows)
+    finally:
+        conn.close()
+
+    return len(df)
+
+
+def _filters(seasons=None, teams=None, start_date=None, end_date=None):
+    conditions = []
+    params = []
+    if seasons is not None:
+        seasons = [str(season) for season in seasons]
+        conditions.append(f"season IN ({', '.join('?' * len(seasons))})")
+        params.extend(seasons)
+    if teams is not None:
+        teams = list(teams)
+        placeholders = ', '.join('?' * len(teams))
+        conditions.append(f"(home_team IN ({placeholders}) OR away_team IN ({placeholders}))")
+        params.extend(teams + teams)
+    if start_date is not None:
+        conditions.append("game_date >= ?")
+        params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+    if end_date is not None:
+        conditions.append("game_date <= ?")
+        params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def _read(path, query, params):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def top_games(path=DB_PATH, n=None, seasons=None, teams=None, start_date=None, end_date=None, columns=None, offset=0):
+    """
+    Games ranked by WatchIndex, filtered through the table's indexes.
+
+    Parameters:
+    ----------
+    path : str
+        SQLite file
+    n : int, optional
+        Keep only the top n games (after offset)
+    seasons : list, optional
+        Seasons to keep, all seasons when None
+    teams : list, optional
+        Keep games where any of these teams played (home or away)
+    start_date : str, optional
+        First game date to keep, 'YYYY-MM-DD'
+    end_date : str, optional
+        Last game date to keep, 'YYYY-MM-DD'
+    columns : list, optional
+        Columns to return, all columns when None
+    offset : int
+        Number of top games to skip, e.g. the rows of the earlier pages
+
+    Returns:
+    -------
+    pd.DataFrame
+        Matching games, highest WatchIndex first (ties by game_id, so pages
+        never overlap), empty when the store does not exist
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+
+    where, params = _filters(seasons, teams, start_date, end_date)
+    selected = '*' if columns is None else ', '.join(_quote(name) for name in columns)
+    query = f"SELECT {selected} FROM games{where} ORDER BY WatchIndex DESC, game_id"
+    if n is not None or offset:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([-1 if n is None else int(n), int(offset)])
+
+    return _read(path, query, params)
+
+
+def count_games(path=DB_PATH, seasons=None, teams=None, start_date=None, end_date=None):
+    """
+    Number of games top_games returns for the same filters (without n).
+
+    Returns:
+    -------
+    int
+        Matching games, 0 when the store does not exist
+    """
+    if not os.path.exists(path):
+        return 0
+
+    where, params = _filters(seasons, teams, start_date, end_date)
+    return int(_read(path, f"SELECT COUNT(*) FROM games{where}", params).iat[0, 0])
+
+
+def matches_table(df, path=DB_PATH):
+    """
+    Whether the store holds exactly the games of a watch index table, in
+    the same seasons and with the same WatchIndex.
+
+    The Parquet store is the source of truth, this store is written from it
+    (save_season writes the partition first, then upserts it here), so a
+    mismatch means an upsert failed or was never run.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Watch index rows with game_id, season and WatchIndex (e.g. the
+        dashboard's compact table)
+    path : str
+        SQLite file
+
+    Returns:
+    -------
+    bool
+        True when both hold the same games and scores
+    """
+    if not os.path.exists(path):
+        return len(df) == 0
+
+    stored = _read(path, "SELECT game_id, season, WatchIndex FROM games", [])
+    if len(stored) != len(df):
+        return False
+    stored = stored.set_index(pd.to_numeric(stored['game_id']))
+    expected = df.set_index(pd.to_numeric(df['game_id'].astype(str)))
+    if not expected.index.isin(stored.index).all():
+        return False
+
+    stored = stored.loc[expected.index]
+    return (stored['season'].astype(str).to_numpy() == expected['season'].astype(str).to_numpy()).all() and np.allclose(
+        stored['WatchIndex'].to_numpy(dtype=float), expected['WatchIndex'].to_numpy(dtype=float), atol=1e-6, equal_nan=True)
+
+
+def migrate_store(root=STORE_DIR, path=DB_PATH):
+    """
+    Load every game of the Parquet store into the SQLite store.
+
+    Returns:
+    -------
+    int
+        Number of games written
+    """
+    return upsert_games(read_watch_index(root), path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the Parquet watch index store into the SQLite game store")
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    parser.add_argument('--db-path', default=DB_PATH)
+    args = parser.parse_args()
+
+    print(f"Upserted {migrate_store(args.store_dir, args.db_path)} games into {args.db_path}")
@@ -0,0 +1,260 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from watch_index_cache import game_ttl
+from watch_index_metrics import count, span
+
+
+def nba_api_endpoint(name):
+    """
+    Callable(game_id) requesting an nba_api endpoint's DataFrames.
+
+    nba_api is imported on the first request, not with this module, so
+    processes that only read cached or stored data start without it.
+    """
+    def call(game_id):
+        from nba_api.stats import endpoints
+        return getattr(endpoints, name)(game_id=game_id).get_data_frames()
+    return call
+
+
+# Per-game endpoints used by the watch index. Each entry maps an endpoint name
+# to a callable taking a game_id and returning the endpoint's list of
+# DataFrames, so a local stub can be swapped in for the real nba_api calls.
+GAME_ENDPOINTS = {
+    name: nba_api_endpoint(name)
+    for name in ['BoxScoreSummaryV2', 'BoxScoreTraditionalV2', 'BoxScoreAdvancedV2', 'PlayByPlayV2']
+}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request of a run.
+
+    Parameters:
+    ----------
+    rate : float
+        Tokens added per second (sustained requests per second)
+    burst : int
+        Maximum number of tokens the bucket can hold
+    """
+
+    def __init__(self, rate=4.0, burst=4):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available and consume it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """
+    Token bucket shared by every process of a run.
+
+    The bucket lives in shared memory behind a process-safe lock, so worker
+    processes created after it (and handed it at start-up) draw from a single
+    global request budget.
+
+    Parameters:
+    ----------
+    rate : float
+        Tokens added per second (sustained requests per second, all processes)
+    burst : int
+        Maximum number of tokens the bucket can hold
+    context : multiprocessing context, optional
+        Context of the worker processes, defaults to the default context
+    """
+
+    def __init__(self, rate=4.0, burst=4, context=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        context = multiprocessing.get_context() if context is None else context
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        # [tokens, last refill] on the system-wide monotonic clock
+        self._state = context.Array('d', [float(self.burst), time.monotonic()])
+
+    def acquire(self):
+        """
+        Block until a token is available and consume it.
+        """
+        while True:
+            with self._state.get_lock():
+                now = time.monotonic()
+                tokens = min(self.burst, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def _call_endpoint(call, game_id, rate_limiter, retry=None, name='endpoint'):
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            with span('rate_limit_wait'):
+                rate_limiter.acquire()
+
+        start = time.monotonic()
+        try:
+            # Failed requests are counted as request_errors by the span
+            with span('request', endpoint=name):
+                response = call(game_id)
+        except Exception as e:
+            # Adaptive limiters slow down on errors that signal throttling
+            if hasattr(rate_limiter, 'record'):
+                rate_limiter.record(time.monotonic() - start, e)
+            attempt += 1
+            if retry is None or attempt >= retry.max_attempts or not retry.retryable(e):
+                raise
+            count('retries', endpoint=name)
+            with span('backoff_sleep'):
+                time.sleep(retry.delay(attempt - 1))
+            continue
+
+        if hasattr(rate_limiter, 'record'):
+            rate_limiter.record(time.monotonic() - start)
+        return response
+
+
+def fetch_game(game_id, endpoints=None, rate_limiter=None, request_pool=None, cache=None, retry=None,
+               ttl=game_ttl):
+    """
+    Fetch the raw endpoint frames for a single game.
+
+    Parameters:
+    ----------
+    game_id : str
+        NBA game id (e.g., '0022200902')
+    endpoints : dict, optional
+        Mapping of endpoint name to callable(game_id), defaults to GAME_ENDPOINTS
+    rate_limiter : RateLimiter, optional
+        Limiter every request goes through
+    request_pool : ThreadPoolExecutor, optional
+        When given, the endpoints are requested in parallel on this pool
+    cache : ResponseCache, optional
+        Raw response cache consulted before and filled after each request
+    retry : BackoffPolicy, optional
+        Backoff policy for failed requests, a failure is final when None
+    ttl : callable
+        Maps the game's frames to the cache time to live of its responses
+
+    Returns:
+    -------
+    dict
+        Endpoint name to the list of DataFrames it returned
+    """
+    endpoints = GAME_ENDPOINTS if endpoints is None else endpoints
+    params = {'game_id': game_id}
+
+    frames = {}
+    if cache is not None:
+        for name in endpoints:
+            cached = cache.get(name, params)
+            if cached is not None:
+                frames[name] = cached
+            count('cache_hits' if cached is not None else 'cache_misses', endpoint=name)
+
+    missing = [name for name in endpoints if name not in frames]
+    if request_pool is None:
+        fetched = {name: _call_endpoint(endpoints[name], game_id, rate_limiter, retry, name) for name in missing}
+    else:
+        futures = {
+            name: request_pool.submit(_call_endpoint, endpoints[name], game_id, rate_limiter, retry, name)
+            for name in missing
+        }
+        fetched = {name: future.result() for name, future in futures.items()}
+    frames.update(fetched)
+
+    if cache is not None and fetched:
+        expires = ttl(frames)
+        for name, response in fetched.items():
+            cache.put(name, params, response, ttl=expires)
+
+    return {name: frames[name] for name in endpoints}
+
+
+def _fetch_game_safe(game_id, endpoints, rate_limiter, request_pool, cache, retry, ttl):
+    try:
+        return fetch_game(game_id, endpoints, rate_limiter, request_pool, cache, retry, ttl), None
+    except Exception as e:
+        return None, e
+
+
+def fetch_games(game_ids, endpoints=None, rate_limiter=None, max_workers=1, cache=None, retry=None,
+                ttl=game_ttl):
+    """
+    Fetch the raw endpoint frames for many games.
+
+    With max_workers=1 games are fetched one after another. Otherwise up to
+    max_workers games are kept in flight and the endpoints of each game are
+    requested in parallel. Results are yielded in the order of game_ids either
+    way, so downstream output does not depend on the fetch mode.
+
+    Parameters:
+    ----------
+    game_ids : list
+        Game ids to fetch
+    endpoints : dict, optional
+        Mapping of endpoint name to callable(game_id), defaults to GAME_ENDPOINTS
+    rate_limiter : RateLimiter, optional
+        Limiter shared by every request
+    max_workers : int
+        Number of games fetched concurrently
+    cache : ResponseCache, optional
+        Raw response cache shared by every request
+    retry : BackoffPolicy, optional
+        Backoff policy for failed requests, a failure is final when None
+    ttl : callable
+        Maps a game's frames to the cache time to live of its responses
+
+    Yields:
+    ------
+    tuple
+        (game_id, frames, error) where exactly one of frames/error is None
+    """
+    endpoints = GAME_ENDPOINTS if endpoints is None else endpoints
+
+    if max_workers <= 1:
+        for game_id in game_ids:
+            frames, error = _fetch_game_safe(game_id, endpoints, rate_limiter, None, cache, retry, ttl)
+            yield game_id, frames, error
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers * len(endpoints)) as request_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as game_pool:
+        futures = [
+            (game_id, game_pool.submit(_fetch_game_safe, game_id, endpoints, rate_limiter, request_pool, cache, retry, ttl))
+            for game_id in game_ids
+        ]
+        for game_id, future in futures:
+            frames, error = future.result()
+            yield game_id, frames, error
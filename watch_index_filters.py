@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+
+def _range_values(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    return pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+
+class FilterIndex:
+    """
+    Precomputed filter bitmaps over a watch index table.
+
+    Rows are presorted once by the order column (highest first), and every
+    bitmap is laid out in that order, so intersecting any set of filters
+    yields matching rows already ranked. Categorical keys hold one boolean
+    bitmap per distinct value; a key may span several columns (e.g. home and
+    away team) and matches a row when any of them holds the value.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Table to index (not copied, positions refer to it)
+    keys : dict
+        Key name to the list of columns it matches (e.g. {'team': ['home_team', 'away_team']})
+    ranges : list
+        Numeric or date columns used in threshold filters
+    order_by : str
+        Column rows are ranked by, highest first
+    """
+
+    def __init__(self, df, keys, ranges=(), order_by='WatchIndex'):
+        values = pd.to_numeric(df[order_by], errors='coerce').to_numpy(dtype=float)
+        # Stable descending sort with NaN last, like sort_values(ascending=False)
+        self.order = np.argsort(-values, kind='stable')
+        self.size = len(self.order)
+
+        self.bitmaps = {}
+        for key, columns in keys.items():
+            bitmaps = {}
+            for col in columns:
+                codes, uniques = pd.factorize(df[col].to_numpy()[self.order])
+                for code, value in enumerate(uniques):
+                    bitmap = codes == code
+                    bitmaps[value] = bitmaps[value] | bitmap if value in bitmaps else bitmap
+            self.bitmaps[key] = bitmaps
+
+        self.ranges = {col: _range_values(df[col])[self.order] for col in ranges}
+
+    def values(self, key):
+        """
+        Distinct values indexed under a key.
+        """
+        return list(self.bitmaps[key])
+
+    def match(self, key, values):
+        """
+        Bitmap of rows where the key holds any of the values.
+
+        Parameters:
+        ----------
+        key : str
+            Key name given at construction
+        values : list
+            Accepted values
+
+        Returns:
+        -------
+        np.ndarray
+            Boolean bitmap in ranked order
+        """
+        bitmaps = self.bitmaps[key]
+        bitmap = np.zeros(self.size, dtype=bool)
+        for value in values:
+            if value in bitmaps:
+                bitmap |= bitmaps[value]
+        return bitmap
+
+    def at_least(self, column, threshold):
+        """
+        Bitmap of rows where a range column is >= threshold (a date string
+        for date columns).
+        """
+        values = self.ranges[column]
+        if np.issubdtype(values.dtype, np.datetime64):
+            threshold = np.datetime64(pd.Timestamp(threshold), 'ns')
+        return values >= threshold
+
+    def at_most(self, column, threshold):
+        """
+        Bitmap of rows where a range column is <= threshold (a date string
+        for date columns).
+        """
+        values = self.ranges[column]
+        if np.issubdtype(values.dtype, np.datetime64):
+            threshold = np.datetime64(pd.Timestamp(threshold), 'ns')
+        return values <= threshold
+
+    def rows(self, *bitmaps, limit=None):
+        """
+        Positions of the rows matching every bitmap, best ranked first.
+
+        Parameters:
+        ----------
+        *bitmaps : np.ndarray
+            Bitmaps from match / at_least, all of them must hold
+        limit : int, optional
+            Keep only the top rows
+
+        Returns:
+        -------
+        np.ndarray
+            Row positions in the indexed table (for DataFrame.iloc / take)
+        """
+        if len(bitmaps) == 0:
+            ranked = self.order
+        else:
+            ranked = self.order[np.flatnonzero(np.logical_and.reduce(bitmaps))]
+        return ranked if limit is None else ranked[:limit]
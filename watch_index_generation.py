@@ -1,18 +1,18 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
-import seaborn as sns
-import matplotlib.pyplot as plt
-from nba_api.stats.static import players
-from nba_api.stats.static import teams
-from nba_api.stats.endpoints import playergamelog
-from nba_api.stats.endpoints import leaguegamefinder
-from nba_api.stats.endpoints import shotchartdetail
-from nba_api.stats.library.parameters import SeasonAll
-from nba_api.stats.endpoints import leaguedashplayerstats
-from nba_api.stats.endpoints import BoxScoreAdvancedV2, BoxScoreTraditionalV2, BoxScoreSummaryV2
-from nba_api.stats.endpoints import LeagueGameLog, PlayByPlayV2, ScoreboardV2
+import os
+import json
+from pathlib import Path
+from watch_index_fetch import GAME_ENDPOINTS, fetch_games
+from watch_index_retry import AdaptiveRateLimiter, BackoffPolicy, DeadLetterQueue
+from watch_index_cache import ResponseCache, GAME_LOG_TTL, LIVE_TTL, game_ttl
+from watch_index_ranking import PercentileRanker
+from watch_index_checkpoint import CheckpointLog
+from watch_index_store import read_season, write_season
+from watch_index_db import upsert_games
+from watch_index_weights import COMPONENT_WEIGHTS, WATCH_INDEX_WEIGHTS
+from watch_index_metrics import count, event, span
 
 
 team_colors = {
@@ -50,7 +50,849 @@ team_colors = {
 
 
 
-def get_basketball_watch_index(season, start_date=None, end_date=None, num_games=None):
+def get_game_log(season, cache=None):
+    """
+    Get the LeagueGameLog for a season, going through the cache when given.
+    
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY' (e.g., '2022-23')
+    cache : ResponseCache, optional
+        Raw response cache
+        
+    Returns:
+    -------
+    pd.DataFrame
+        One row per team per game
+    """
+    def call():
+        # nba_api is only imported when a request is made (cached runs never load it)
+        from nba_api.stats.endpoints import LeagueGameLog
+        with span('request', endpoint='LeagueGameLog'):
+            return LeagueGameLog(season=season).get_data_frames()
+    if cache is None:
+        return call()[0]
+    return cache.fetch('LeagueGameLog', {'season': season}, call, ttl=GAME_LOG_TTL)[0]
+
+# Play-by-play columns the metric kernel needs (besides GAME_ID), everything
+# else is dropped before a season's play-by-play is held in memory
+PBP_EVENT_COLUMNS = ['PERIOD', 'SCORE', 'HOMEDESCRIPTION', 'VISITORDESCRIPTION']
+
+# SCORE strings look like 'AWAY - HOME' (e.g., '98 - 101')
+SCORE_PATTERN = r'^\s*([+-]?\d+)\s* - \s*([+-]?\d+)\s*$'
+
+def compute_pbp_metrics(pbp, game_ids=None):
+    """
+    Vectorized play-by-play metrics for one or many games.
+    
+    SCORE is parsed once for the whole frame and every metric is derived
+    from the parsed columns in a single grouped pass over GAME_ID.
+    
+    Parameters:
+    ----------
+    pbp : pd.DataFrame
+        PlayByPlayV2 rows, possibly for a whole season, with GAME_ID and the
+        PBP_EVENT_COLUMNS and rows of each game in event order
+    game_ids : list, optional
+        Games to report, games without any play-by-play rows get zeros
+        
+    Returns:
+    -------
+    pd.DataFrame
+        Indexed by GAME_ID with lead_changes, times_tied, largest_lead,
+        clutch_time and dunks
+    """
+    game = pbp['GAME_ID'].to_numpy()
+    
+    # Parse 'AWAY - HOME' once per distinct score string (a season repeats the
+    # same scorelines many times), rows that do not parse are ignored
+    codes, uniques = pd.factorize(pbp['SCORE'].astype('string'))
+    parsed = pd.Series(uniques).str.extract(SCORE_PATTERN).astype(float).to_numpy()
+    parsed = np.vstack([parsed, [np.nan, np.nan]])
+    away = parsed[codes, 0]
+    home = parsed[codes, 1]
+    valid = ~(np.isnan(away) | np.isnan(home))
+    margin = np.where(valid, home - away, 0)
+    
+    # Leader among scoring rows (1 home, -1 away, 0 tied) and the leader on
+    # the previous scoring row of the same game
+    leader = np.sign(margin[valid])
+    valid_game = game[valid]
+    prev_leader = pd.Series(leader).groupby(valid_game, sort=False).shift().to_numpy()
+    
+    lead_change = np.zeros(len(pbp))
+    lead_change[valid] = (leader != 0) & (prev_leader != 0) & ~np.isnan(prev_leader) & (leader != prev_leader)
+    tied = np.zeros(len(pbp))
+    tied[valid] = (leader == 0) & (prev_leader != 0) & ~np.isnan(prev_leader)
+    
+    # Clutch plays are 4th quarter/OT scoring rows within 5 points
+    late = pbp['PERIOD'].to_numpy() >= 4
+    clutch = late & valid & (np.abs(margin) <= 5)
+    
+    description = (
+        pbp['HOMEDESCRIPTION'].astype('string').fillna('').str.lower() +
+        pbp['VISITORDESCRIPTION'].astype('string').fillna('').str.lower()
+    )
+    dunk = description.str.contains('dunk', regex=False).to_numpy()
+    
+    per_game = pd.DataFrame({
+        'lead_changes': lead_change,
+        'times_tied': tied,
+        'largest_lead': np.abs(margin),
+        'late_plays': late,
+        'clutch_plays': clutch,
+        'dunks': dunk,
+    }).groupby(game, sort=False).agg({
+        'lead_changes': 'sum',
+        'times_tied': 'sum',
+        'largest_lead': 'max',
+        'late_plays': 'sum',
+        'clutch_plays': 'sum',
+        'dunks': 'sum',
+    })
+    
+    late_plays = per_game.pop('late_plays')
+    clutch_plays = per_game.pop('clutch_plays')
+    per_game['clutch_time'] = np.where(late_plays > 0, clutch_plays / late_plays.where(late_plays > 0, 1), 0)
+    per_game = per_game[['lead_changes', 'times_tied', 'largest_lead', 'clutch_time', 'dunks']]
+    per_game.index.name = 'GAME_ID'
+    
+    if game_ids is not None:
+        per_game = per_game.reindex(game_ids, fill_value=0)
+    
+    return per_game
+
+# Columns the box-score kernel needs (besides GAME_ID) from each frame
+BOXSCORE_COLUMNS = {
+    'game_info': ['GAME_DATE_EST', 'HOME_TEAM_ID', 'VISITOR_TEAM_ID', 'GAME_STATUS_TEXT'],
+    'line_score': ['TEAM_ID', 'TEAM_ABBREVIATION', 'PTS'],
+    'traditional_stats': ['TEAM_ID', 'PLAYER_NAME', 'MIN', 'PTS', 'FGM', 'FGA', 'FTM', 'FTA',
+                          'OREB', 'DREB', 'STL', 'AST', 'BLK', 'PF', 'TO', 'FG3M', 'FG3A'],
+    'advanced_stats': ['TEAM_ID', 'POSS', 'TS_PCT', 'NET_RATING'],
+}
+
+def minutes_played(minutes):
+    """
+    Minutes played as a float, accepting numeric minutes or 'MM:SS' strings.
+    
+    Parameters:
+    ----------
+    minutes : pd.Series
+        MIN column of a traditional box score
+        
+    Returns:
+    -------
+    pd.Series
+        Minutes played, NaN for players who did not play
+    """
+    if pd.api.types.is_numeric_dtype(minutes):
+        return minutes
+    
+    parts = minutes.astype('string').str.split(':', n=1, expand=True).reindex(columns=[0, 1])
+    whole = pd.to_numeric(parts[0], errors='coerce')
+    seconds = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return (whole + seconds / 60).astype(float)
+
+def grouped_mean(frame, keys, columns):
+    """
+    NaN-skipping mean per group, summed in row order exactly like Series.mean.
+    
+    groupby().mean() uses compensated summation, which can differ from the
+    per-game Series.mean in the last bit. Rows are sorted by the keys once and
+    each group's contiguous slice is summed with numpy's own sum instead.
+    
+    Parameters:
+    ----------
+    frame : pd.DataFrame
+        Rows to average
+    keys : list
+        Grouping columns
+    columns : list
+        Columns to average
+        
+    Returns:
+    -------
+    pd.DataFrame
+        Indexed by the keys with one column per averaged column
+    """
+    ordered = frame.sort_values(keys, kind='stable')
+    group_keys = ordered[keys]
+    starts = np.flatnonzero(~group_keys.duplicated().to_numpy())
+    bounds = list(zip(starts, list(starts[1:]) + [len(ordered)]))
+    
+    means = {}
+    for col in columns:
+        values = ordered[col].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[col] = [filled[a:b].sum() / present[a:b].sum() for a, b in bounds]
+    
+    index = pd.MultiIndex.from_frame(group_keys.iloc[starts]) if len(keys) > 1 else pd.Index(group_keys.iloc[starts, 0])
+    return pd.DataFrame(means, index=index)
+
+def compute_boxscore_metrics(game_info, line_score, traditional_stats, advanced_stats):
+    """
+    Vectorized box-score metrics for one or many games.
+    
+    Each box score is grouped by (GAME_ID, TEAM_ID) once and the home/away
+    columns for every game are picked from the grouped frames together.
+    
+    Parameters:
+    ----------
+    game_info : pd.DataFrame
+        BoxScoreSummaryV2 GameSummary rows with GAME_ID
+    line_score : pd.DataFrame
+        BoxScoreSummaryV2 LineScore rows with GAME_ID
+    traditional_stats : pd.DataFrame
+        BoxScoreTraditionalV2 player rows with GAME_ID
+    advanced_stats : pd.DataFrame
+        BoxScoreAdvancedV2 player rows with GAME_ID
+        
+    Returns:
+    -------
+    pd.DataFrame
+        Indexed by GAME_ID, games that cannot be scored (no home/away line
+        score or no player with 15+ minutes) are left out
+    """
+    info = game_info.drop_duplicates('GAME_ID').set_index('GAME_ID')
+    
+    # One grouped pass per box score
+    team_lines = line_score.drop_duplicates(['GAME_ID', 'TEAM_ID']).set_index(['GAME_ID', 'TEAM_ID'])
+    team_traditional = traditional_stats.groupby(['GAME_ID', 'TEAM_ID'])[['FG3M', 'FG3A', 'TO']].sum()
+    team_advanced = grouped_mean(advanced_stats, ['GAME_ID', 'TEAM_ID'], ['POSS', 'TS_PCT', 'NET_RATING'])
+    game_traditional = traditional_stats.groupby('GAME_ID')[['BLK', 'STL', 'FTA']].sum()
+    
+    def side(team_ids):
+        keys = pd.MultiIndex.from_arrays([info.index, team_ids.to_numpy()])
+        lines = team_lines[['TEAM_ABBREVIATION', 'PTS']].reindex(keys)
+        totals = team_traditional.reindex(keys).fillna(0)
+        averages = team_advanced.reindex(keys)
+        frame = pd.concat([lines, totals, averages], axis=1)
+        frame.index = info.index
+        return frame
+    
+    home = side(info['HOME_TEAM_ID'])
+    away = side(info['VISITOR_TEAM_ID'])
+    game_traditional = game_traditional.reindex(info.index).fillna(0)
+    
+    # STAR POWER METRICS
+    # ---------------------------------------
+    # Game Score (simplified version of John Hollinger's formula) for every
+    # player with 15+ minutes, the star is the first player with the max
+    eligible = traditional_stats[minutes_played(traditional_stats['MIN']) >= 15]
+    game_score = (
+        eligible['PTS'] + 
+        0.4 * eligible['FGM'] - 
+        0.7 * eligible['FGA'] - 
+        0.4 * (eligible['FTA'] - eligible['FTM']) + 
+        0.7 * eligible['OREB'] + 
+        0.3 * eligible['DREB'] + 
+        eligible['STL'] + 
+        0.7 * eligible['AST'] + 
+        0.7 * eligible['BLK'] - 
+        0.4 * eligible['PF'] - 
+        eligible['TO']
+    ).dropna()
+    star_rows = game_score.groupby(eligible.loc[game_score.index, 'GAME_ID']).idxmax()
+    star_player = pd.Series(eligible.loc[star_rows.to_numpy(), 'PLAYER_NAME'].to_numpy(), index=star_rows.index)
+    max_game_score = pd.Series(game_score.loc[star_rows.to_numpy()].to_numpy(), index=star_rows.index)
+    
+    scoreable = home['PTS'].notna() & away['PTS'].notna() & info.index.isin(star_rows.index)
+    info, home, away = info[scoreable], home[scoreable], away[scoreable]
+    game_traditional = game_traditional[scoreable]
+    
+    # SCORING METRICS
+    # ---------------------------------------
+    home_score = home['PTS'].astype(int)
+    away_score = away['PTS'].astype(int)
+    total_score = home_score + away_score
+    
+    avg_poss = (home['POSS'] + away['POSS']) / 2
+    pts_per_poss = (total_score / avg_poss).where(avg_poss > 0, 0)
+    
+    threes_made = (home['FG3M'] + away['FG3M']).astype(int)
+    threes_attempted = (home['FG3A'] + away['FG3A']).astype(int)
+    three_pt_pct = (threes_made / threes_attempted.where(threes_attempted > 0, 1)).where(threes_attempted > 0, 0)
+    
+    # EFFICIENCY METRICS
+    # ---------------------------------------
+    avg_ts = (home['TS_PCT'] + away['TS_PCT']) / 2
+    
+    # COMPETITIVENESS METRICS
+    # ---------------------------------------
+    score_diff = (home_score - away_score).abs()
+    closeness = 1 - (score_diff / total_score.where(total_score > 0, 1)).where(total_score > 0, 0)
+    overtime = info['GAME_STATUS_TEXT'].astype('string').str.startswith('Final/OT').fillna(False).astype(int)
+    
+    return pd.DataFrame({
+        'game_date': info['GAME_DATE_EST'],
+        'home_team': home['TEAM_ABBREVIATION'],
+        'away_team': away['TEAM_ABBREVIATION'],
+        'home_score': home_score,
+        'away_score': away_score,
+        'total_score': total_score,
+        'pts_per_poss': pts_per_poss,
+        'threes_made': threes_made,
+        'threes_attempted': threes_attempted,
+        'three_pt_pct': three_pt_pct,
+        'avg_ts': avg_ts,
+        'score_diff': score_diff,
+        'closeness': closeness,
+        'overtime': overtime,
+        'blocks': game_traditional['BLK'].astype(int),
+        'turnovers': (home['TO'] + away['TO']).astype(int),
+        'steals': game_traditional['STL'].astype(int),
+        'free_throws_attempted': game_traditional['FTA'].astype(int),
+        'net_rating_diff': (home['NET_RATING'] - away['NET_RATING']).abs(),
+        'star_player': star_player.reindex(info.index),
+        'max_game_score': max_game_score.reindex(info.index),
+    })
+
+def _frame_columns(name):
+    return PBP_EVENT_COLUMNS if name == 'pbp' else BOXSCORE_COLUMNS[name]
+
+def _stack(frames, game_ids, columns):
+    stacked = pd.concat(frames, ignore_index=True)[columns]
+    stacked.insert(0, 'GAME_ID', np.repeat(game_ids, [len(frame) for frame in frames]))
+    return stacked
+
+# Output column order of the raw per-game metrics
+METRIC_COLUMNS = [
+    'game_id', 'game_date', 'home_team', 'away_team', 'home_score', 'away_score',
+    'total_score', 'pts_per_poss', 'threes_made', 'threes_attempted', 'three_pt_pct',
+    'avg_ts', 'lead_changes', 'times_tied', 'largest_lead', 'score_diff', 'closeness',
+    'clutch_time', 'overtime', 'dunks', 'blocks', 'turnovers', 'steals',
+    'free_throws_attempted', 'net_rating_diff', 'star_player', 'max_game_score'
+]
+
+def compute_games_metrics(frames_by_game, errors=None):
+    """
+    Compute the raw watch index metrics for many games at once.
+    
+    Parameters:
+    ----------
+    frames_by_game : dict
+        Game id to the endpoint frames returned by fetch_game
+    errors : dict, optional
+        Filled with game id to the error of every game that could not be scored
+        
+    Returns:
+    -------
+    pd.DataFrame
+        One row per game that could be scored, in the order of frames_by_game
+    """
+    # Pick each game's frames, skipping games missing a frame or a column
+    frame_lists = {name: [] for name in list(BOXSCORE_COLUMNS) + ['pbp']}
+    game_ids = []
+    for game_id, frames in frames_by_game.items():
+        try:
+            game_frames = {
+                'game_info': frames['BoxScoreSummaryV2'][0],
+                'line_score': frames['BoxScoreSummaryV2'][1],
+                'traditional_stats': frames['BoxScoreTraditionalV2'][0],
+                'advanced_stats': frames['BoxScoreAdvancedV2'][0],
+                'pbp': frames['PlayByPlayV2'][0],
+            }
+            for name, frame in game_frames.items():
+                missing = set(_frame_columns(name)) - set(frame.columns)
+                if missing:
+                    raise KeyError(f"{name} is missing {sorted(missing)}")
+        except Exception as e:
+            print(f"Error processing game {game_id}: {e}")
+            count('games_unscoreable')
+            if errors is not None:
+                errors[game_id] = e
+            continue
+        
+        for name, frame in game_frames.items():
+            frame_lists[name].append(frame)
+        game_ids.append(game_id)
+    
+    if len(game_ids) == 0:
+        return pd.DataFrame()
+    
+    # Stack each endpoint's frame across games once, tagged with GAME_ID
+    with span('compute', stage='stack'):
+        stacked = {name: _stack(frame_lists[name], game_ids, _frame_columns(name)) for name in frame_lists}
+    with span('compute', stage='pbp'):
+        pbp_metrics = compute_pbp_metrics(stacked.pop('pbp'), game_ids=game_ids)
+    with span('compute', stage='boxscore'):
+        boxscore_metrics = compute_boxscore_metrics(**stacked)
+    
+    for game_id in game_ids:
+        if game_id not in boxscore_metrics.index:
+            print(f"Error processing game {game_id}: missing line score or no player with 15+ minutes")
+            count('games_unscoreable')
+            if errors is not None:
+                errors[game_id] = ValueError("missing line score or no player with 15+ minutes")
+    
+    scored = [game_id for game_id in game_ids if game_id in boxscore_metrics.index]
+    df = boxscore_metrics.loc[scored].join(pbp_metrics.loc[scored])
+    df.index.name = 'game_id'
+    df = df.reset_index()
+    
+    int_columns = ['lead_changes', 'times_tied', 'largest_lead', 'dunks']
+    df[int_columns] = df[int_columns].astype(int)
+    
+    return df[METRIC_COLUMNS]
+
+def compute_game_metrics(game_id, frames):
+    """
+    Compute the raw watch index metrics for a single game.
+    
+    Parameters:
+    ----------
+    game_id : str
+        NBA game id
+    frames : dict
+        Endpoint name to list of DataFrames, as returned by fetch_game
+        
+    Returns:
+    -------
+    dict
+        Raw (unranked) metrics for the game, empty when it cannot be scored
+    """
+    df = compute_games_metrics({game_id: frames})
+    return df.iloc[0].to_dict() if len(df) > 0 else {}
+
+# Metrics the season game log already holds (tier 1), and the per-game
+# endpoints the remaining metrics need (tier 2)
+TIER1_COLUMNS = [
+    'game_id', 'game_date', 'home_team', 'away_team', 'home_score', 'away_score',
+    'total_score', 'threes_made', 'threes_attempted', 'three_pt_pct', 'score_diff',
+    'closeness', 'overtime', 'blocks', 'turnovers', 'steals', 'free_throws_attempted'
+]
+TIER2_ENDPOINTS = ['BoxScoreTraditionalV2', 'BoxScoreAdvancedV2', 'PlayByPlayV2']
+
+def game_log_sides(games_df):
+    """
+    Split a LeagueGameLog into one home and one away team row per game.
+    
+    Parameters:
+    ----------
+    games_df : pd.DataFrame
+        LeagueGameLog rows (one per team per game)
+        
+    Returns:
+    -------
+    tuple
+        (home, away) frames indexed by the normalized GAME_ID, aligned on
+        the games that have both sides
+    """
+    teams = games_df.assign(GAME_ID=normalize_game_ids(games_df['GAME_ID']).to_numpy())
+    is_home = teams['MATCHUP'].astype(str).str.contains(' vs. ', regex=False)
+    home = teams[is_home].drop_duplicates('GAME_ID').set_index('GAME_ID')
+    away = teams[~is_home].drop_duplicates('GAME_ID').set_index('GAME_ID')
+    game_ids = home.index[home.index.isin(away.index)]
+    return home.loc[game_ids], away.loc[game_ids]
+
+def summary_dates(dates):
+    """
+    Game log dates ('YYYY-MM-DD') in the GAME_DATE_EST format of
+    BoxScoreSummaryV2 ('YYYY-MM-DDT00:00:00'), so tiered and per-game
+    scoring store the same game_date.
+    """
+    return pd.to_datetime(dates.astype(str).str[:10]).dt.strftime('%Y-%m-%dT00:00:00')
+
+def compute_game_log_metrics(games_df):
+    """
+    Tier-1 metrics for every game of a season in one vectorized pass.
+    
+    Scores, threes, blocks, steals, turnovers and free throws come straight
+    from the team rows of the game log, and a team total above 240 minutes
+    means overtime. Turnovers are the team totals, which also count team
+    turnovers not charged to a player.
+    
+    Parameters:
+    ----------
+    games_df : pd.DataFrame
+        LeagueGameLog rows (one per team per game)
+        
+    Returns:
+    -------
+    pd.DataFrame
+        TIER1_COLUMNS, one row per game in game log order
+    """
+    home, away = game_log_sides(games_df)
+    
+    # SCORING METRICS
+    # ---------------------------------------
+    home_score = home['PTS'].astype(int)
+    away_score = away['PTS'].astype(int)
+    total_score = home_score + away_score
+    
+    threes_made = (home['FG3M'] + away['FG3M']).astype(int)
+    threes_attempted = (home['FG3A'] + away['FG3A']).astype(int)
+    three_pt_pct = (threes_made / threes_attempted.where(threes_attempted > 0, 1)).where(threes_attempted > 0, 0)
+    
+    # COMPETITIVENESS METRICS
+    # ---------------------------------------
+    score_diff = (home_score - away_score).abs()
+    closeness = 1 - (score_diff / total_score.where(total_score > 0, 1)).where(total_score > 0, 0)
+    overtime = (pd.to_numeric(home['MIN'], errors='coerce') > 240).astype(int)
+    
+    df = pd.DataFrame({
+        'game_date': summary_dates(home['GAME_DATE']),
+        'home_team': home['TEAM_ABBREVIATION'],
+        'away_team': away['TEAM_ABBREVIATION'],
+        'home_score': home_score,
+        'away_score': away_score,
+        'total_score': total_score,
+        'threes_made': threes_made,
+        'threes_attempted': threes_attempted,
+        'three_pt_pct': three_pt_pct,
+        'score_diff': score_diff,
+        'closeness': closeness,
+        'overtime': overtime,
+        'blocks': (home['BLK'] + away['BLK']).astype(int),
+        'turnovers': (home['TOV'] + away['TOV']).astype(int),
+        'steals': (home['STL'] + away['STL']).astype(int),
+        'free_throws_attempted': (home['FTA'] + away['FTA']).astype(int),
+    })
+    df.index.name = 'game_id'
+    return df.reset_index()[TIER1_COLUMNS]
+
+def game_log_summaries(games_df, game_ids):
+    """
+    BoxScoreSummaryV2 frames rebuilt from the game log.
+    
+    Tier 2 scores games with these instead of calling the summary endpoint.
+    
+    Parameters:
+    ----------
+    games_df : pd.DataFrame
+        LeagueGameLog rows (one per team per game)
+    game_ids : list
+        Games to build the frames for
+        
+    Returns:
+    -------
+    dict
+        Game id to {'BoxScoreSummaryV2': [GameSummary, LineScore]}
+    """
+    home, away = game_log_sides(games_df)
+    game_ids = [game_id for game_id in game_ids if game_id in home.index]
+    home, away = home.loc[game_ids], away.loc[game_ids]
+    overtime = pd.to_numeric(home['MIN'], errors='coerce') > 240
+    
+    game_info = pd.DataFrame({
+        'GAME_DATE_EST': summary_dates(home['GAME_DATE']).to_numpy(),
+        'HOME_TEAM_ID': home['TEAM_ID'].to_numpy(),
+        'VISITOR_TEAM_ID': away['TEAM_ID'].to_numpy(),
+        'GAME_STATUS_TEXT': np.where(overtime, 'Final/OT', 'Final'),
+    })
+    summaries = {}
+    for i, game_id in enumerate(game_ids):
+        line_score = pd.DataFrame({
+            'TEAM_ID': [home['TEAM_ID'].iat[i], away['TEAM_ID'].iat[i]],
+            'TEAM_ABBREVIATION': [home['TEAM_ABBREVIATION'].iat[i], away['TEAM_ABBREVIATION'].iat[i]],
+            'PTS': [home['PTS'].iat[i], away['PTS'].iat[i]],
+        })
+        summaries[game_id] = {'BoxScoreSummaryV2': [game_info.iloc[[i]].reset_index(drop=True), line_score]}
+    return summaries
+
+def score_games_tiered(games_df, tier2_quantile=None, max_workers=1, requests_per_second=4.0, endpoints=None,
+                       cache=None, rate_limiter=None, dead_letter=None):
+    """
+    Score a game log's games in two tiers, fetching per-game data only where needed.
+    
+    Tier 1 computes the box-score totals of every game from the game log
+    alone, without a request. Tier 2 fetches the traditional and advanced
+    box scores and the play-by-play for the metrics the game log lacks
+    (efficiency, lead changes, clutch time, dunks, star power); the summary
+    call is skipped, its frames are rebuilt from the game log. With
+    tier2_quantile only games whose tier-1 WatchIndex reaches that quantile
+    go to tier 2, the others keep NaN for the tier-2 metrics.
+    
+    Parameters:
+    ----------
+    games_df : pd.DataFrame
+        LeagueGameLog rows (one per team per game) of the games to score
+    tier2_quantile : float, optional
+        Tier-1 WatchIndex quantile (0-1) a game needs to be fetched, every
+        game is fetched when None
+    max_workers : int
+        Number of games fetched concurrently, 1 fetches games one after another
+    requests_per_second : float
+        Starting request rate shared by every endpoint call
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+    cache : ResponseCache, optional
+        Raw response cache for every endpoint call
+    rate_limiter : RateLimiter, optional
+        Limiter shared with other calls
+    dead_letter : DeadLetterQueue, optional
+        Queue failed tier-2 games are recorded in
+        
+    Returns:
+    -------
+    pd.DataFrame
+        One row of raw metrics per game in game log order, with a tier column
+        (1 or 2); tier-2 games that fail keep their tier-1 row
+    """
+    tier1 = compute_game_log_metrics(games_df)
+    if len(tier1) == 0:
+        return pd.DataFrame()
+    
+    order = {game_id: i for i, game_id in enumerate(tier1['game_id'])}
+    tier2_ids = list(order)
+    if tier2_quantile is not None:
+        provisional = compute_watch_index(tier1.copy())
+        cutoff = provisional['WatchIndex'].quantile(tier2_quantile)
+        selected = set(provisional.loc[provisional['WatchIndex'] >= cutoff, 'game_id'])
+        tier2_ids = [game_id for game_id in tier2_ids if game_id in selected]
+    
+    endpoints = GAME_ENDPOINTS if endpoints is None else endpoints
+    endpoints = {name: endpoints[name] for name in TIER2_ENDPOINTS}
+    print(f"Tier 2: fetching {len(tier2_ids)} of {len(tier1)} games, "
+          f"{len(tier2_ids) * len(endpoints)} requests instead of {len(tier1) * len(GAME_ENDPOINTS)}")
+    
+    tier2 = score_games(tier2_ids, max_workers=max_workers, requests_per_second=requests_per_second,
+                        endpoints=endpoints, cache=cache, rate_limiter=rate_limiter, dead_letter=dead_letter,
+                        local_frames=game_log_summaries(games_df, tier2_ids))
+    if len(tier2) > 0:
+        tier2['tier'] = 2
+    
+    tier1 = tier1[~tier1['game_id'].isin(tier2.get('game_id', []))].assign(tier=1)
+    df = pd.concat([tier2, tier1], ignore_index=True).reindex(columns=METRIC_COLUMNS + ['tier'])
+    
+    # Back in game log order
+    return df.iloc[df['game_id'].map(order).argsort(kind='stable')].reset_index(drop=True)
+
+# Percentile ranked metrics
+RANK_COLUMNS = [
+    'total_score', 'pts_per_poss', 'threes_made', 'three_pt_pct', 
+    'avg_ts', 'lead_changes', 'closeness', 'clutch_time',
+    'overtime', 'dunks', 'blocks', 'turnovers', 'steals',
+    'free_throws_attempted', 'max_game_score'
+]
+
+# Some metrics are better when lower
+INVERSE_RANK = ['turnovers']
+
+def rankable(df):
+    """
+    Rows holding every ranked metric.
+    
+    Tables stored by older versions of the generator lack some RANK_COLUMNS,
+    re-ranking their rows would turn the components and WatchIndex into NaN,
+    so those rows keep their stored ranks and scores.
+    
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Watch index rows
+    
+    Returns:
+    -------
+    pd.Series
+        Boolean mask aligned with df's index
+    """
+    return df.reindex(columns=RANK_COLUMNS).notna().all(axis=1)
+
+def normalize_game_ids(game_ids):
+    """
+    NBA game ids as 10 character strings (CSV round trips drop the leading zeros).
+    
+    Parameters:
+    ----------
+    game_ids : pd.Series
+        Game ids as strings or integers
+        
+    Returns:
+    -------
+    pd.Series
+        Zero-padded string game ids
+    """
+    return game_ids.astype(str).str.zfill(10)
+
+def new_ranker():
+    """
+    Empty PercentileRanker over the watch index metrics.
+    """
+    return PercentileRanker(RANK_COLUMNS, INVERSE_RANK)
+
+def load_ranker(path):
+    """
+    Load a persisted ranker, or start an empty one if the file does not exist.
+    
+    Parameters:
+    ----------
+    path : str
+        Ranker file (e.g., 'checkpoints/ranks2024-25.npz')
+        
+    Returns:
+    -------
+    PercentileRanker
+        The stored ranker or an empty one
+    """
+    if os.path.exists(path):
+        return PercentileRanker.load(path)
+    return new_ranker()
+
+def compute_watch_index(df, ranker=None):
+    """
+    Add percentile ranks, component scores and the final WatchIndex.
+    
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        One row per game with the raw metrics from compute_game_metrics
+    ranker : PercentileRanker, optional
+        Ranker the games are added to and ranked against, by default the
+        games are only ranked against each other
+        
+    Returns:
+    -------
+    pd.DataFrame
+        DataFrame sorted by WatchIndex
+    """
+    if len(df) == 0:
+        return df
+    
+    if ranker is None:
+        ranker = new_ranker()
+    
+    with span('compute', stage='rank'):
+        # Calculate percentile ranks for key metrics
+        ranker.add(df)
+        ranks = ranker.percentiles(df)
+        ranker.publish(df['game_id'].drop_duplicates())
+        
+        for col in ranker.columns:
+            if col in df.columns:  # Check if column exists
+                df[f'PR_{col}'] = ranks[f'PR_{col}']
+        
+        df = compute_components(df)
+        
+        # Sort by Watch Index
+        df = df.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    
+    return df
+
+def update_watch_index(stored_df, new_df, ranker, tolerance=0.01):
+    """
+    Merge newly scored games into a stored watch index without re-ranking it all.
+    
+    New games replace stored rows with the same game_id. Percentiles and
+    components are only recomputed for the new games and for stored games
+    whose percentiles moved by more than the tolerance. Stored rows missing
+    ranked metrics (older schemas, see rankable) still count in the
+    percentiles of the metrics they have but keep their stored scores.
+
+    Parameters:
+    ----------
+    stored_df : pd.DataFrame
+        Previously computed watch index
+    new_df : pd.DataFrame
+        Raw metrics of new or recomputed games
+    ranker : PercentileRanker
+        Ranker holding the stored games (games missing from it are added)
+    tolerance : float
+        Largest percentile drift left unpublished
+        
+    Returns:
+    -------
+    tuple
+        (merged watch index sorted by WatchIndex, list of game ids whose rows
+        were recomputed)
+    """
+    stored_df = stored_df.assign(game_id=normalize_game_ids(stored_df['game_id'])) if len(stored_df) > 0 else stored_df
+    new_df = new_df.assign(game_id=normalize_game_ids(new_df['game_id'])) if len(new_df) > 0 else new_df
+    
+    if len(stored_df) > 0:
+        stored_df = stored_df.drop_duplicates(subset=['game_id'], keep='last')
+        ranker.add(stored_df[[game_id not in ranker for game_id in stored_df['game_id']]])
+        stored_df = stored_df[~stored_df['game_id'].isin(new_df.get('game_id', []))]
+    if len(new_df) > 0:
+        new_df = new_df.drop_duplicates(subset=['game_id'], keep='last')
+        ranker.add(new_df)
+    
+    merged = pd.concat([stored_df, new_df], ignore_index=True)
+    if len(merged) == 0:
+        return merged, []
+    
+    rows = merged['game_id'].isin(ranker.changed(tolerance)) & rankable(merged)
+    changed = merged.loc[rows, 'game_id'].tolist()
+    
+    ranks = ranker.stored_percentiles(merged.loc[rows, 'game_id'], index=merged.index[rows])
+    for col in ranker.columns:
+        if col in merged.columns:
+            merged.loc[rows, f'PR_{col}'] = ranks[f'PR_{col}']
+    merged.loc[rows, COMPONENT_COLUMNS] = compute_components(merged[rows].copy())[COMPONENT_COLUMNS]
+    ranker.publish(changed)
+    
+    merged = merged.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    
+    return merged, changed
+
+def compute_tiered_watch_index(df, ranker=None):
+    """
+    compute_watch_index for the output of score_games_tiered.
+    
+    Games left at tier 1 rank as average (0.5) on the tier-2 metrics they
+    lack, so they get a provisional WatchIndex instead of NaN.
+    
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Raw metrics with a tier column
+    ranker : PercentileRanker, optional
+        Ranker the games are added to and ranked against
+        
+    Returns:
+    -------
+    pd.DataFrame
+        DataFrame sorted by WatchIndex
+    """
+    df = compute_watch_index(df, ranker)
+    if len(df) == 0:
+        return df
+    
+    tier1 = df['tier'] == 1
+    if tier1.any():
+        pr_columns = [f'PR_{col}' for col in RANK_COLUMNS if col not in TIER1_COLUMNS and f'PR_{col}' in df.columns]
+        df.loc[tier1, pr_columns] = df.loc[tier1, pr_columns].fillna(0.5)
+        df.loc[tier1, COMPONENT_COLUMNS] = compute_components(df[tier1].copy())[COMPONENT_COLUMNS]
+        df = df.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    
+    return df
+
+# Component scores derived from the PR columns
+COMPONENT_COLUMNS = ['Scoring', 'Competitiveness', 'Highlights', 'Pace', 'StarPower', 'WatchIndex']
+
+def compute_components(df):
+    """
+    Combine the PR columns into the component scores and the final WatchIndex.
+    
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Games with PR_* columns
+        
+    Returns:
+    -------
+    pd.DataFrame
+        The same frame with the COMPONENT_COLUMNS added
+    """
+    # Calculate Watch Index components (weights in watch_index_weights)
+    for name, columns in COMPONENT_WEIGHTS.items():
+        df[name] = sum(weight * df.get(col, 0) for col, weight in columns.items()) / sum(columns.values())
+    
+    # Final Watch Index
+    df['WatchIndex'] = (
+        sum(weight * df[name] for name, weight in WATCH_INDEX_WEIGHTS.items()) /
+        sum(WATCH_INDEX_WEIGHTS.values())
+    )
+    
+    return df
+
+
+def get_basketball_watch_index(season, start_date=None, end_date=None, num_games=None,
+                               max_workers=1, requests_per_second=4.0, endpoints=None, games_df=None,
+                               cache=None, tiered=False, tier2_quantile=None):
     """
     Create a basketball watch index similar to the football version.
     
@@ -64,6 +906,23 @@ def get_basketball_watch_index(season, start_date=None, end_date=None, num_games
         End date in format 'MM/DD/YYYY'
     num_games : int, optional
         Number of most recent games to analyze
+    max_workers : int
+        Number of games fetched concurrently, 1 fetches games one after another
+    requests_per_second : float
+        Starting request rate shared by every endpoint call (adapted to the
+        upstream's responses)
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+    games_df : pd.DataFrame, optional
+        LeagueGameLog frame to use instead of fetching it
+    cache : ResponseCache, optional
+        Raw response cache for every endpoint call (offline caches never hit the network)
+    tiered : bool
+        Score with score_games_tiered: box-score totals from the game log,
+        per-game endpoints only for the remaining metrics
+    tier2_quantile : float, optional
+        With tiered, only fetch games whose tier-1 WatchIndex reaches this
+        quantile (0-1), the others get a provisional WatchIndex
         
     Returns:
     -------
@@ -71,7 +930,8 @@ def get_basketball_watch_index(season, start_date=None, end_date=None, num_games
         DataFrame with watch index and component metrics
     """
     # Get game IDs for the specified season and date range
-    games_df = LeagueGameLog(season=season).get_data_frames()[0]
+    if games_df is None:
+        games_df = get_game_log(season, cache=cache)
     
     # Filter by date if specified
     if start_date:
@@ -88,283 +948,510 @@ def get_basketball_watch_index(season, start_date=None, end_date=None, num_games
     else:
         game_ids = games_df['GAME_ID'].unique()
     
-    results = []
+    if tiered:
+        df = score_games_tiered(games_df[games_df['GAME_ID'].isin(game_ids)], tier2_quantile=tier2_quantile,
+                                max_workers=max_workers, requests_per_second=requests_per_second,
+                                endpoints=endpoints, cache=cache)
+        return compute_tiered_watch_index(df)
     
-    for i, game_id in enumerate(game_ids):
-        try:
-            print(f"Processing game {i+1}/{len(game_ids)}: {game_id}")
-            
-            # Basic game information
-            game_summary = BoxScoreSummaryV2(game_id=game_id).get_data_frames()
-            game_info = game_summary[0]
-            line_score = game_summary[1]
-            
-            # Team stats
-            traditional_stats = BoxScoreTraditionalV2(game_id=game_id).get_data_frames()[0]
-            advanced_stats = BoxScoreAdvancedV2(game_id=game_id).get_data_frames()[0]
-            
-            # Play-by-play data
-            pbp = PlayByPlayV2(game_id=game_id).get_data_frames()[0]
-            
-            # Get team IDs and names
-            home_team_id = game_info['HOME_TEAM_ID'].iloc[0]
-            away_team_id = game_info['VISITOR_TEAM_ID'].iloc[0]
-            
-            home_team_abbr = line_score[line_score['TEAM_ID'] == home_team_id]['TEAM_ABBREVIATION'].iloc[0]
-            away_team_abbr = line_score[line_score['TEAM_ID'] == away_team_id]['TEAM_ABBREVIATION'].iloc[0]
-            
-            game_date = game_info['GAME_DATE_EST'].iloc[0]
-            
-            # SCORING METRICS
-            # ---------------------------------------
-            
-            # Total score and pace
-            home_score = int(line_score[line_score['TEAM_ID'] == home_team_id]['PTS'].iloc[0])
-            away_score = int(line_score[line_score['TEAM_ID'] == away_team_id]['PTS'].iloc[0])
-            total_score = home_score + away_score
-            
-            # Points per possession
-            home_poss = advanced_stats[advanced_stats['TEAM_ID'] == home_team_id]['POSS'].mean()
-            away_poss = advanced_stats[advanced_stats['TEAM_ID'] == away_team_id]['POSS'].mean()
-            avg_poss = (home_poss + away_poss) / 2
-            pts_per_poss = total_score / avg_poss if avg_poss > 0 else 0
-            
-            # 3-POINT METRICS
-            # ---------------------------------------
-            home_3pm = int(traditional_stats[traditional_stats['TEAM_ID'] == home_team_id]['FG3M'].sum())
-            away_3pm = int(traditional_stats[traditional_stats['TEAM_ID'] == away_team_id]['FG3M'].sum())
-            threes_made = home_3pm + away_3pm
-            
-            home_3pa = int(traditional_stats[traditional_stats['TEAM_ID'] == home_team_id]['FG3A'].sum())
-            away_3pa = int(traditional_stats[traditional_stats['TEAM_ID'] == away_team_id]['FG3A'].sum())
-            threes_attempted = home_3pa + away_3pa
-            
-            three_pt_pct = threes_made / threes_attempted if threes_attempted > 0 else 0
-            
-            # EFFICIENCY METRICS
-            # ---------------------------------------
-            # True Shooting
-            home_ts = advanced_stats[advanced_stats['TEAM_ID'] == home_team_id]['TS_PCT'].mean()
-            away_ts = advanced_stats[advanced_stats['TEAM_ID'] == away_team_id]['TS_PCT'].mean()
-            avg_ts = (home_ts + away_ts) / 2
-            
-            # COMPETITIVENESS METRICS
-            # ---------------------------------------
-            # Final score difference
-            score_diff = abs(home_score - away_score)
-            closeness = 1 - (score_diff / total_score if total_score > 0 else 0)
-            
-            # Calculate lead changes from play-by-play data
-            lead_changes = 0
-            last_leader = None
-            
-            # Filter for scoring plays
-            scoring_plays = pbp[pbp['SCORE'].notna()]
-            
-            for _, play in scoring_plays.iterrows():
-                if isinstance(play['SCORE'], str) and '-' in play['SCORE']:
-                    try:
-                        score_parts = play['SCORE'].split(' - ')
-                        if len(score_parts) == 2:
-                            away_score_pbp = int(score_parts[0])
-                            home_score_pbp = int(score_parts[1])
-                            
-                            current_leader = None
-                            if home_score_pbp > away_score_pbp:
-                                current_leader = 'HOME'
-                            elif away_score_pbp > home_score_pbp:
-                                current_leader = 'AWAY'
-                            
-                            if current_leader and last_leader and current_leader != last_leader:
-                                lead_changes += 1
-                            
-                            last_leader = current_leader
-                    except:
-                        pass
-            
-            # Calculate clutch time (4th quarter/OT within 5 points)
-            late_game = pbp[(pbp['PERIOD'] >= 4)]
-            clutch_plays = 0
-            total_late_plays = len(late_game)
-            
-            for _, play in late_game.iterrows():
-                if isinstance(play['SCORE'], str) and '-' in play['SCORE']:
-                    try:
-                        score_parts = play['SCORE'].split(' - ')
-                        if len(score_parts) == 2:
-                            away_score_pbp = int(score_parts[0])
-                            home_score_pbp = int(score_parts[1])
-                            diff = abs(home_score_pbp - away_score_pbp)
-                            if diff <= 5:
-                                clutch_plays += 1
-                    except:
-                        pass
-            
-            clutch_time = clutch_plays / total_late_plays if total_late_plays > 0 else 0
-            
-            # Check if the game went to overtime
-            overtime = 1 if game_info['GAME_STATUS_TEXT'].iloc[0].startswith('Final/OT') else 0
-            
-            # HIGHLIGHT METRICS
-            # ---------------------------------------
-            # Dunks and blocks (approximation)
-            dunks = 0
-            blocks = int(traditional_stats['BLK'].sum())
-            
-            # Get counts for highlight moments from play-by-play
-            for _, play in pbp.iterrows():
-                description = str(play['HOMEDESCRIPTION']).lower() if not pd.isna(play['HOMEDESCRIPTION']) else ""
-                description += str(play['VISITORDESCRIPTION']).lower() if not pd.isna(play['VISITORDESCRIPTION']) else ""
-                
-                if 'dunk' in description:
-                    dunks += 1
-            
-            # PACE & CHAOS METRICS
-            # ---------------------------------------
-            # Turnovers
-            home_to = int(traditional_stats[traditional_stats['TEAM_ID'] == home_team_id]['TO'].sum())
-            away_to = int(traditional_stats[traditional_stats['TEAM_ID'] == away_team_id]['TO'].sum())
-            turnovers = home_to + away_to
-            
-            # Steals 
-            steals = int(traditional_stats['STL'].sum())
-            
-            # Free throws
-            free_throws_attempted = int(traditional_stats['FTA'].sum())
-            
-            # Net rating difference
-            home_net = advanced_stats[advanced_stats['TEAM_ID'] == home_team_id]['NET_RATING'].mean()
-            away_net = advanced_stats[advanced_stats['TEAM_ID'] == away_team_id]['NET_RATING'].mean()
-            net_rating_diff = abs(home_net - away_net)
-            
-            # STAR POWER METRICS
-            # ---------------------------------------
-            # Player with highest Game Score
-            player_traditional = traditional_stats[traditional_stats['MIN'] >= 15]  # Min 15 minutes played
-            
-            # Calculate Game Score (simplified version of John Hollinger's formula)
-            player_traditional['GAME_SCORE'] = (
-                player_traditional['PTS'] + 
-                0.4 * player_traditional['FGM'] - 
-                0.7 * player_traditional['FGA'] - 
-                0.4 * (player_traditional['FTA'] - player_traditional['FTM']) + 
-                0.7 * player_traditional['OREB'] + 
-                0.3 * player_traditional['DREB'] + 
-                player_traditional['STL'] + 
-                0.7 * player_traditional['AST'] + 
-                0.7 * player_traditional['BLK'] - 
-                0.4 * player_traditional['PF'] - 
-                player_traditional['TO']
-            )
-            
-            max_game_score = player_traditional['GAME_SCORE'].max()
-            star_player = player_traditional[player_traditional['GAME_SCORE'] == max_game_score]['PLAYER_NAME'].iloc[0]
-            
-            # Collect all metrics
-            game_data = {
-                'game_id': game_id,
-                'game_date': game_date,
-                'home_team': home_team_abbr,
-                'away_team': away_team_abbr,
-                'home_score': home_score,
-                'away_score': away_score,
-                'total_score': total_score,
-                'pts_per_poss': pts_per_poss,
-                'threes_made': threes_made,
-                'threes_attempted': threes_attempted,
-                'three_pt_pct': three_pt_pct,
-                'avg_ts': avg_ts,
-                'lead_changes': lead_changes,
-                'score_diff': score_diff,
-                'closeness': closeness,
-                'clutch_time': clutch_time,
-                'overtime': overtime,
-                'dunks': dunks,
-                'blocks': blocks,
-                'turnovers': turnovers,
-                'steals': steals,
-                'free_throws_attempted': free_throws_attempted,
-                'net_rating_diff': net_rating_diff,
-                'star_player': star_player,
-                'max_game_score': max_game_score
-            }
-            
-            results.append(game_data)
+    df = score_games(game_ids, max_workers=max_workers, requests_per_second=requests_per_second,
+                     endpoints=endpoints, cache=cache)
+    
+    return compute_watch_index(df)
+
+def score_games(game_ids, max_workers=1, requests_per_second=4.0, endpoints=None, cache=None,
+                rate_limiter=None, retry=None, dead_letter=None, requeue=True, local_frames=None):
+    """
+    Fetch and score games, returning their raw (unranked) metrics.
+    
+    Requests go through an adaptive rate limiter and are retried with
+    exponential backoff. Games that still fail are recorded in the dead
+    letter queue and, with requeue, fetched once more after every other game.
+    Games that are fetched but cannot be scored are recorded there too.
+    
+    Parameters:
+    ----------
+    game_ids : list
+        Game ids to score
+    max_workers : int
+        Number of games fetched concurrently, 1 fetches games one after another
+    requests_per_second : float
+        Starting request rate shared by every endpoint call
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+    cache : ResponseCache, optional
+        Raw response cache for every endpoint call
+    rate_limiter : RateLimiter, optional
+        Limiter shared with other calls, defaults to a new AdaptiveRateLimiter
+    retry : BackoffPolicy, optional
+        Per-request backoff, defaults to BackoffPolicy()
+    dead_letter : DeadLetterQueue, optional
+        Queue failed games are recorded in (and scored games removed from)
+    requeue : bool
+        Retry the failed games once more at the end of the call
+    local_frames : dict, optional
+        Game id to endpoint frames already at hand (e.g. from game_log_summaries),
+        merged into the fetched ones; the games are taken to be final
+        
+    Returns:
+    -------
+    pd.DataFrame
+        One row of raw metrics per game that could be scored
+    """
+    frames_by_game = {}
+    local_frames = {} if local_frames is None else local_frames
+    if rate_limiter is None:
+        rate_limiter = AdaptiveRateLimiter(rate=requests_per_second, burst=max(4, max_workers))
+    retry = BackoffPolicy() if retry is None else retry
+    dead_letter = DeadLetterQueue() if dead_letter is None else dead_letter
+    
+    pending = list(game_ids)
+    for attempt in range(2 if requeue else 1):
+        if len(pending) == 0:
+            break
+        if attempt > 0:
+            print(f"Requeueing {len(pending)} failed games")
+        
+        failed = []
+        fetched = fetch_games(pending, endpoints=endpoints, rate_limiter=rate_limiter, max_workers=max_workers,
+                              cache=cache, retry=retry, ttl=(lambda frames: None) if local_frames else game_ttl)
+        for i, (game_id, frames, error) in enumerate(fetched):
+            print(f"Processing game {i+1}/{len(pending)}: {game_id}")
             
-            # Avoid hitting API rate limits
-            time.sleep(0.5)
+            if error is None:
+                try:
+                    frames.update(local_frames.get(game_id, {}))
+                    # Keep only the play-by-play columns the kernel needs
+                    frames['PlayByPlayV2'] = [frames['PlayByPlayV2'][0][PBP_EVENT_COLUMNS]]
+                    frames_by_game[game_id] = frames
+                    continue
+                except Exception as e:
+                    error = e
             
-        except Exception as e:
-            print(f"Error processing game {game_id}: {e}")
+            print(f"Error processing game {game_id}: {error}")
+            count('games_failed')
+            event('game_failed', game_id=game_id, error=f"{type(error).__name__}: {error}")
+            dead_letter.add(game_id, error)
+            failed.append(game_id)
+        pending = failed
     
-    # Create DataFrame from results
-    df = pd.DataFrame(results)
+    # Score every fetched game in one batch
+    scoring_errors = {}
+    try:
+        df = compute_games_metrics(frames_by_game, errors=scoring_errors)
+    except Exception:
+        # A game broke the batch, score the games one at a time to isolate it
+        scored = []
+        for game_id, frames in frames_by_game.items():
+            try:
+                scored.append(compute_games_metrics({game_id: frames}, errors=scoring_errors))
+            except Exception as e:
+                print(f"Error processing game {game_id}: {e}")
+                count('games_unscoreable')
+                scoring_errors[game_id] = e
+        scored = [frame for frame in scored if len(frame) > 0]
+        df = pd.concat(scored, ignore_index=True) if scored else pd.DataFrame()
     
-    if len(df) == 0:
-        return df
+    # Games that were fetched but could not be scored are queued like failed fetches
+    for game_id, error in scoring_errors.items():
+        event('game_failed', game_id=game_id, error=f"{type(error).__name__}: {error}")
+        dead_letter.add(game_id, error)
+    for game_id in df.get('game_id', []):
+        dead_letter.discard(game_id)
     
-    # Calculate percentile ranks for key metrics
-    rank_columns = [
-        'total_score', 'pts_per_poss', 'threes_made', 'three_pt_pct', 
-        'avg_ts', 'lead_changes', 'closeness', 'clutch_time',
-        'overtime', 'dunks', 'blocks', 'turnovers', 'steals',
-        'free_throws_attempted', 'max_game_score'
-    ]
-    
-    # Some metrics are better when lower
-    inverse_rank = ['turnovers']
-    
-    for col in rank_columns:
-        if col in df.columns:  # Check if column exists
-            if col in inverse_rank:
-                df[f'PR_{col}'] = 1 - df[col].rank(pct=True)
-            else:
-                df[f'PR_{col}'] = df[col].rank(pct=True)
-    
-    # Calculate Watch Index components
-    df['Scoring'] = (
-        df.get('PR_total_score', 0) + 
-        df.get('PR_pts_per_poss', 0) + 
-        df.get('PR_threes_made', 0) + 
-        df.get('PR_avg_ts', 0)
-    ) / 4
-    
-    df['Competitiveness'] = (
-        2 * df.get('PR_lead_changes', 0) + 
-        2 * df.get('PR_closeness', 0) + 
-        2 * df.get('PR_clutch_time', 0) + 
-        1 * df.get('PR_overtime', 0)
-    ) / 7
-    
-    df['Highlights'] = (
-        df.get('PR_dunks', 0) + 
-        df.get('PR_blocks', 0) + 
-        df.get('PR_steals', 0)
-    ) / 3
-    
-    df['Pace'] = (
-        df.get('PR_pts_per_poss', 0) + 
-        df.get('PR_turnovers', 0) + 
-        df.get('PR_free_throws_attempted', 0) * 0.5
-    ) / 2.5
-    
-    df['StarPower'] = df.get('PR_max_game_score', 0)
+    dead_letter.save()
+    failed = len(pending) + len(scoring_errors)
+    if failed > 0:
+        print(f"{failed} games failed and are kept in the dead letter queue")
     
-    # Final Watch Index
-    df['WatchIndex'] = (
-        2 * df['Scoring'] + 
-        3 * df['Competitiveness'] + 
-        1.5 * df['Highlights'] + 
-        1 * df['Pace'] + 
-        0.5 * df['StarPower']
-    ) / 8
+    count('games_processed', len(df))
+    return df
+
+def recompute_from_cache(seasons, cache_dir="checkpoints/raw_cache"):
+    """
+    Recompute the watch index for cached seasons without touching the network.
     
-    # Sort by Watch Index
-    df = df.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    Parameters:
+    ----------
+    seasons : list
+        Seasons in format 'YYYY-YY' whose raw responses are cached
+    cache_dir : str
+        Directory of the raw response cache
+        
+    Returns:
+    -------
+    pd.DataFrame
+        Watch index for every game of the given seasons found in the cache
+    """
+    cache = ResponseCache(cache_dir, offline=True)
     
-    return df
+    season_dfs = []
+    for season in seasons:
+        season_df = get_basketball_watch_index(season, cache=cache, max_workers=8, requests_per_second=1e6)
+        season_df['season'] = season
+        season_dfs.append(season_df)
+    
+    return pd.concat(season_dfs, ignore_index=True)
+
+def read_watch_index_csv(path):
+    """
+    Read a legacy CSV watch index table, empty when the file does not exist.
+    
+    Floats are parsed round-trip exact so a reloaded table ranks exactly
+    like the frame that was written.
+    
+    Parameters:
+    ----------
+    path : str
+        CSV written by an older process_single_season or refresh_watch_index
+        
+    Returns:
+    -------
+    pd.DataFrame
+        The stored table with string game ids
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype={'game_id': str}, float_precision='round_trip')
+
+def store_dir(checkpoint_dir):
+    """
+    Parquet store of the season tables inside a checkpoint directory.
+    """
+    return os.path.join(checkpoint_dir, "watch_index_store")
+
+def save_season(season_df, season, checkpoint_dir="checkpoints"):
+    """
+    Write a season's table to the Parquet store and upsert it into the
+    SQLite game store (watch_index.db) of a checkpoint directory. The
+    Parquet store is authoritative, the game store is written after it.
+    """
+    write_season(season_df, season, store_dir(checkpoint_dir))
+    upsert_games(season_df.assign(season=season), os.path.join(checkpoint_dir, "watch_index.db"))
+
+def load_season_table(season, checkpoint_dir="checkpoints"):
+    """
+    Read a season's stored watch index.
+    
+    The Parquet store is read first, with its float32 PR and component
+    columns widened back to float64. Checkpoint directories that were never
+    migrated fall back to the legacy watch_index<season>.csv.
+    
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY'
+    checkpoint_dir : str
+        Directory holding the checkpoint files
+        
+    Returns:
+    -------
+    pd.DataFrame
+        The season's table, empty when nothing is stored
+    """
+    season_df = read_season(season, store_dir(checkpoint_dir))
+    if len(season_df) > 0:
+        # The store keeps the ranks and scores as float32, the generator works in float64
+        float32_columns = season_df.select_dtypes('float32').columns
+        return season_df.astype({col: 'float64' for col in float32_columns})
+    return read_watch_index_csv(os.path.join(checkpoint_dir, f"watch_index{season}.csv"))
+
+def process_single_season(season, num_games=None, checkpoint_dir="checkpoints", max_workers=4,
+                          requests_per_second=4.0, endpoints=None, cache=None, batch_size=25):
+    """
+    Process a single season with crash-safe checkpointing.
+    
+    Scored games are appended in batches to records<season>.jsonl, so the
+    checkpoint cost per game stays constant. When the season is done the
+    log is compacted atomically into the season's partition of the Parquet
+    store (checkpoint_dir/watch_index_store). A rerun
+    resumes from the table plus whatever is left in the log.
+    
+    Games that fail are kept in failed_games<season>.json and retried at the
+    end of the run (and of every later run) until they can be scored.
+    
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY' (e.g., '2022-23')
+    num_games : int or None
+        Number of games to analyze. If None, all games.
+    checkpoint_dir : str
+        Directory to store checkpoint files
+    max_workers : int
+        Number of games fetched concurrently
+    requests_per_second : float
+        Starting request rate shared by every endpoint call (adapted to the
+        upstream's responses)
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+    cache : ResponseCache, optional
+        Raw response cache for every endpoint call
+    batch_size : int
+        Games scored and logged together
+    
+    Returns:
+    -------
+    pd.DataFrame
+        DataFrame with watch index for the season
+    """
+    Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+    log = CheckpointLog(os.path.join(checkpoint_dir, f"records{season}.jsonl"))
+    
+    # Resume: the compacted table plus the records logged since
+    stored_df = load_season_table(season, checkpoint_dir)
+    logged_df = log.replay()
+    done = set()
+    for frame in (stored_df, logged_df):
+        if len(frame) > 0:
+            done |= set(normalize_game_ids(frame['game_id']))
+    print(f"Found {len(done)} already processed games")
+    
+    games_df = get_game_log(season, cache=cache)
+    unique_game_ids = normalize_game_ids(pd.Series(games_df['GAME_ID'].unique(), dtype=object)).tolist()
+    if num_games and num_games < len(unique_game_ids):
+        unique_game_ids = unique_game_ids[:num_games]
+    
+    games_to_process = [g for g in unique_game_ids if g not in done]
+    print(f"{len(games_to_process)} games left to process for {season}")
+    
+    # One adaptive limiter for the whole run, so the learned rate carries over batches
+    rate_limiter = AdaptiveRateLimiter(rate=requests_per_second, burst=max(4, max_workers))
+    dead_letter = DeadLetterQueue(os.path.join(checkpoint_dir, f"failed_games{season}.json"))
+    
+    # Games that failed in an earlier run go last
+    games_to_process = ([g for g in games_to_process if g not in dead_letter] +
+                        [g for g in games_to_process if g in dead_letter])
+    
+    for start in range(0, len(games_to_process), batch_size):
+        batch = games_to_process[start:start + batch_size]
+        batch_df = score_games(batch, max_workers=max_workers, endpoints=endpoints, cache=cache,
+                               rate_limiter=rate_limiter, dead_letter=dead_letter, requeue=False)
+        if len(batch_df) > 0:
+            batch_df['season'] = season
+            log.append(batch_df)
+        print(f"Checkpoint saved after {start + len(batch)} games")
+    
+    # Requeue the games that are still failing at the end of the run
+    to_process = set(games_to_process)
+    requeue_ids = [g for g in dead_letter.ids() if g in to_process]
+    if len(requeue_ids) > 0:
+        print(f"Retrying {len(requeue_ids)} failed games")
+        retry_df = score_games(requeue_ids, max_workers=max_workers, endpoints=endpoints, cache=cache,
+                               rate_limiter=rate_limiter, dead_letter=dead_letter, requeue=False)
+        if len(retry_df) > 0:
+            retry_df['season'] = season
+            log.append(retry_df)
+    
+    # Compact: raw records of the table and the log, ranked once
+    season_df, ranker = merge_season_records(season, stored_df, log.replay(), checkpoint_dir)
+    if ranker is None:
+        print("No valid games found.")
+        return season_df
+    
+    # The table and its ranker are both written before the log is emptied
+    def save(table):
+        save_season(table, season, checkpoint_dir)
+        ranker.save(os.path.join(checkpoint_dir, f"ranks{season}.npz"))
+    log.compact(season_df, save)
+    
+    return season_df
+
+def merge_season_records(season, stored_df, logged_df, checkpoint_dir="checkpoints"):
+    """
+    Rank a season's stored table together with newly logged raw records.
+    
+    Parameters:
+    ----------
+    season : str
+        Season in format 'YYYY-YY'
+    stored_df : pd.DataFrame
+        The season's stored watch index (may be empty)
+    logged_df : pd.DataFrame
+        Raw metrics of games scored since the table was stored
+    checkpoint_dir : str
+        Directory holding the season's ranks<season>.npz
+        
+    Returns:
+    -------
+    tuple
+        (season watch index, PercentileRanker to persist), the ranker is None
+        when there is nothing to rank
+    """
+    raw_columns = METRIC_COLUMNS + ['season']
+    if len(stored_df) == 0 and len(logged_df) == 0:
+        return pd.DataFrame(), None
+    logged_df = logged_df[[col for col in raw_columns if col in logged_df.columns]] if len(logged_df) > 0 else pd.DataFrame()
+    
+    ranks_file = os.path.join(checkpoint_dir, f"ranks{season}.npz")
+    if len(stored_df) > 0 and os.path.exists(ranks_file):
+        # The ranker holds every stored game, only the logged ones are added
+        ranker = load_ranker(ranks_file)
+        print(f"Merging {len(logged_df)} logged games into the stored {season} table")
+    else:
+        # Every game is ranked afresh, stored rows of older schemas keep their scores
+        ranker = new_ranker()
+        print(f"Calculating watch index for {len(stored_df) + len(logged_df)} games from {season}")
+    
+    season_df, _ = update_watch_index(stored_df, logged_df, ranker, tolerance=0)
+    return season_df, ranker
+
+def get_multiple_seasons_watch_index(seasons=None, num_games_per_season=None, checkpoint_dir="checkpoints",
+                                     **kwargs):
+    """
+    Create a basketball watch index for multiple seasons with checkpointing.
+    
+    Parameters:
+    ----------
+    seasons : list
+        List of seasons in format ['YYYY-YY'] (e.g., ['2022-23', '2021-22'])
+        If None, will use the last 5 seasons
+    num_games_per_season : int or None
+        Number of games to analyze per season. If None, all games.
+    checkpoint_dir : str
+        Directory to store checkpoint files
+    **kwargs
+        Passed on to process_single_season
+        
+    Returns:
+    -------
+    pd.DataFrame
+        DataFrame with watch index and component metrics for all seasons
+    """
+    if seasons is None:
+        start_year = int(current_season()[:4])
+        seasons = [f"{year}-{str(year + 1)[-2:]}" for year in range(start_year, start_year - 5, -1)]
+    
+    season_dfs = []
+    for season in seasons:
+        print(f"\n=== Processing season {season} ===")
+        season_df = process_single_season(season, num_games_per_season, checkpoint_dir, **kwargs)
+        if len(season_df) > 0:
+            season_dfs.append(season_df)
+    
+    if len(season_dfs) == 0:
+        return pd.DataFrame()
+    
+    all_results = pd.concat(season_dfs, ignore_index=True)
+    all_results = all_results.drop_duplicates(subset=['game_id'], keep='last')
+    all_results = all_results.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    print(f"Stored {len(all_results)} games across {len(season_dfs)} seasons in {store_dir(checkpoint_dir)}")
+    
+    return all_results
+
+def current_season(date=None):
+    """
+    Season a date belongs to, in format 'YYYY-YY'.
+    
+    Parameters:
+    ----------
+    date : datetime, optional
+        Defaults to now
+        
+    Returns:
+    -------
+    str
+        Season string (e.g., '2024-25')
+    """
+    date = datetime.now() if date is None else date
+    year = date.year
+    if date.month >= 10:  # New season starts in October
+        return f"{year}-{str(year+1)[-2:]}"
+    return f"{year-1}-{str(year)[-2:]}"
+
+def load_processed_games(path):
+    """
+    Load a processed_games<season>.json file as a set of normalized game ids.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r') as f:
+        return set(normalize_game_ids(pd.Series(json.load(f), dtype=object)))
+
+def save_processed_games(path, processed_games):
+    """
+    Atomically write the set of processed game ids.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(sorted(processed_games), f)
+    os.replace(tmp_path, path)
 
-def get_recent_games_watch_index(days_back=7):
+def refresh_watch_index(season=None, checkpoint_dir="checkpoints", max_workers=4,
+                        requests_per_second=4.0, endpoints=None, cache=None, tolerance=0.01):
+    """
+    Incrementally bring a season's stored watch index up to date.
+    
+    Diffs the season's game log against processed_games<season>.json, fetches
+    and scores only the games not processed yet, and merges them into the
+    season's table in the Parquet store. Only new games and stored games whose
+    percentiles drift by more than the tolerance are re-ranked.
+    
+    Parameters:
+    ----------
+    season : str, optional
+        Season in format 'YYYY-YY', defaults to the current season
+    checkpoint_dir : str
+        Directory holding the season's checkpoint files
+    max_workers : int
+        Number of games fetched concurrently
+    requests_per_second : float
+        Starting request rate shared by every endpoint call (adapted to the
+        upstream's responses)
+    endpoints : dict, optional
+        Endpoint name to callable(game_id), defaults to the nba_api endpoints
+    cache : ResponseCache, optional
+        Raw response cache for every endpoint call
+    tolerance : float
+        Largest percentile drift of a stored game left unpublished
+        
+    Returns:
+    -------
+    pd.DataFrame
+        The season's updated watch index
+    """
+    season = current_season() if season is None else season
+    Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+    
+    processed_games_file = os.path.join(checkpoint_dir, f"processed_games{season}.json")
+    ranker_file = os.path.join(checkpoint_dir, f"ranks{season}.npz")
+    
+    processed_games = load_processed_games(processed_games_file)
+    stored_df = load_season_table(season, checkpoint_dir)
+    if len(stored_df) > 0:
+        processed_games |= set(normalize_game_ids(stored_df['game_id']))
+    
+    games_df = get_game_log(season, cache=cache)
+    season_ids = normalize_game_ids(pd.Series(games_df['GAME_ID'].unique(), dtype=object))
+    new_ids = [game_id for game_id in season_ids if game_id not in processed_games]
+    print(f"{len(new_ids)} new games to process for {season}")
+    
+    if len(new_ids) == 0:
+        return stored_df
+    
+    dead_letter = DeadLetterQueue(os.path.join(checkpoint_dir, f"failed_games{season}.json"))
+    new_df = score_games(new_ids, max_workers=max_workers, requests_per_second=requests_per_second,
+                         endpoints=endpoints, cache=cache, dead_letter=dead_letter)
+    if len(new_df) == 0:
+        return stored_df
+    new_df['season'] = season
+    
+    ranker = load_ranker(ranker_file)
+    merged, changed = update_watch_index(stored_df, new_df, ranker, tolerance=tolerance)
+    print(f"Added {len(new_df)} games, re-ranked {len(changed)} games for {season}")
+    
+    save_season(merged, season, checkpoint_dir)
+    ranker.save(ranker_file)
+    save_processed_games(processed_games_file, processed_games | set(new_df['game_id']))
+    
+    # Roll the pre-game model's team features forward with the new games
+    from watch_index_predict import update_predictor
+    update_predictor(merged[merged['game_id'].isin(new_df['game_id'])],
+                     os.path.join(checkpoint_dir, "watch_predictor.npz"))
+    
+    return merged
+
+def get_recent_games_watch_index(days_back=7, incremental=False, checkpoint_dir="checkpoints"):
     """
     Get watch index for games in the recent past
     
@@ -372,6 +1459,11 @@ def get_recent_games_watch_index(days_back=7):
     ----------
     days_back : int
         How many days to look back
+    incremental : bool
+        Refresh the stored season index with refresh_watch_index (fetching
+        only unprocessed games) instead of reprocessing the whole window
+    checkpoint_dir : str
+        Directory holding the stored season index when incremental
     
     Returns:
     -------
@@ -385,17 +1477,18 @@ def get_recent_games_watch_index(days_back=7):
     start_str = start_date.strftime('%m/%d/%Y')
     end_str = end_date.strftime('%m/%d/%Y')
     
-    # Determine season based on date
-    year = end_date.year
-    month = end_date.month
-    if month >= 10:  # New season starts in October
-        season = f"{year}-{str(year+1)[-2:]}"
-    else:
-        season = f"{year-1}-{str(year)[-2:]}"
+    season = current_season(end_date)
+    
+    if incremental:
+        season_df = refresh_watch_index(season, checkpoint_dir=checkpoint_dir)
+        if len(season_df) == 0:
+            return season_df
+        game_dates = pd.to_datetime(season_df['game_date'].astype(str).str[:10])
+        return season_df[game_dates >= start_date.strftime('%Y-%m-%d')].reset_index(drop=True)
     
     return get_basketball_watch_index(season, start_date=start_str, end_date=end_str)
 
-def get_watchability_preview(date_str=None):
+def get_watchability_preview(date_str=None, cache=None, predictor=None):
     """
     Preview upcoming games with predicted watchability
     
@@ -403,6 +1496,11 @@ def get_watchability_preview(date_str=None):
     ----------
     date_str : str
         Date in format 'MM/DD/YYYY', defaults to today
+    cache : ResponseCache, optional
+        Raw response cache (scoreboard entries expire after LIVE_TTL)
+    predictor : WatchPredictor, optional
+        Pre-game model, defaults to the trained model in checkpoints (loaded
+        on first use), games are listed without predictions when there is none
     
     Returns:
     -------
@@ -420,44 +1518,39 @@ def get_watchability_preview(date_str=None):
     year = date.year
     
     # Get scoreboard for the given day
-    scoreboard = ScoreboardV2(month=month, day=day, year=year).get_data_frames()
+    def call():
+        from nba_api.stats.endpoints import ScoreboardV2
+        with span('request', endpoint='ScoreboardV2'):
+            return ScoreboardV2(month=month, day=day, year=year).get_data_frames()
+    if cache is None:
+        scoreboard = call()
+    else:
+        scoreboard = cache.fetch('ScoreboardV2', {'month': month, 'day': day, 'year': year}, call, ttl=LIVE_TTL)
     game_header = scoreboard[0]
     
-    # Extract team info
-    team_ids = pd.concat([
-        game_header[['HOME_TEAM_ID', 'VISITOR_TEAM_ID']]
-    ]).values.flatten()
-    
-    # We would need previous results to predict game watchability
-    # This is a simplified approach that would need refining with historical data
+    # The game header only has team ids, the line score has their abbreviations
+    line_score = scoreboard[1]
+    abbreviations = dict(zip(line_score['TEAM_ID'], line_score['TEAM_ABBREVIATION']))
     
-    # Return a simple DataFrame with game info
     games_preview = pd.DataFrame({
         'game_id': game_header['GAME_ID'],
-        'home_team': game_header['HOME_TEAM_ABBREVIATION'],
-        'away_team': game_header['VISITOR_TEAM_ABBREVIATION'],
+        'home_team': game_header['HOME_TEAM_ID'].map(abbreviations),
+        'away_team': game_header['VISITOR_TEAM_ID'].map(abbreviations),
         'game_time': game_header['GAME_STATUS_TEXT'],
-        # Actual watch index would need prediction model
     })
     
+    # Predicted components and WatchIndex from the teams' recent games
+    if predictor is None:
+        from watch_index_predict import load_predictor
+        predictor = load_predictor()
+    if predictor is not None and len(games_preview) > 0:
+        predicted = predictor.predict(games_preview['home_team'], games_preview['away_team'])
+        games_preview = pd.concat([games_preview, predicted.set_index(games_preview.index)], axis=1)
+        games_preview = games_preview.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+    
     return games_preview
 
-# Example usage
 if __name__ == "__main__":
-    # Get watch index for recent NBA games
-    recent_games = get_recent_games_watch_index(days_back=14)
-    
-    # Display top 10 most watchable games
-    print("Top 10 Most Watchable Recent Games:")
-    if len(recent_games) > 0:
-        top_games = recent_games[['game_date', 'home_team', 'away_team', 
-                                 'home_score', 'away_score', 'WatchIndex', 
-                                 'lead_changes', 'clutch_time', 'overtime']][:10]
-        print(top_games)
-    else:
-        print("No games found in the specified period.")
-    
-    # Preview upcoming games
-    upcoming = get_watchability_preview()
-    print("\nUpcoming Games:")
-    print(upcoming)
\ No newline at end of file
+    # Batch jobs (backfill, refresh, preview, recompute-from-cache, export) live in the CLI
+    from watch_index_cli import main
+    main()
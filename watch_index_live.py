@@ -0,0 +1,443 @@
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from watch_index_cache import CacheMiss, ResponseCache
+from watch_index_fetch import GAME_ENDPOINTS, RateLimiter, fetch_game
+from watch_index_generation import (RANK_COLUMNS, SCORE_PATTERN, compute_components, get_watchability_preview,
+                                    load_ranker, new_ranker)
+
+
+SCORE_RE = re.compile(SCORE_PATTERN)
+
+# Period lengths in seconds
+QUARTER_SECONDS = 12 * 60
+OVERTIME_SECONDS = 5 * 60
+REGULATION_SECONDS = 4 * QUARTER_SECONDS
+
+# Counting metrics projected to a full game before a live game is ranked
+PROJECTED_COLUMNS = ['total_score', 'lead_changes', 'dunks']
+
+# PlayByPlayV2 event type of the end of a period
+END_OF_PERIOD = 13
+
+
+def period_start(period):
+    """
+    Game seconds elapsed when a period starts.
+    """
+    period = int(period)
+    if period <= 4:
+        return (period - 1) * QUARTER_SECONDS
+    return REGULATION_SECONDS + (period - 5) * OVERTIME_SECONDS
+
+
+def elapsed_seconds(period, clock=None):
+    """
+    Game seconds elapsed at a play.
+
+    Parameters:
+    ----------
+    period : int
+        Period of the play (5 and up are overtimes)
+    clock : str, optional
+        Time left in the period as 'MM:SS' (PCTIMESTRING), the start of the
+        period when missing
+
+    Returns:
+    -------
+    float
+        Seconds of game time since tip-off
+    """
+    length = QUARTER_SECONDS if int(period) <= 4 else OVERTIME_SECONDS
+    left = length
+    if isinstance(clock, str) and ':' in clock:
+        minutes, seconds = clock.split(':', 1)
+        left = min(length, 60 * float(minutes) + float(seconds))
+    return period_start(period) + length - left
+
+
+def _text(value):
+    return value.lower() if isinstance(value, str) else ''
+
+
+class LiveGame:
+    """
+    Running play-by-play metrics of one game, updated in O(1) per event.
+
+    Applying a finished game's play-by-play event by event gives the same
+    lead changes, ties, largest lead, clutch time and dunks as
+    compute_pbp_metrics. Events already applied (by EVENTNUM) are skipped, so
+    overlapping polls can be fed in as they come; events arriving late or
+    out of order (corrections inserted after later plays) are still applied.
+
+    Parameters:
+    ----------
+    game_id : str
+        NBA game id
+    home_team : str, optional
+        Home team abbreviation
+    away_team : str, optional
+        Away team abbreviation
+    """
+
+    __slots__ = ['game_id', 'home_team', 'away_team', 'home_score', 'away_score', 'period', 'elapsed',
+                 'leader', 'lead_changes', 'times_tied', 'largest_lead', 'late_plays', 'clutch_plays',
+                 'dunks', 'events', 'seen', 'final']
+
+    def __init__(self, game_id, home_team=None, away_team=None):
+        self.game_id = game_id
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_score = 0
+        self.away_score = 0
+        self.period = 1
+        self.elapsed = 0.0
+        self.leader = None
+        self.lead_changes = 0
+        self.times_tied = 0
+        self.largest_lead = 0
+        self.late_plays = 0
+        self.clutch_plays = 0
+        self.dunks = 0
+        self.events = 0
+        self.seen = set()
+        self.final = False
+
+    def apply(self, event):
+        """
+        Update the metrics with one play-by-play event.
+
+        Parameters:
+        ----------
+        event : dict
+            PlayByPlayV2 row with PERIOD, SCORE, HOMEDESCRIPTION and
+            VISITORDESCRIPTION, and optionally EVENTNUM, PCTIMESTRING and
+            EVENTMSGTYPE
+
+        Returns:
+        -------
+        bool
+            False when the event had already been applied
+        """
+        event_num = event.get('EVENTNUM')
+        if event_num is not None and not pd.isna(event_num):
+            if event_num in self.seen:
+                return False
+            self.seen.add(event_num)
+
+        self.events += 1
+        period = int(event['PERIOD'])
+        self.period = period
+        self.elapsed = max(self.elapsed, elapsed_seconds(period, event.get('PCTIMESTRING')))
+        late = period >= 4
+        self.late_plays += late
+
+        score = event.get('SCORE')
+        match = SCORE_RE.match(score) if isinstance(score, str) else None
+        if match is not None:
+            self.away_score, self.home_score = int(match.group(1)), int(match.group(2))
+            margin = self.home_score - self.away_score
+            leader = int(np.sign(margin))
+            if self.leader is not None and self.leader != 0:
+                if leader != 0 and leader != self.leader:
+                    self.lead_changes += 1
+                elif leader == 0:
+                    self.times_tied += 1
+            self.leader = leader
+            self.largest_lead = max(self.largest_lead, abs(margin))
+            self.clutch_plays += late and abs(margin) <= 5
+
+        if 'dunk' in _text(event.get('HOMEDESCRIPTION')) + _text(event.get('VISITORDESCRIPTION')):
+            self.dunks += 1
+
+        if event.get('EVENTMSGTYPE') == END_OF_PERIOD and period >= 4 and self.home_score != self.away_score:
+            self.final = True
+        return True
+
+    def metrics(self):
+        """
+        Current metrics of the game.
+
+        Returns:
+        -------
+        dict
+            Score, competitiveness and play-by-play metrics, plus the period,
+            the elapsed game seconds and the progress through regulation (0-1)
+        """
+        total_score = self.home_score + self.away_score
+        score_diff = abs(self.home_score - self.away_score)
+        return {
+            'game_id': self.game_id,
+            'home_team': self.home_team,
+            'away_team': self.away_team,
+            'home_score': self.home_score,
+            'away_score': self.away_score,
+            'total_score': total_score,
+            'score_diff': score_diff,
+            'closeness': 1 - score_diff / total_score if total_score > 0 else 0,
+            'overtime': int(self.period > 4),
+            'lead_changes': self.lead_changes,
+            'times_tied': self.times_tied,
+            'largest_lead': self.largest_lead,
+            'clutch_time': self.clutch_plays / self.late_plays if self.late_plays > 0 else 0,
+            'dunks': self.dunks,
+            'period': self.period,
+            'elapsed': self.elapsed,
+            'progress': min(self.elapsed, REGULATION_SECONDS) / REGULATION_SECONDS,
+            'final': self.final,
+        }
+
+
+def provisional_watch_index(df, ranker=None):
+    """
+    Provisional WatchIndex of games in progress.
+
+    Counting metrics are projected to a full game from the elapsed share of
+    regulation (at least one quarter) and ranked against the ranker's games,
+    or against each other without one. Metrics not known live (efficiency,
+    threes, box-score totals, star power) rank as average (0.5).
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        One row of LiveGame.metrics() per game
+    ranker : PercentileRanker, optional
+        Ranker of finished games (e.g. a season's ranks npz), only read
+
+    Returns:
+    -------
+    pd.DataFrame
+        DataFrame sorted by WatchIndex
+    """
+    if len(df) == 0:
+        return df
+
+    projected = df.copy()
+    progress = df['progress'].clip(lower=0.25)
+    for col in PROJECTED_COLUMNS:
+        projected[col] = df[col] / progress
+
+    if ranker is None:
+        ranker = new_ranker()
+        ranker.add(projected)
+    ranks = ranker.percentiles(projected)
+
+    df = df.copy()
+    for col in RANK_COLUMNS:
+        df[f'PR_{col}'] = ranks[f'PR_{col}'].fillna(0.5)
+    df = compute_components(df)
+
+    return df.sort_values('WatchIndex', ascending=False).reset_index(drop=True)
+
+
+class LiveSlate:
+    """
+    Live state of every game on a slate.
+
+    Parameters:
+    ----------
+    teams : dict, optional
+        Game id to (home team, away team) abbreviations
+    ranker : PercentileRanker, optional
+        Ranker of finished games live games are ranked against
+    """
+
+    def __init__(self, teams=None, ranker=None):
+        self.teams = {} if teams is None else teams
+        self.ranker = ranker
+        self.games = {}
+
+    def apply(self, game_id, event):
+        """
+        Feed one play-by-play event of a game, O(1).
+        """
+        game = self.games.get(game_id)
+        if game is None:
+            game = self.games[game_id] = LiveGame(game_id, *self.teams.get(game_id, (None, None)))
+        return game.apply(event)
+
+    def snapshot(self):
+        """
+        Provisional WatchIndex of every game seen so far.
+        """
+        df = pd.DataFrame([game.metrics() for game in self.games.values()])
+        return provisional_watch_index(df, self.ranker)
+
+
+def run_live(events, publish, interval=5.0, slate=None, clock=time.monotonic):
+    """
+    Consume a stream of play-by-play events and publish the slate periodically.
+
+    Parameters:
+    ----------
+    events : iterable
+        (game_id, event) pairs; (None, None) heartbeats let a quiet stream
+        still publish on time
+    publish : callable
+        Called with the snapshot DataFrame every interval seconds and once
+        at the end of the stream
+    interval : float
+        Seconds between two snapshots
+    slate : LiveSlate, optional
+        State to update, a new one by default
+    clock : callable
+        Monotonic clock in seconds
+
+    Returns:
+    -------
+    LiveSlate
+        The final state
+    """
+    slate = LiveSlate() if slate is None else slate
+    last_publish = clock()
+    for game_id, event in events:
+        if game_id is not None:
+            slate.apply(game_id, event)
+        now = clock()
+        if now - last_publish >= interval:
+            publish(slate.snapshot())
+            last_publish = now
+    publish(slate.snapshot())
+    return slate
+
+
+def poll_play_by_play(game_ids, interval=10.0, endpoint=None, rate_limiter=None, retry=None, sleep=time.sleep):
+    """
+    Poll the play-by-play of live games and yield their new events.
+
+    Each round requests every unfinished game once and yields the events
+    whose EVENTNUM was not seen yet, followed by a (None, None) heartbeat. A game
+    is dropped once a period ends at the end of regulation or later with the
+    score not tied.
+
+    Parameters:
+    ----------
+    game_ids : list
+        Games to follow
+    interval : float
+        Seconds between two polling rounds
+    endpoint : callable, optional
+        callable(game_id) returning the PlayByPlayV2 frames, defaults to nba_api
+    rate_limiter : RateLimiter, optional
+        Limiter for the requests, 1 request per second by default
+    retry : BackoffPolicy, optional
+        Backoff policy for failed requests
+    sleep : callable
+        Called with the seconds to wait between rounds
+
+    Yields:
+    ------
+    tuple
+        (game_id, event dict), or (None, None) after each round
+    """
+    endpoints = {'PlayByPlayV2': GAME_ENDPOINTS['PlayByPlayV2'] if endpoint is None else endpoint}
+    rate_limiter = RateLimiter(rate=1.0, burst=4) if rate_limiter is None else rate_limiter
+
+    games = {game_id: LiveGame(game_id) for game_id in game_ids}
+    while games:
+        for game_id, game in list(games.items()):
+            try:
+                pbp = fetch_game(game_id, endpoints=endpoints, rate_limiter=rate_limiter, retry=retry)['PlayByPlayV2'][0]
+            except Exception as e:
+                print(f"Error polling game {game_id}: {e}")
+                continue
+
+            for event in pbp.to_dict('records'):
+                if game.apply(event):
+                    yield game_id, event
+            if game.final:
+                del games[game_id]
+
+        yield None, None
+        if games:
+            sleep(interval)
+
+
+def replay_events(game_ids, cache, speed=60.0, sleep=time.sleep, clock=time.monotonic):
+    """
+    Replay cached play-by-play as a live stream, all games tipping off together.
+
+    Parameters:
+    ----------
+    game_ids : list
+        Games whose PlayByPlayV2 responses are in the cache
+    cache : ResponseCache
+        Raw response cache to read from
+    speed : float, optional
+        Game seconds replayed per wall-clock second, None replays as fast as
+        possible (for benchmarks)
+    sleep : callable
+        Called with the seconds to wait before an event
+    clock : callable
+        Monotonic clock in seconds
+
+    Yields:
+    ------
+    tuple
+        (game_id, event dict) in game-time order across games
+    """
+    frames = []
+    for game_id in game_ids:
+        try:
+            cached = cache.get('PlayByPlayV2', {'game_id': game_id})
+        except CacheMiss:
+            cached = None
+        if cached is None:
+            print(f"No cached play-by-play for game {game_id}")
+            continue
+        frames.append(cached[0].assign(GAME_ID=game_id))
+    if len(frames) == 0:
+        return
+
+    pbp = pd.concat(frames, ignore_index=True)
+    clock_column = pbp['PCTIMESTRING'] if 'PCTIMESTRING' in pbp.columns else pd.Series(None, index=pbp.index)
+    elapsed = pd.Series([elapsed_seconds(period, time_left)
+                         for period, time_left in zip(pbp['PERIOD'], clock_column)], index=pbp.index)
+    # Keep every game's events in their original order
+    pbp['ELAPSED'] = elapsed.groupby(pbp['GAME_ID'], sort=False).cummax()
+    pbp = pbp.sort_values('ELAPSED', kind='stable')
+
+    start = clock()
+    for event in pbp.to_dict('records'):
+        if speed:
+            wait = event['ELAPSED'] / speed - (clock() - start)
+            if wait > 0:
+                sleep(wait)
+        yield event['GAME_ID'], event
+
+
+def print_snapshot(df, top=10):
+    """
+    Print the best live games of a snapshot.
+    """
+    if len(df) == 0:
+        return
+    columns = ['game_id', 'home_team', 'away_team', 'home_score', 'away_score', 'period', 'lead_changes', 'WatchIndex']
+    print(f"\n{time.strftime('%H:%M:%S')} live watch index:")
+    print(df[columns].head(top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live NBA watch index of today's games, or a replay of cached games")
+    parser.add_argument('--replay', nargs='*', default=None, help="Cached game ids to replay instead of going live")
+    parser.add_argument('--speed', type=float, default=60.0, help="Replay speed in game seconds per second")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between two snapshots")
+    parser.add_argument('--ranks', default=None, help="Season ranks npz to rank live games against")
+    parser.add_argument('--cache-dir', default="checkpoints/raw_cache")
+    args = parser.parse_args()
+
+    ranker = load_ranker(args.ranks) if args.ranks else None
+    if args.replay is not None:
+        cache = ResponseCache(args.cache_dir, offline=True)
+        events = replay_events(args.replay, cache, speed=args.speed)
+        teams = {}
+    else:
+        slate = get_watchability_preview()
+        teams = dict(zip(slate['game_id'], zip(slate['home_team'], slate['away_team'])))
+        events = poll_play_by_play(list(slate['game_id']))
+
+    run_live(events, print_snapshot, interval=args.interval, slate=LiveSlate(teams, ranker))
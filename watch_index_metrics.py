@@ -0,0 +1,275 @@
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+
+
+# Prefix of every exported metric name
+PREFIX = "watch_index"
+
+# Returned by span while instrumentation is off, entering it costs nothing
+_NO_SPAN = contextlib.nullcontext()
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels_text(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, error=exc_type is not None, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    Timing spans and counters of a run, off unless enabled.
+
+    Spans time a block (one endpoint request, a rate limiter wait, a compute
+    stage) and keep the count, total and max seconds per name and labels.
+    Counters add up retries, errors, cache hits and games. While disabled,
+    span returns a shared no-op context and count/event return at once, so
+    instrumented code costs a function call per site.
+
+    When enabled with a log path, every span and event is also appended to it
+    as a JSON line (with the process id, so worker processes can share the
+    file). write_textfile exports the totals in the Prometheus text format
+    for node_exporter's textfile collector.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.log_path = None
+        self._log = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Drop every recorded span and counter.
+        """
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+
+    def enable(self, log_path=None):
+        """
+        Start recording, appending JSON logs to log_path when given.
+        """
+        self.disable()
+        if log_path is not None:
+            if os.path.dirname(log_path):
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            self._log = open(log_path, 'a', buffering=1)
+        self.log_path = log_path
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording and close the log (recorded totals are kept).
+        """
+        self.enabled = False
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = None
+        self.log_path = None
+
+    def _write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if self._log is not None:
+                self._log.write(line + '\n')
+
+    def span(self, name, **labels):
+        """
+        Context manager timing its block under name and labels.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, labels)
+
+    def observe(self, name, seconds, error=False, **labels):
+        """
+        Record one timing of name (what a span does when its block ends).
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                self.spans[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+        if error:
+            self.count(f"{name}_errors", **labels)
+        if self._log is not None:
+            self._write({'time': time.time(), 'pid': os.getpid(), 'span': name, 'seconds': round(seconds, 6),
+                         'error': error, **labels})
+
+    def count(self, name, value=1, **labels):
+        """
+        Add value to the counter name with labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def event(self, name, **fields):
+        """
+        Append a structured event (e.g. a failed game) to the JSON log.
+        """
+        if not self.enabled or self._log is None:
+            return
+        self._write({'time': time.time(), 'pid': os.getpid(), 'event': name, **fields})
+
+    def snapshot(self):
+        """
+        Picklable copy of the recorded totals, for merge in another process.
+        """
+        with self._lock:
+            return {'spans': {key: list(stats) for key, stats in self.spans.items()},
+                    'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        """
+        Add the totals of a snapshot (e.g. from a worker process).
+        """
+        with self._lock:
+            for key, (n, total, longest) in snapshot['spans'].items():
+                stats = self.spans.setdefault(key, [0, 0.0, 0.0])
+                stats[0] += n
+                stats[1] += total
+                stats[2] = max(stats[2], longest)
+            for key, value in snapshot['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def textfile(self):
+        """
+        Recorded totals in the Prometheus text exposition format.
+
+        Spans become <prefix>_<name>_seconds summaries (sum and count) with a
+        <prefix>_<name>_seconds_max gauge, counters <prefix>_<name>_total.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name in sorted({name for name, _ in snapshot['spans']}):
+            metric = f"{PREFIX}_{name}_seconds"
+            series = [(key, stats) for (span_name, key), stats in sorted(snapshot['spans'].items()) if span_name == name]
+            lines.append(f"# TYPE {metric} summary")
+            for key, (n, total, _) in series:
+                lines.append(f"{metric}_sum{_labels_text(key)} {total:.6f}")
+                lines.append(f"{metric}_count{_labels_text(key)} {n}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for key, (_, _, longest) in series:
+                lines.append(f"{metric}_max{_labels_text(key)} {longest:.6f}")
+        for name in sorted({name for name, _ in snapshot['counters']}):
+            metric = f"{PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, key), value in sorted(snapshot['counters'].items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{_labels_text(key)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """
+        Atomically write the Prometheus textfile (node_exporter never reads a
+        partial file).
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.textfile())
+        os.replace(tmp_path, path)
+
+    def report(self):
+        """
+        Print where the time went, longest total first, then the counters.
+        """
+        snapshot = self.snapshot()
+        print(f"{'span':<48} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}")
+        for (name, key), (n, total, longest) in sorted(snapshot['spans'].items(), key=lambda item: -item[1][1]):
+            label = name + _labels_text(key)
+            print(f"{label:<48} {n:>8} {total:>10.3f} {1000 * total / n:>10.2f} {1000 * longest:>10.2f}")
+        for (name, key), value in sorted(snapshot['counters'].items()):
+            print(f"{name + _labels_text(key):<48} {value:>8g}")
+
+
+# Process-wide instrumentation used by the fetch and scoring code
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
+event = METRICS.event
+
+
+@contextlib.contextmanager
+def instrumented(log_path=None, textfile=None, profile=None, report=True):
+    """
+    Instrument a run, doing nothing unless one of the outputs is given.
+
+    Parameters:
+    ----------
+    log_path : str, optional
+        JSON lines log of every span and event
+    textfile : str, optional
+        Prometheus textfile written at the end of the run (e.g. into
+        node_exporter's --collector.textfile.directory, named *.prom)
+    profile : str, optional
+        cProfile stats file of the run (read with pstats or snakeviz)
+    report : bool
+        Print the span and counter totals at the end
+
+    Yields:
+    ------
+    Metrics
+        The process-wide METRICS
+    """
+    if log_path is None and textfile is None and profile is None:
+        yield METRICS
+        return
+
+    METRICS.reset()
+    METRICS.enable(log_path)
+    profiler = cProfile.Profile() if profile is not None else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield METRICS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        METRICS.disable()
+        if textfile is not None:
+            METRICS.write_textfile(textfile)
+        if report:
+            METRICS.report()
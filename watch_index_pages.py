@@ -0,0 +1,227 @@
+import io
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Rows formatted and written per export chunk
+EXPORT_CHUNK_SIZE = 5000
+
+# Exports larger than this are spooled to a temporary file on disk
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def page_count(total, page_size):
+    """
+    Number of pages needed for total rows (at least 1, so an empty table
+    still has a page to show).
+    """
+    return max(1, -(-total // page_size))
+
+
+def format_table(df, percent_columns=(), date_columns=()):
+    """
+    Scale score columns to percentages rounded to 2 decimals and render
+    dates as 'YYYY-MM-DD', in place.
+
+    Meant for a page or an export chunk, never the whole filtered table.
+    """
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = df[col].dt.strftime('%Y-%m-%d')
+    for col in percent_columns:
+        if col in df.columns:
+            df[col] = round(df[col].astype(float) * 100, 2)
+    return df
+
+
+def _chunk(view, rows, columns, scores, score_column):
+    df = view.iloc[rows, view.columns.get_indexer(columns)]
+    if scores is not None:
+        df[score_column] = scores[rows]
+    return df
+
+
+def table_page(view, rows, columns, page=1, page_size=PAGE_SIZES[1], scores=None, score_column='WatchIndex',
+               percent_columns=(), date_columns=()):
+    """
+    One page of an already ranked table, formatted for display.
+
+    Only the page's rows are copied out of the view, so the cost of a page
+    does not depend on how many rows match the filters.
+
+    Parameters:
+    ----------
+    view : pd.DataFrame
+        Shared table the rows point into (not modified)
+    rows : np.ndarray
+        Row positions in display order (e.g. FilterIndex.rows or
+        WeightEngine.ranked)
+    columns : list
+        Columns to show
+    page : int
+        Page number, starting at 1 (clamped to the last page)
+    page_size : int
+        Rows per page
+    scores : np.ndarray, optional
+        Scores of every view row written to score_column (e.g. a custom
+        weighting's WatchIndex)
+    score_column : str
+        Column the scores are written to
+    percent_columns : list
+        Columns shown as percentages
+    date_columns : list
+        Datetime columns shown as 'YYYY-MM-DD'
+
+    Returns:
+    -------
+    pd.DataFrame
+        The page, with the original row positions as its index
+    """
+    page = min(max(1, int(page)), page_count(len(rows), page_size))
+    start = (page - 1) * page_size
+    page_rows = np.asarray(rows, dtype=np.intp)[start:start + page_size]
+    return format_table(_chunk(view, page_rows, columns, scores, score_column), percent_columns, date_columns)
+
+
+def table_chunks(view, rows, columns, chunk_size=EXPORT_CHUNK_SIZE, scores=None, score_column='WatchIndex',
+                 percent_columns=(), date_columns=()):
+    """
+    The whole ranked table as formatted chunks of chunk_size rows, in order.
+
+    Takes the same arguments as table_page.
+
+    Yields:
+    ------
+    pd.DataFrame
+        Consecutive chunks of the table, a single empty one when there are
+        no rows (so an export still gets its columns)
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    for start in range(0, max(len(rows), 1), chunk_size):
+        chunk = _chunk(view, rows[start:start + chunk_size], columns, scores, score_column)
+        yield format_table(chunk, percent_columns, date_columns).reset_index(drop=True)
+
+
+def query_page(query, page=1, page_size=PAGE_SIZES[1], percent_columns=(), date_columns=()):
+    """
+    One page of a ranked query, formatted for display.
+
+    Parameters:
+    ----------
+    query : callable
+        Takes n and offset and returns that slice of the ranked table (e.g.
+        watch_index_db.top_games with its filters bound)
+    page : int
+        Page number, starting at 1
+    page_size : int
+        Rows per page
+    percent_columns : list
+        Columns shown as percentages
+    date_columns : list
+        Datetime columns shown as 'YYYY-MM-DD'
+
+    Returns:
+    -------
+    pd.DataFrame
+        The page
+    """
+    offset = (max(1, int(page)) - 1) * page_size
+    return format_table(query(n=page_size, offset=offset), percent_columns, date_columns)
+
+
+def query_chunks(query, chunk_size=EXPORT_CHUNK_SIZE, percent_columns=(), date_columns=()):
+    """
+    The whole result of a ranked query as formatted chunks of chunk_size
+    rows, in order. Takes the same arguments as query_page.
+
+    Yields:
+    ------
+    pd.DataFrame
+        Consecutive chunks of the table, a single empty one when nothing
+        matches
+    """
+    offset = 0
+    while True:
+        chunk = query(n=chunk_size, offset=offset)
+        if len(chunk) == 0 and offset > 0:
+            return
+        yield format_table(chunk, percent_columns, date_columns).reset_index(drop=True)
+        if len(chunk) < chunk_size:
+            return
+        offset += chunk_size
+
+
+def write_table(chunks, out, file_format='csv'):
+    """
+    Write chunks to a binary file one at a time.
+
+    CSV chunks are appended after a single header. Parquet chunks each
+    become a row group of one file. Only one chunk is held at a time. The
+    header or schema comes from the first chunk, even an empty one.
+
+    Parameters:
+    ----------
+    chunks : iterable
+        DataFrames with the same columns (e.g. from table_chunks)
+    out : file
+        Binary file object to write to
+    file_format : str
+        'csv' or 'parquet'
+
+    Returns:
+    -------
+    int
+        Number of rows written
+    """
+    written = 0
+    header = True
+    writer = None
+    try:
+        for chunk in chunks:
+            if file_format == 'parquet':
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out, table.schema, compression='zstd')
+                writer.write_table(table)
+            elif file_format == 'csv':
+                out.write(chunk.to_csv(header=header, index=False).encode())
+                header = False
+            else:
+                raise ValueError(f"unknown export format '{file_format}', use csv or parquet")
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def export_file(chunks, file_format='csv', spool_size=SPOOL_SIZE):
+    """
+    Write chunks to a temporary file and return it rewound, ready to serve.
+
+    The file stays in memory up to spool_size bytes and moves to disk past
+    that, so a large export is never held whole in memory by this process.
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    # ParquetWriter closes the sink it is given, so it gets a wrapper that leaves the file open
+    sink = _Unclosed(out) if file_format == 'parquet' else out
+    write_table(chunks, sink, file_format)
+    out.seek(0)
+    return out
+
+
+class _Unclosed(io.RawIOBase):
+    # Forwards writes to a file but ignores close
+    def __init__(self, out):
+        self.out = out
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.out.write(data)
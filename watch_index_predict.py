@@ -0,0 +1,261 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from watch_index_data import load_shared
+from watch_index_generation import COMPONENT_COLUMNS
+from watch_index_store import STORE_DIR, read_watch_index
+
+
+MODEL_PATH = "checkpoints/watch_predictor.npz"
+
+# Game metrics averaged per team, all written by the generator
+FEATURE_COLUMNS = [
+    'total_score', 'pts_per_poss', 'threes_made', 'closeness', 'lead_changes',
+    'clutch_time', 'max_game_score', 'WatchIndex'
+]
+
+
+class WatchPredictor:
+    """
+    Pre-game watchability model over rolling per-team features.
+
+    Every team keeps an exponentially weighted mean of the metrics of the
+    games it played (a plain mean over its first span games) and of its
+    scoring margin, updated in O(1) per game. Metrics a game does not have
+    (e.g. a feature of an older table schema) leave the means as they are. A game is described by the mean
+    of its two teams' vectors and their absolute difference, and a least
+    squares fit maps that to the component scores and WatchIndex. Predicting a
+    slate is one lookup of the team rows and one matrix product.
+
+    Parameters:
+    ----------
+    feature_columns : list
+        Game metrics averaged per team
+    target_columns : list
+        Scores the model predicts
+    span : int
+        Span of the per-team exponentially weighted means, in games
+    min_games : int
+        Games both teams need before a game is used for training
+    """
+
+    def __init__(self, feature_columns, target_columns, span=20, min_games=5):
+        self.feature_columns = list(feature_columns)
+        self.target_columns = list(target_columns)
+        self.span = span
+        self.min_games = min_games
+        self.teams = {}
+        self.means = np.empty((0, len(self.feature_columns) + 1))
+        self.counts = np.empty(0)
+        self.weights = None
+        self.game_ids = set()
+
+    def _team_rows(self, teams):
+        rows = []
+        for team in teams:
+            row = self.teams.get(team)
+            if row is None:
+                row = self.teams[team] = len(self.teams)
+                self.means = np.vstack([self.means, np.zeros(self.means.shape[1])])
+                self.counts = np.append(self.counts, 0)
+            rows.append(row)
+        return np.array(rows, dtype=int)
+
+    def _game_features(self, home_means, away_means):
+        return np.hstack([
+            np.ones((len(home_means), 1)),
+            (home_means + away_means) / 2,
+            np.abs(home_means - away_means),
+        ])
+
+    def _walk(self, df, record=False):
+        # Games in date order, each team updated after the game is recorded
+        df = df[~df['game_id'].isin(self.game_ids)].sort_values(['game_date', 'game_id'], kind='stable')
+        values = df.reindex(columns=self.feature_columns).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        margins = pd.to_numeric(df['home_score'], errors='coerce') - pd.to_numeric(df['away_score'], errors='coerce')
+        home_rows = self._team_rows(df['home_team'])
+        away_rows = self._team_rows(df['away_team'])
+        targets = df.reindex(columns=self.target_columns).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float) if record else None
+
+        inputs = []
+        outputs = []
+        for i, (home, away, margin) in enumerate(zip(home_rows, away_rows, margins.to_numpy(dtype=float))):
+            if record and min(self.counts[home], self.counts[away]) >= self.min_games:
+                inputs.append(self._game_features(self.means[[home]], self.means[[away]])[0])
+                outputs.append(targets[i])
+
+            for row, side in ((home, 1), (away, -1)):
+                game = np.append(values[i], side * margin)
+                self.counts[row] += 1
+                alpha = max(1 / self.counts[row], 2 / (self.span + 1))
+                present = ~np.isnan(game)
+                self.means[row, present] += alpha * (game[present] - self.means[row, present])
+
+        self.game_ids.update(df['game_id'])
+        return np.array(inputs), np.array(outputs)
+
+    def fit(self, df):
+        """
+        Train on finished games, replacing any previous state.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Watch index rows with game_id, game_date, teams, scores, the
+            feature and the target columns
+
+        Returns:
+        -------
+        WatchPredictor
+            self
+        """
+        self.teams = {}
+        self.means = np.empty((0, len(self.feature_columns) + 1))
+        self.counts = np.empty(0)
+        self.game_ids = set()
+
+        inputs, outputs = self._walk(df, record=True)
+        keep = ~np.isnan(inputs).any(axis=1) & ~np.isnan(outputs).any(axis=1)
+        self.weights = np.linalg.lstsq(inputs[keep], outputs[keep], rcond=None)[0]
+        return self
+
+    def update(self, df):
+        """
+        Roll the team features forward with new games (the fit is kept).
+
+        Games already seen are skipped, so the same table can be passed again.
+        """
+        self._walk(df)
+        return self
+
+    def predict(self, home_teams, away_teams):
+        """
+        Predict the component scores and WatchIndex of upcoming games.
+
+        Parameters:
+        ----------
+        home_teams : list
+            Home team abbreviations
+        away_teams : list
+            Away team abbreviations, aligned with home_teams
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row of target_columns per game, teams the model has not seen
+            get the league average features
+        """
+        league = self.means.mean(axis=0) if len(self.means) > 0 else np.zeros(self.means.shape[1])
+        means = np.vstack([self.means, league])
+        unknown = len(self.means)
+        home = np.array([self.teams.get(team, unknown) for team in home_teams], dtype=int)
+        away = np.array([self.teams.get(team, unknown) for team in away_teams], dtype=int)
+
+        predicted = self._game_features(means[home], means[away]) @ self.weights
+        return pd.DataFrame(predicted, columns=self.target_columns)
+
+    def save(self, path):
+        """
+        Persist the model and the team state (written atomically).
+        """
+        teams = sorted(self.teams, key=self.teams.get)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            feature_columns=np.array(self.feature_columns),
+            target_columns=np.array(self.target_columns),
+            settings=np.array([self.span, self.min_games]),
+            teams=np.array(teams, dtype=str),
+            means=self.means,
+            counts=self.counts,
+            weights=self.weights,
+            game_ids=np.array(sorted(self.game_ids), dtype=str),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a model written by save.
+        """
+        with np.load(path) as data:
+            span, min_games = data['settings']
+            predictor = cls(data['feature_columns'].tolist(), data['target_columns'].tolist(),
+                            span=int(span), min_games=int(min_games))
+            predictor.teams = {team: i for i, team in enumerate(data['teams'].tolist())}
+            predictor.means = data['means']
+            predictor.counts = data['counts']
+            predictor.weights = data['weights']
+            predictor.game_ids = set(data['game_ids'].tolist())
+        return predictor
+
+
+def train_predictor(root=STORE_DIR, path=MODEL_PATH, span=20, min_games=5):
+    """
+    Train a predictor on every stored game and save it.
+
+    Features and targets are the FEATURE_COLUMNS and COMPONENT_COLUMNS the
+    stored tables have.
+
+    Parameters:
+    ----------
+    root : str
+        Watch index dataset directory
+    path : str
+        Model file to write
+    span : int
+        Span of the per-team means, in games
+    min_games : int
+        Games both teams need before a game is used for training
+
+    Returns:
+    -------
+    WatchPredictor
+        The trained model
+    """
+    df = read_watch_index(root)
+    features = [col for col in FEATURE_COLUMNS if col in df.columns]
+    targets = [col for col in COMPONENT_COLUMNS if col in df.columns]
+
+    predictor = WatchPredictor(features, targets, span=span, min_games=min_games).fit(df)
+    predictor.save(path)
+    print(f"Trained on {len(predictor.game_ids)} games, saved to {path}")
+    return predictor
+
+
+def update_predictor(df, path=MODEL_PATH):
+    """
+    Roll a saved predictor's team features forward with newly scored games.
+
+    Does nothing when no model has been trained yet.
+    """
+    if not os.path.exists(path):
+        return
+    WatchPredictor.load(path).update(df).save(path)
+
+
+def load_predictor(path=MODEL_PATH):
+    """
+    Shared predictor, loaded on first use and reloaded when the file changes.
+
+    Returns:
+    -------
+    WatchPredictor or None
+        None when no model has been trained
+    """
+    return load_shared(('predictor', path), [path],
+                       lambda: WatchPredictor.load(path) if os.path.exists(path) else None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the pre-game watchability model on the stored watch index")
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--span', type=int, default=20)
+    parser.add_argument('--min-games', type=int, default=5)
+    args = parser.parse_args()
+
+    train_predictor(args.store_dir, args.model_path, span=args.span, min_games=args.min_games)
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class PercentileRanker:
+    """
+    Incremental percentile ranks over every game seen so far.
+
+    Keeps one sorted array per metric, so ranking a game is a binary search
+    and adding N games costs O(N log M) searches plus the array inserts. The
+    percentiles match df[col].rank(pct=True) over all stored games (average
+    rank for ties, NaN values ignored).
+
+    The ranker also remembers the percentiles last published for each game,
+    so callers can find stored games whose percentile drifted after an update.
+
+    Parameters:
+    ----------
+    columns : list
+        Metric columns to rank
+    inverse : list
+        Columns where lower is better (ranked as 1 - percentile)
+    """
+
+    def __init__(self, columns, inverse=()):
+        self.columns = list(columns)
+        self.inverse = [col for col in inverse if col in self.columns]
+        self.game_ids = []
+        self._positions = {}
+        self._values = np.empty((0, len(self.columns)))
+        self._published = np.empty((0, len(self.columns)))
+        self._sorted = [np.empty(0) for _ in self.columns]
+
+    def __len__(self):
+        return len(self.game_ids)
+
+    def __contains__(self, game_id):
+        return game_id in self._positions
+
+    def _metric_matrix(self, df):
+        return np.column_stack([
+            pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float) if col in df.columns
+            else np.full(len(df), np.nan)
+            for col in self.columns
+        ]) if len(df) > 0 else np.empty((0, len(self.columns)))
+
+    def add(self, df):
+        """
+        Add or replace games.
+
+        Games already stored are replaced by their new values, so re-adding a
+        game never creates a duplicate.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Rows with game_id and the metric columns
+        """
+        df = df.drop_duplicates(subset=['game_id'], keep='last')
+        values = self._metric_matrix(df)
+
+        new_rows = []
+        for game_id, row in zip(df['game_id'], values):
+            position = self._positions.get(game_id)
+            if position is None:
+                new_rows.append(row)
+                self._positions[game_id] = len(self.game_ids)
+                self.game_ids.append(game_id)
+                continue
+
+            # Replace a stored game: drop its old values from the sorted arrays
+            for j, old in enumerate(self._values[position]):
+                if not np.isnan(old):
+                    i = np.searchsorted(self._sorted[j], old)
+                    self._sorted[j] = np.delete(self._sorted[j], i)
+            self._values[position] = row
+            for j, new in enumerate(row):
+                if not np.isnan(new):
+                    self._sorted[j] = np.insert(self._sorted[j], np.searchsorted(self._sorted[j], new), new)
+
+        if new_rows:
+            new_rows = np.vstack(new_rows)
+            self._values = np.vstack([self._values, new_rows])
+            self._published = np.vstack([self._published, np.full(new_rows.shape, np.nan)])
+            for j in range(len(self.columns)):
+                column = new_rows[:, j]
+                column = np.sort(column[~np.isnan(column)])
+                self._sorted[j] = np.insert(self._sorted[j], np.searchsorted(self._sorted[j], column), column)
+
+    def _rank(self, values):
+        ranks = np.full(values.shape, np.nan)
+        for j, col in enumerate(self.columns):
+            sorted_values = self._sorted[j]
+            n = len(sorted_values)
+            column = values[:, j]
+            present = ~np.isnan(column)
+            if n == 0 or not present.any():
+                continue
+
+            left = np.searchsorted(sorted_values, column[present], side='left')
+            right = np.searchsorted(sorted_values, column[present], side='right')
+            pct = (left + right + 1) / 2 / n
+            ranks[present, j] = 1 - pct if col in self.inverse else pct
+        return ranks
+
+    def percentiles(self, df):
+        """
+        Percentile ranks of the given rows against every stored game.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Rows with the metric columns
+
+        Returns:
+        -------
+        pd.DataFrame
+            PR_<col> columns aligned with df's index
+        """
+        ranks = self._rank(self._metric_matrix(df))
+        return pd.DataFrame(ranks, index=df.index, columns=[f'PR_{col}' for col in self.columns])
+
+    def stored_percentiles(self, game_ids, index=None):
+        """
+        Percentile ranks of stored games, from the values the ranker holds.
+
+        Parameters:
+        ----------
+        game_ids : list
+            Stored game ids
+        index : pd.Index, optional
+            Index of the returned frame, defaults to a range index
+
+        Returns:
+        -------
+        pd.DataFrame
+            PR_<col> columns, one row per game id
+        """
+        positions = [self._positions[game_id] for game_id in game_ids]
+        ranks = self._rank(self._values[positions])
+        return pd.DataFrame(ranks, index=index, columns=[f'PR_{col}' for col in self.columns])
+
+    def publish(self, game_ids):
+        """
+        Record the current percentiles of these games as the published ones.
+        """
+        positions = [self._positions[game_id] for game_id in game_ids]
+        self._published[positions] = self._rank(self._values[positions])
+
+    def changed(self, tolerance=0.01):
+        """
+        Stored games whose current percentiles moved from the published ones.
+
+        Parameters:
+        ----------
+        tolerance : float
+            Largest absolute percentile change that is ignored
+
+        Returns:
+        -------
+        list
+            Game ids with any PR column off by more than tolerance, or never
+            published
+        """
+        if len(self.game_ids) == 0:
+            return []
+
+        current = self._rank(self._values)
+        never_published = np.isnan(self._published).all(axis=1)
+        with np.errstate(invalid='ignore'):
+            drift = np.nan_to_num(np.abs(current - self._published), nan=0.0).max(axis=1)
+        moved = never_published | (drift > tolerance)
+        return [self.game_ids[i] for i in np.flatnonzero(moved)]
+
+    def save(self, path):
+        """
+        Persist the ranker to a .npz file.
+        """
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            columns=np.array(self.columns),
+            inverse=np.array(self.inverse, dtype=str),
+            game_ids=np.array(self.game_ids, dtype=str),
+            values=self._values,
+            published=self._published,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a ranker saved with save().
+        """
+        with np.load(path) as data:
+            ranker = cls(data['columns'].tolist(), data['inverse'].tolist())
+            ranker.game_ids = data['game_ids'].tolist()
+            ranker._positions = {game_id: i for i, game_id in enumerate(ranker.game_ids)}
+            ranker._values = data['values']
+            ranker._published = data['published']
+
+        ranker._sorted = [np.sort(column[~np.isnan(column)]) for column in ranker._values.T]
+        return ranker
@@ -0,0 +1,206 @@
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from watch_index_cache import CacheMiss
+from watch_index_fetch import RateLimiter
+
+
+# HTTP statuses stats.nba.com answers with when it is pushing back
+THROTTLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_throttle(error):
+    """
+    Whether an error means the upstream is overloaded or throttling us.
+
+    Timeouts, dropped connections and 429/5xx responses count; anything
+    else (a bad game id, a parsing error) does not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # A requests error can only exist once nba_api has loaded requests, so it
+    # is looked up instead of imported (keeps offline runs from loading it)
+    requests_exceptions = sys.modules.get('requests.exceptions')
+    if requests_exceptions is not None and isinstance(error, (requests_exceptions.Timeout,
+                                                              requests_exceptions.ConnectionError)):
+        return True
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status in THROTTLE_STATUS
+
+
+class BackoffPolicy:
+    """
+    Exponential backoff with full jitter for a single request.
+
+    Attempt n (0-based) waits a uniform random time in
+    [0, min(max_delay, base_delay * 2**n)] before the next try, so retries
+    of concurrent requests do not hit the server in lockstep.
+
+    Parameters:
+    ----------
+    max_attempts : int
+        Tries per request, including the first one
+    base_delay : float
+        Upper bound of the first wait in seconds
+    max_delay : float
+        Cap on the upper bound of any wait in seconds
+    rng : random.Random, optional
+        Source of the jitter (seed it for reproducible tests)
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, rng=None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = random.Random() if rng is None else rng
+
+    def retryable(self, error):
+        """
+        Whether a failed request is worth another try (cache misses in
+        offline mode never are).
+        """
+        return not isinstance(error, CacheMiss)
+
+    def delay(self, attempt):
+        """
+        Seconds to wait after the given failed attempt.
+        """
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket whose rate follows what the upstream tolerates (AIMD).
+
+    Until the first sign of congestion the rate doubles every second of
+    successful traffic (slow start). After that every fast successful request
+    raises the rate additively, by about `increase` requests per second for
+    every second of successful traffic. A throttled or failed request, or one
+    slower than target_latency, cuts the rate multiplicatively, at most once
+    per cooldown so a burst of in-flight failures counts as a single signal.
+
+    Parameters:
+    ----------
+    rate : float
+        Starting requests per second
+    burst : int
+        Maximum number of tokens the bucket can hold
+    min_rate : float
+        Floor of the rate
+    max_rate : float, optional
+        Ceiling of the rate, defaults to 4 times the starting rate
+    increase : float
+        Additive increase in requests per second, per second of successes
+    decrease : float
+        Multiplicative factor applied on congestion
+    target_latency : float
+        Request latency in seconds above which the upstream is considered
+        congested
+    cooldown : float
+        Minimum seconds between two decreases
+    """
+
+    def __init__(self, rate=4.0, burst=4, min_rate=0.25, max_rate=None, increase=0.5, decrease=0.5,
+                 target_latency=2.0, cooldown=1.0):
+        super().__init__(rate=rate, burst=burst)
+        self.min_rate = min(min_rate, self.rate)
+        self.max_rate = 4 * self.rate if max_rate is None else max(max_rate, self.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self._last_decrease = float('-inf')
+        self.slow_start = True
+        self.successes = 0
+        self.throttled = 0
+
+    def record(self, latency, error=None):
+        """
+        Feed the outcome of one request back into the rate.
+
+        Parameters:
+        ----------
+        latency : float
+            Seconds the request took
+        error : Exception, optional
+            The error the request failed with, None on success
+        """
+        with self._lock:
+            congested = latency > self.target_latency or (error is not None and is_throttle(error))
+            if congested:
+                self.throttled += 1
+                now = time.monotonic()
+                self.slow_start = False
+                if now - self._last_decrease >= self.cooldown:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+            elif error is None:
+                self.successes += 1
+                step = 1.0 if self.slow_start else self.increase / self.rate
+                self.rate = min(self.max_rate, self.rate + step)
+
+
+class DeadLetterQueue:
+    """
+    Persistent record of games that could not be fetched or scored.
+
+    Stored as JSON (game_id -> attempts, last error, last failure time) and
+    rewritten atomically on every save, so failed games survive a crash and
+    are requeued by the next run instead of being lost.
+
+    Parameters:
+    ----------
+    path : str, optional
+        JSON file (e.g., 'checkpoints/failed_games2024-25.json'), the queue
+        only lives in memory when None
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, game_id):
+        return game_id in self.entries
+
+    def ids(self):
+        """
+        Queued game ids, oldest failure first.
+        """
+        return sorted(self.entries, key=lambda game_id: self.entries[game_id]['failed_at'])
+
+    def add(self, game_id, error):
+        """
+        Record a failure of a game.
+        """
+        entry = self.entries.get(game_id, {'attempts': 0})
+        entry['attempts'] += 1
+        entry['error'] = f"{type(error).__name__}: {error}"
+        entry['failed_at'] = datetime.now().isoformat(timespec='seconds')
+        self.entries[game_id] = entry
+
+    def discard(self, game_id):
+        """
+        Drop a game that has been scored.
+        """
+        self.entries.pop(game_id, None)
+
+    def save(self):
+        """
+        Atomically write the queue (no-op for an in-memory queue).
+        """
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour search over the games' PR vectors.
+
+    Every game is a float32 vector of its PR columns (missing ranks count as
+    average, 0.5). Queries are exact Euclidean top-k, computed by blocked
+    brute force (|x|^2 - 2 x.q over block_size rows at a time, with the
+    squared norms precomputed) so memory stays bounded on any table size.
+    Games can be added without rebuilding: rows live in arrays whose
+    capacity doubles when full.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Games to index (positions refer to its rows)
+    columns : list
+        PR columns describing a game
+    block_size : int
+        Rows scored per block
+    """
+
+    def __init__(self, df, columns, block_size=4096):
+        self.columns = list(columns)
+        self.block_size = block_size
+        self.size = 0
+        self.vectors = np.empty((0, len(self.columns)), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.add(df)
+
+    def _vectors(self, df):
+        values = df[self.columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+        return np.where(np.isnan(values), np.float32(0.5), values)
+
+    def add(self, df):
+        """
+        Append games; their positions continue after the indexed ones.
+        """
+        vectors = self._vectors(df)
+        needed = self.size + len(vectors)
+        if needed > len(self.vectors):
+            capacity = max(needed, 2 * len(self.vectors))
+            grown = np.empty((capacity, len(self.columns)), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+            self.norms = np.resize(self.norms, capacity)
+        self.vectors[self.size:needed] = vectors
+        self.norms[self.size:needed] = np.einsum('ij,ij->i', vectors, vectors)
+        self.size = needed
+
+    def query(self, position, k=10, rows=None):
+        """
+        Games most similar to an indexed game.
+
+        Parameters:
+        ----------
+        position : int
+            Position of the game to start from (it is never returned)
+        k : int
+            Number of games to return
+        rows : np.ndarray, optional
+            Candidate positions (e.g. FilterIndex.rows), all games when None
+
+        Returns:
+        -------
+        tuple
+            (positions, similarities) of the k closest games, closest first;
+            similarity is 1 - distance / largest possible distance
+        """
+        query = self.vectors[position]
+        candidates = np.arange(self.size) if rows is None else np.asarray(rows, dtype=int)
+        candidates = candidates[candidates != position]
+
+        best_rows = np.empty(0, dtype=int)
+        best_distances = np.empty(0, dtype=np.float32)
+        for start in range(0, len(candidates), self.block_size):
+            block = candidates[start:start + self.block_size]
+            distances = self.norms[block] - 2 * (self.vectors[block] @ query)
+            if len(block) > k:
+                keep = np.argpartition(distances, k)[:k]
+                block, distances = block[keep], distances[keep]
+            best_rows = np.concatenate([best_rows, block])
+            best_distances = np.concatenate([best_distances, distances])
+            if len(best_rows) > k:
+                keep = np.argpartition(best_distances, k)[:k]
+                best_rows, best_distances = best_rows[keep], best_distances[keep]
+
+        order = np.argsort(best_distances, kind='stable')
+        best_rows, best_distances = best_rows[order], best_distances[order]
+        distances = np.sqrt(np.maximum(best_distances + query @ query, 0))
+        return best_rows, 1 - distances / np.sqrt(len(self.columns))
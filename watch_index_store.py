@@ -0,0 +1,276 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from watch_index_weights import COMPONENT_WEIGHTS
+
+
+# Season-partitioned Parquet dataset of the watch index tables
+STORE_DIR = "checkpoints/watch_index_store"
+
+# Text columns stored dictionary-encoded (each team/player is written once per file)
+DICTIONARY_COLUMNS = ['home_team', 'away_team', 'star_player']
+
+
+def column_type(name, series=None):
+    """
+    Arrow type of a watch index column.
+
+    game_id is an int32 (the NBA id without its leading zeros), game_date a
+    date, team and star columns dictionary-encoded strings and counts int32.
+    PR and component columns are float32. The other metrics stay float64,
+    they are what the percentiles are ranked from and a re-ranked stored
+    table must match a fresh run.
+
+    Parameters:
+    ----------
+    name : str
+        Column name
+    series : pd.Series, optional
+        Column values, used to keep unknown text columns as strings
+
+    Returns:
+    -------
+    pa.DataType
+        Arrow type the column is stored as
+    """
+    if name == 'game_id':
+        return pa.int32()
+    if name == 'game_date':
+        return pa.date32()
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int16(), pa.string())
+    if series is not None:
+        if pd.api.types.is_bool_dtype(series):
+            return pa.bool_()
+        if pd.api.types.is_integer_dtype(series):
+            return pa.int32()
+        if not pd.api.types.is_numeric_dtype(series):
+            return pa.string()
+    if name.startswith('PR_') or name in COMPONENT_WEIGHTS or name == 'WatchIndex':
+        return pa.float32()
+    return pa.float64()
+
+
+def to_arrow(df):
+    """
+    Convert a watch index frame to an Arrow table with the store's schema.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Watch index rows (the season column is dropped, it is the partition key)
+
+    Returns:
+    -------
+    pa.Table
+        Typed table ready to be written
+    """
+    df = df.drop(columns=['season'], errors='ignore')
+
+    arrays = []
+    fields = []
+    for name in df.columns:
+        values = df[name]
+        arrow_type = column_type(name, values)
+
+        if name == 'game_id':
+            values = pd.to_numeric(values.astype(str)).astype(np.int32)
+        elif name == 'game_date':
+            values = pd.to_datetime(values.astype(str).str[:10]).dt.date
+        elif pa.types.is_dictionary(arrow_type) or pa.types.is_string(arrow_type):
+            values = values.astype(object).where(values.notna(), None)
+        elif pa.types.is_boolean(arrow_type):
+            values = values.astype(bool)
+        elif pa.types.is_int32(arrow_type):
+            values = values.astype(np.int32)
+        else:
+            values = pd.to_numeric(values, errors='coerce').astype(arrow_type.to_pandas_dtype())
+
+        arrays.append(pa.array(values, type=arrow_type, from_pandas=True))
+        fields.append(pa.field(name, arrow_type))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def from_arrow(table):
+    """
+    Convert a store table back to pandas.
+
+    Game ids come back as 10 character strings and game dates as
+    'YYYY-MM-DD' strings, like the CSV tables they replace.
+
+    Parameters:
+    ----------
+    table : pa.Table
+        Table read from the store
+
+    Returns:
+    -------
+    pd.DataFrame
+        Watch index rows
+    """
+    df = table.to_pandas()
+    if 'game_id' in df.columns:
+        df['game_id'] = df['game_id'].astype(str).str.zfill(10)
+    if 'game_date' in df.columns:
+        df['game_date'] = pd.to_datetime(df['game_date']).dt.strftime('%Y-%m-%d')
+    if 'season' in df.columns:
+        df['season'] = df['season'].astype(str)
+    return df
+
+
+def _season_dir(root, season):
+    return os.path.join(root, f"season={season}")
+
+
+def write_season(df, season, root=STORE_DIR):
+    """
+    Atomically replace one season's partition of the store.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        The season's full watch index
+    season : str
+        Season in format 'YYYY-YY'
+    root : str
+        Dataset directory
+    """
+    season_dir = _season_dir(root, season)
+    os.makedirs(season_dir, exist_ok=True)
+
+    path = os.path.join(season_dir, "part-0.parquet")
+    tmp_path = os.path.join(season_dir, f".part-0.parquet.{os.getpid()}.tmp")
+    pq.write_table(to_arrow(df), tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def read_watch_index(root=STORE_DIR, seasons=None, teams=None, start_date=None, end_date=None, columns=None):
+    """
+    Read watch index rows from the store with predicates pushed down.
+
+    Season filters prune whole partitions. Team and date filters are pushed
+    into the Parquet scan, and files are memory-mapped instead of read.
+
+    Parameters:
+    ----------
+    root : str
+        Dataset directory
+    seasons : list, optional
+        Seasons to read, all seasons when None
+    teams : list, optional
+        Keep games where any of these teams played (home or away)
+    start_date : str, optional
+        First game date to keep, 'YYYY-MM-DD'
+    end_date : str, optional
+        Last game date to keep, 'YYYY-MM-DD'
+    columns : list, optional
+        Columns to read, all columns when None
+
+    Returns:
+    -------
+    pd.DataFrame
+        Matching rows, empty when the store does not exist
+    """
+    if not os.path.isdir(root) or not glob.glob(os.path.join(root, "season=*", "*.parquet")):
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(
+        root,
+        format='parquet',
+        partitioning='hive',
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=True,
+    )
+
+    condition = None
+    def both(expression):
+        return expression if condition is None else condition & expression
+
+    if seasons is not None:
+        condition = both(ds.field('season').isin([str(season) for season in seasons]))
+    if teams is not None:
+        teams = list(teams)
+        condition = both(ds.field('home_team').isin(teams) | ds.field('away_team').isin(teams))
+    if start_date is not None:
+        condition = both(ds.field('game_date') >= pa.scalar(pd.Timestamp(start_date).date(), pa.date32()))
+    if end_date is not None:
+        condition = both(ds.field('game_date') <= pa.scalar(pd.Timestamp(end_date).date(), pa.date32()))
+
+    return from_arrow(dataset.to_table(columns=columns, filter=condition))
+
+
+def stored_columns(root=STORE_DIR):
+    """
+    Column names of the store (the season partition key included), empty
+    when the store does not exist.
+    """
+    if not os.path.isdir(root) or not glob.glob(os.path.join(root, "season=*", "*.parquet")):
+        return []
+    return ds.dataset(root, format='parquet', partitioning='hive', exclude_invalid_files=True).schema.names
+
+
+def read_season(season, root=STORE_DIR):
+    """
+    Read one season's table, empty when the season is not stored.
+    """
+    if not os.path.exists(os.path.join(_season_dir(root, season), "part-0.parquet")):
+        return pd.DataFrame()
+    df = from_arrow(pq.read_table(_season_dir(root, season), memory_map=True))
+    df['season'] = season
+    return df
+
+
+def migrate_checkpoints(checkpoint_dir="checkpoints", root=STORE_DIR):
+    """
+    One-off migration of the CSV checkpoints into the store.
+
+    Season tables (watch_index<season>.csv) take precedence over rows of
+    watch_index_all_seasons.csv, and duplicate game ids are dropped.
+
+    The pickle checkpoints are not migrated. games_list<season>.pkl are
+    LeagueGameLog downloads, refetched (or read from the response cache)
+    when a season is generated. interim_results<season>.pkl are the unranked
+    records of the old pipeline: those of finished seasons are in the CSV
+    tables, and the partial 2021-22 run has none of the current metrics, so
+    it cannot be ranked into a season table.
+
+    Parameters:
+    ----------
+    checkpoint_dir : str
+        Directory holding the legacy checkpoint files
+    root : str
+        Watch index dataset directory to write
+
+    Returns:
+    -------
+    dict
+        Season to number of games migrated
+    """
+    frames = []
+    all_seasons_file = os.path.join(checkpoint_dir, "watch_index_all_seasons.csv")
+    if os.path.exists(all_seasons_file):
+        frames.append(pd.read_csv(all_seasons_file, dtype={'game_id': str}, float_precision='round_trip'))
+    for path in sorted(glob.glob(os.path.join(checkpoint_dir, "watch_index2*.csv"))):
+        frames.append(pd.read_csv(path, dtype={'game_id': str}, float_precision='round_trip'))
+
+    migrated = {}
+    if frames:
+        df = pd.concat(frames, ignore_index=True)
+        df['game_id'] = df['game_id'].astype(str).str.zfill(10)
+        if 'game_date' in df.columns:
+            df['game_date'] = pd.to_datetime(df['game_date']).dt.strftime('%Y-%m-%d')
+        df = df.drop_duplicates(subset=['game_id'], keep='last')
+        for season, season_df in df.groupby('season', sort=True):
+            season_df = season_df.sort_values('WatchIndex', ascending=False)
+            write_season(season_df, season, root)
+            migrated[season] = len(season_df)
+
+    return migrated
@@ -1,8 +1,12 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import pyreadr
 from datetime import datetime, timedelta
+from functools import partial
+from watch_index_data import nfl_watch_index, nba_watch_index, nfl_filter_index, nba_filter_index, nba_weight_engine
+from watch_index_data import nfl_similarity_index, nba_similarity_index, nba_game_store_matches
+from watch_index_weights import WEIGHT_PROFILES
+from watch_index_pages import PAGE_SIZES, page_count, table_page, table_chunks, query_page, query_chunks, export_file
+from watch_index_db import count_games, top_games
 
 st.set_page_config(layout="wide", 
     page_title="Sports Watch Index",
@@ -12,6 +16,50 @@ st.set_page_config(layout="wide",
     })
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def nba_preview(date):
+    # Today's scoreboard with predicted watchability, refetched every 10 minutes
+    from watch_index_generation import get_watchability_preview
+    return get_watchability_preview(datetime.strptime(date, "%Y-%m-%d").strftime("%m/%d/%Y"))
+
+
+def paged_table(key, total, page_table, export_chunks):
+    # Only the current page is copied and formatted, the full table is written in chunks when a download is clicked
+    size_col, page_col, count_col = st.columns([1, 1, 2])
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1, key=f'{key}_page_size')
+    pages = page_count(total, page_size)
+    # Keyed on the page count so a new filter result starts back on page 1
+    page = page_col.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f'{key}_page_{pages}')
+    start = (page - 1) * page_size
+    count_col.write(f"{total} games, showing {min(start + 1, total)}-{min(start + page_size, total)}")
+
+    st.dataframe(page_table(page, page_size), use_container_width=True)
+
+    csv_col, parquet_col = st.columns(2)
+    for col, file_format, mime in ((csv_col, 'csv', 'text/csv'), (parquet_col, 'parquet', 'application/octet-stream')):
+        col.download_button(
+            f"Download {file_format.upper()}",
+            data=lambda file_format=file_format: export_file(export_chunks(), file_format),
+            file_name=f"{key}_watch_index.{file_format}",
+            mime=mime,
+            on_click='ignore',
+            key=f'{key}_download_{file_format}',
+        )
+
+
+def paged_view(key, view, rows, columns, scores=None, percent_columns=(), date_columns=()):
+    # Pages of the shared in-memory table, rows already in display order
+    table = dict(view=view, rows=rows, columns=columns, scores=scores, percent_columns=percent_columns, date_columns=date_columns)
+    paged_table(key, len(rows), lambda page, page_size: table_page(page=page, page_size=page_size, **table), lambda: table_chunks(**table))
+
+
+def paged_query(key, filters, columns, percent_columns=()):
+    # Pages of the SQLite game store, each page is one indexed LIMIT/OFFSET query
+    query = partial(top_games, columns=columns, **filters)
+    paged_table(key, count_games(**filters), lambda page, page_size: query_page(query, page, page_size, percent_columns=percent_columns),
+                lambda: query_chunks(query, percent_columns=percent_columns))
+
+
 st.title("Sports Watch Index")
 
 tab1, tab2 = st.tabs(['NFL Watch Index', 'NBA Watch Index'])
@@ -20,13 +68,8 @@ with tab1:
     st.header("NFL Watch Index")
     st.write('This is my watch index for the NFL. It takes a selection of filters and then returns a table of the games since the 2012 season and their corresponding watch index. The score is created by a weighted average of a number of features about the game that create metrics about scoring, excitement, and closeness. It is weighted pretty strongly towards closer games with lots of lead changes and a game coming down to the wire.')
 
-    # Read in the watch_index table 
-    st.session_state.nfl_watch_index = pyreadr.read_r('WatchData.rds')[None].drop_duplicates()
-
-    
-    st.session_state.nfl_watch_index['playoff'] = 0
-    st.session_state.nfl_watch_index.loc[(st.session_state.nfl_watch_index.season < 2021) & (st.session_state.nfl_watch_index.week > 17), 'playoff'] = 1
-    st.session_state.nfl_watch_index.loc[(st.session_state.nfl_watch_index.season >= 2021) & (st.session_state.nfl_watch_index.week > 18), 'playoff'] = 1
+    # Read in the watch_index table (parsed once per process and shared read-only by every session)
+    st.session_state.nfl_watch_index = nfl_watch_index('WatchData.rds')
 
     # Select specific Filters
     st.session_state.nfl_season_filter = st.multiselect("Select a season",  st.session_state.nfl_watch_index.season.unique().tolist(), default=st.session_state.nfl_watch_index.season.unique().tolist())
@@ -47,46 +90,59 @@ with tab1:
         st.session_state.nfl_random_game = st.session_state.nfl_watch_index[st.session_state.nfl_watch_index.game_id == st.session_state.nfl_random_id][['season', 'playoff', 'week', 'home_team', 'away_team', 'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']]
         
         for col in ['PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']:
-            st.session_state.nfl_random_game[col] = round(st.session_state.nfl_random_game[col] *100, 2)
+            st.session_state.nfl_random_game[col] = round(st.session_state.nfl_random_game[col].astype(float) *100, 2)
         st.dataframe(st.session_state.nfl_random_game, use_container_width=True)
 
-    st.session_state.nfl_filtered_watch = st.session_state.nfl_watch_index
     st.subheader("Watch Index Table")
     st.write('Wacky and Penalties are metrics trying to categorize what to expect in the game. Wacky includes things like batted passes, interceptions, fumbles, etc. Penalties is based on penalty yardage.')
-    st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[
-        st.session_state.nfl_watch_index.season.isin(st.session_state.nfl_season_filter)
-    ]
+
+    # Each filter is a precomputed bitmap, the intersection comes back already sorted by WatchIndex
+    nfl_index = nfl_filter_index('WatchData.rds')
+    nfl_filters = [nfl_index.match('season', st.session_state.nfl_season_filter)]
 
     if st.session_state.nfl_team_filter != 'All':
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[(st.session_state.nfl_filtered_watch.home_team == st.session_state.nfl_team_filter) | (st.session_state.nfl_filtered_watch.away_team == st.session_state.nfl_team_filter)]
+        nfl_filters.append(nfl_index.match('team', [st.session_state.nfl_team_filter]))
 
     if st.session_state.nfl_playoff_filter == 'Only':
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[st.session_state.nfl_filtered_watch.playoff == 1]
+        nfl_filters.append(nfl_index.match('playoff', [1]))
 
     elif st.session_state.nfl_playoff_filter == 'No':
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[st.session_state.nfl_filtered_watch.playoff == 0]
+        nfl_filters.append(nfl_index.match('playoff', [0]))
 
     if st.session_state.nfl_QB_filter != 'All':
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[(st.session_state.nfl_filtered_watch['player.x'] == st.session_state.nfl_QB_filter) | (st.session_state.nfl_filtered_watch['player.y'] == st.session_state.nfl_QB_filter)]
+        nfl_filters.append(nfl_index.match('qb', [st.session_state.nfl_QB_filter]))
 
     if st.session_state.nfl_QB_filter2 != 'All':
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[(st.session_state.nfl_filtered_watch['player.x'] == st.session_state.nfl_QB_filter2) | (st.session_state.nfl_filtered_watch['player.y'] == st.session_state.nfl_QB_filter2)]
+        nfl_filters.append(nfl_index.match('qb', [st.session_state.nfl_QB_filter2]))
     
     if st.session_state.nfl_war_filter:
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[st.session_state.nfl_filtered_watch.PRWAR >= 0.625]
+        nfl_filters.append(nfl_index.at_least('PRWAR', 0.625))
 
     if st.session_state.nfl_epa_filter:
-        st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[st.session_state.nfl_filtered_watch.PREPA >= 0.75]
+        nfl_filters.append(nfl_index.at_least('PREPA', 0.75))
+
+    nfl_rows = nfl_index.rows(*nfl_filters)
 
 
-    # Select to only columns I want to show
-    st.session_state.nfl_filtered_watch = st.session_state.nfl_filtered_watch[['season', 'playoff', 'week', 'home_team', 'away_team', 'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']].sort_values('WatchIndex', ascending = False)
+    # Show one page of the filtered games at a time
+    paged_view('nfl', st.session_state.nfl_watch_index, nfl_rows, ['season', 'playoff', 'week', 'home_team', 'away_team', 'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex'],
+                percent_columns=['PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex'])
 
-    for col in ['PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']:
-        st.session_state.nfl_filtered_watch[col] = round(st.session_state.nfl_filtered_watch[col] *100, 2)
 
+    # Nearest games by PR vector, optionally among the filtered games only
+    st.subheader("Games Like This One")
+    nfl_similar = nfl_similarity_index('WatchData.rds')
+    nfl_like_options = {f"{st.session_state.nfl_watch_index.season.iat[row]} week {st.session_state.nfl_watch_index.week.iat[row]}: {st.session_state.nfl_watch_index.away_team.iat[row]} @ {st.session_state.nfl_watch_index.home_team.iat[row]}": row for row in nfl_rows[:500]}
+    if len(nfl_rows) > 0:
+        st.session_state.nfl_like_game = nfl_like_options[st.selectbox("Pick a game you liked", list(nfl_like_options))]
+        st.session_state.nfl_like_filtered = st.checkbox("Only suggest games matching the NFL filters above")
+        nfl_like_rows, nfl_similarity = nfl_similar.query(st.session_state.nfl_like_game, k=10, rows=nfl_rows if st.session_state.nfl_like_filtered else None)
 
-    st.dataframe(st.session_state.nfl_filtered_watch, use_container_width=True)
+        st.session_state.nfl_like_watch = st.session_state.nfl_watch_index[['season', 'playoff', 'week', 'home_team', 'away_team', 'PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex']].take(nfl_like_rows)
+        st.session_state.nfl_like_watch['Similarity'] = nfl_similarity
+        for col in ['PREPA', 'PRWAR', 'PRWacky', 'PRPenalties', 'WatchIndex', 'Similarity']:
+            st.session_state.nfl_like_watch[col] = round(st.session_state.nfl_like_watch[col].astype(float) *100, 2)
+        st.dataframe(st.session_state.nfl_like_watch, use_container_width=True)
 
 
 
@@ -94,8 +150,8 @@ with tab2:
     st.header("NBA Watch Index")
     st.write('This is a recreation of my watch index for the NFL. It takes a selection of filters and then returns a table of the games over the past 5 seasons and their corresponding watch index. The score is created by a weighted average of a number of features about the game that create metrics about scoring, excitement, and closeness. It is weighted pretty strongly towards closer games with lots of lead changes and a game coming down to the wire.')
 
-    # Read in the watch_index table 
-    st.session_state.watch_index = pd.read_csv('checkpoints/watch_index_all_seasons.csv').drop_duplicates(subset = ['game_id'])
+    # Read in the watch_index table (parsed once per process and shared read-only by every session)
+    st.session_state.watch_index = nba_watch_index()
 
     today = datetime.now()
     st.session_state.formatted_date = today.strftime("%Y-%m-%d")
@@ -112,6 +168,20 @@ with tab2:
     # Create a checkbox for the user to decide whether to filter recent games
     filter_recent = st.checkbox("Show only recent games (within the last 30 days)")
 
+    # Re-weight the components, every game is rescored with one matrix-vector product
+    nba_engine = nba_weight_engine()
+    st.session_state.weight_profile = st.selectbox("Select a weighting profile", list(WEIGHT_PROFILES) + ['Custom'])
+    # Seasons stored in an older schema lack PR columns, their stored components are re-weighted instead
+    if not nba_engine.complete:
+        st.caption(f"Profiles re-weight the stored {', '.join(nba_engine.components)} scores, the stored seasons predate the other components.")
+    if st.session_state.weight_profile == 'Custom':
+        st.session_state.custom_weights = {
+            name: st.slider(f"{name} weight", 0.0, 5.0, float(nba_engine.default_weights[name]), 0.5)
+            for name in nba_engine.components
+        }
+    else:
+        st.session_state.custom_weights = WEIGHT_PROFILES[st.session_state.weight_profile]
+
     # Generate random game
     st.subheader("Generate Random Game")
     if st.button("Generates a random NBA game from the entire sample"):
@@ -119,31 +189,81 @@ with tab2:
         shuffled = np.random.permutation(game_ids)
         st.session_state.random_id = shuffled[0]
         st.session_state.random_game = st.session_state.watch_index[st.session_state.watch_index.game_id == st.session_state.random_id][['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']]
+        st.session_state.random_game['game_date'] = st.session_state.random_game['game_date'].dt.strftime('%Y-%m-%d')
         for col in ['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']:
-            st.session_state.random_game[col] = round(st.session_state.random_game[col] *100, 2)
+            st.session_state.random_game[col] = round(st.session_state.random_game[col].astype(float) *100, 2)
         st.dataframe(st.session_state.random_game, use_container_width=True)
 
 
-    st.subheader("Watch Index Table")
+    st.subheader("Tonight's Games")
+    st.write("Predicted watch index for today's games, based on each team's recent games.")
+    try:
+        st.session_state.nba_preview = nba_preview(st.session_state.formatted_date)
+    except Exception:
+        st.session_state.nba_preview = None
+
+    if st.session_state.nba_preview is None or len(st.session_state.nba_preview) == 0:
+        st.write("No games found for today.")
+    else:
+        preview_cols = [col for col in ['home_team', 'away_team', 'game_time', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'] if col in st.session_state.nba_preview.columns]
+        st.session_state.nba_preview_table = st.session_state.nba_preview[preview_cols].copy()
+        for col in ['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']:
+            if col in st.session_state.nba_preview_table.columns:
+                st.session_state.nba_preview_table[col] = round(st.session_state.nba_preview_table[col].astype(float) *100, 2)
+        st.dataframe(st.session_state.nba_preview_table, use_container_width=True)
 
-    st.session_state.filtered_watch = st.session_state.watch_index
 
-    st.session_state.filtered_watch = st.session_state.filtered_watch[
-            st.session_state.filtered_watch.season.isin(st.session_state.season_filter)
-        ]
+    st.subheader("Watch Index Table")
+
+    # Each filter is a precomputed bitmap, the intersection comes back already sorted by WatchIndex
+    nba_index = nba_filter_index()
+    nba_filters = [nba_index.match('season', st.session_state.season_filter)]
     
     if st.session_state.team_filter != 'All':
-        st.session_state.filtered_watch = st.session_state.filtered_watch[(st.session_state.filtered_watch.home_team == st.session_state.team_filter) | (st.session_state.filtered_watch.away_team == st.session_state.team_filter)]
+        nba_filters.append(nba_index.match('team', [st.session_state.team_filter]))
 
     if filter_recent:
-        st.session_state.filtered_watch = st.session_state.filtered_watch[st.session_state.filtered_watch.game_date >= thirty_days_ago_str]
-
-
-    # Select to only columns I want to show
-    st.session_state.filtered_watch = st.session_state.filtered_watch[['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']].sort_values('WatchIndex', ascending = False)
-
-    for col in ['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']:
-        st.session_state.filtered_watch[col] = round(st.session_state.filtered_watch[col] *100, 2)
-
-    st.dataframe(st.session_state.filtered_watch, use_container_width=True)
+        nba_filters.append(nba_index.at_least('game_date', thirty_days_ago_str))
+
+    nba_rows = nba_index.rows(*nba_filters)
+
+
+    # The stored WatchIndex is the default profile, its pages are queried from the indexed SQLite game store.
+    # The Parquet store the rest of the tab reads is authoritative, the game store is only used while it agrees.
+    nba_db_matches = nba_game_store_matches()
+    if st.session_state.weight_profile == 'Default' and not nba_db_matches:
+        st.warning("The SQLite game store is out of date, showing the Parquet store (run watch_index_db.py to reload it).")
+        paged_view('nba', st.session_state.watch_index, nba_rows, ['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'],
+                   percent_columns=['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'], date_columns=['game_date'])
+
+    elif st.session_state.weight_profile == 'Default':
+        paged_query('nba', {
+            'seasons': st.session_state.season_filter,
+            'teams': None if st.session_state.team_filter == 'All' else [st.session_state.team_filter],
+            'start_date': thirty_days_ago_str if filter_recent else None,
+        }, ['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'],
+            percent_columns=['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'])
+
+    # Other profiles re-rank the filtered games
+    else:
+        nba_rows, nba_scores = nba_engine.ranked(st.session_state.custom_weights, nba_rows)
+        paged_view('nba', st.session_state.watch_index, nba_rows, ['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'],
+                   scores=nba_scores, percent_columns=['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex'], date_columns=['game_date'])
+
+
+    # Nearest games by PR vector, optionally among the filtered games only
+    st.subheader("Games Like This One")
+    nba_similar = nba_similarity_index()
+    nba_like_options = {f"{st.session_state.watch_index.game_date.iat[row]:%Y-%m-%d}: {st.session_state.watch_index.away_team.iat[row]} @ {st.session_state.watch_index.home_team.iat[row]}": row for row in nba_rows[:500]}
+    if len(nba_rows) > 0:
+        st.session_state.nba_like_game = nba_like_options[st.selectbox("Pick a game you liked", list(nba_like_options), key='nba_like_select')]
+        st.session_state.nba_like_filtered = st.checkbox("Only suggest games matching the NBA filters above")
+        nba_like_rows, nba_similarity = nba_similar.query(st.session_state.nba_like_game, k=10, rows=nba_rows if st.session_state.nba_like_filtered else None)
+
+        st.session_state.nba_like_watch = st.session_state.watch_index[['season', 'game_date', 'home_team', 'away_team', 'Scoring', 'Competitiveness', 'Highlights', 'WatchIndex']].take(nba_like_rows)
+        st.session_state.nba_like_watch['game_date'] = st.session_state.nba_like_watch['game_date'].dt.strftime('%Y-%m-%d')
+        st.session_state.nba_like_watch['Similarity'] = nba_similarity
+        for col in ['Scoring', 'Competitiveness', 'Highlights', 'WatchIndex', 'Similarity']:
+            st.session_state.nba_like_watch[col] = round(st.session_state.nba_like_watch[col].astype(float) *100, 2)
+        st.dataframe(st.session_state.nba_like_watch, use_container_width=True)
 
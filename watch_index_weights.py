@@ -0,0 +1,145 @@
+import numpy as np
+
+
+# PR columns averaged into each component, with their weights
+COMPONENT_WEIGHTS = {
+    'Scoring': {'PR_total_score': 1, 'PR_pts_per_poss': 1, 'PR_threes_made': 1, 'PR_avg_ts': 1},
+    'Competitiveness': {'PR_lead_changes': 2, 'PR_closeness': 2, 'PR_clutch_time': 2, 'PR_overtime': 1},
+    'Highlights': {'PR_dunks': 1, 'PR_blocks': 1, 'PR_steals': 1},
+    'Pace': {'PR_pts_per_poss': 1, 'PR_turnovers': 1, 'PR_free_throws_attempted': 0.5},
+    'StarPower': {'PR_max_game_score': 1},
+}
+
+# Components averaged into the WatchIndex, with their weights
+WATCH_INDEX_WEIGHTS = {'Scoring': 2, 'Competitiveness': 3, 'Highlights': 1.5, 'Pace': 1, 'StarPower': 0.5}
+
+# Named weightings offered in the dashboard
+WEIGHT_PROFILES = {
+    'Default': WATCH_INDEX_WEIGHTS,
+    'Close games only': {'Competitiveness': 1},
+    'Highlight reel': {'Scoring': 1, 'Highlights': 3, 'StarPower': 1},
+    'Shootout': {'Scoring': 3, 'Pace': 1, 'Competitiveness': 1},
+}
+
+
+class WeightEngine:
+    """
+    Recompute every game's WatchIndex under custom component weights.
+
+    The PR columns are held once as a C-contiguous float32 matrix (games x
+    columns). Component and index weights are linear, so any weighting
+    folds into one vector over the PR columns and rescoring all games is a
+    single matrix-vector product.
+
+    Components are only rebuilt from every one of their PR columns, as the
+    generator builds them, so WATCH_INDEX_WEIGHTS reproduce the stored
+    WatchIndex. Components missing a column are listed in missing, and
+    complete is False when any component is missing or any game lacks one
+    of the PR columns (e.g. seasons stored in an older schema). The engine
+    then re-weights the stored component columns that every game has
+    instead, with the same product, and default_weights are the weights
+    the stored WatchIndex was built from them with.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Watch index rows with PR_* columns (positions follow its rows)
+    component_weights : dict
+        Component name to {PR column: weight}
+    """
+
+    def __init__(self, df, component_weights=COMPONENT_WEIGHTS):
+        self.components = {}
+        self.missing = {}
+        for name, columns in component_weights.items():
+            absent = [col for col in columns if col not in df.columns]
+            if absent:
+                self.missing[name] = absent
+            else:
+                self.components[name] = dict(columns)
+        self.complete = not self.missing and not bool(df[list(self._columns())].isna().any().any())
+
+        if not self.complete:
+            # Older schemas: each stored component is its own column
+            self.components = {name: {name: 1} for name in component_weights
+                               if name in df.columns and df[name].notna().all()}
+
+        self.columns = self._columns()
+        self._positions = {col: j for j, col in enumerate(self.columns)}
+        self.matrix = np.ascontiguousarray(df[self.columns].to_numpy(dtype=np.float32))
+        self.default_weights = WATCH_INDEX_WEIGHTS if self.complete else self._stored_weights(df)
+
+    def _columns(self):
+        return list(dict.fromkeys(col for columns in self.components.values() for col in columns))
+
+    def _stored_weights(self, df):
+        # Least squares weights of the stored WatchIndex over the stored components, in
+        # halves summing to 2 per component like the dashboard sliders (only ratios matter)
+        fallback = {name: WATCH_INDEX_WEIGHTS.get(name, 0) for name in self.components}
+        if 'WatchIndex' not in df.columns or len(self.columns) == 0 or df['WatchIndex'].isna().any():
+            return fallback
+        fit = np.linalg.lstsq(self.matrix.astype(float), df['WatchIndex'].to_numpy(dtype=float), rcond=None)[0]
+        if (fit < 0).any() or fit.sum() <= 0:
+            return fallback
+        fit = np.round(fit / fit.sum() * 2 * len(fit) * 2) / 2
+        return dict(zip(self.columns, fit.tolist()))
+
+    def vector(self, weights=None):
+        """
+        Weight of every column under the given component weights.
+
+        Parameters:
+        ----------
+        weights : dict, optional
+            Component name to weight, defaults to default_weights
+            (components not given weigh 0)
+
+        Returns:
+        -------
+        np.ndarray
+            float32 vector aligned with self.columns, summing to 1 unless
+            every weight is 0
+        """
+        weights = self.default_weights if weights is None else weights
+        total = sum(weights.get(name, 0) for name in self.components)
+
+        vector = np.zeros(len(self.columns))
+        if total <= 0:
+            return vector.astype(np.float32)
+        for name, columns in self.components.items():
+            share = weights.get(name, 0) / total / sum(columns.values())
+            for col, weight in columns.items():
+                vector[self._positions[col]] += share * weight
+        return vector.astype(np.float32)
+
+    def scores(self, weights=None):
+        """
+        WatchIndex of every game under the given component weights.
+
+        Returns:
+        -------
+        np.ndarray
+            float32 scores in the row order of the indexed table
+        """
+        return self.matrix @ self.vector(weights)
+
+    def ranked(self, weights=None, rows=None):
+        """
+        Row positions ordered by the weighted WatchIndex, highest first.
+
+        Parameters:
+        ----------
+        weights : dict, optional
+            Component name to weight
+        rows : np.ndarray, optional
+            Only rank these positions (e.g. from FilterIndex.rows)
+
+        Returns:
+        -------
+        tuple
+            (ordered positions, all scores)
+        """
+        scores = self.scores(weights)
+        rows = np.arange(len(scores)) if rows is None else np.asarray(rows)
+        # Stable descending sort with NaN last
+        return rows[np.argsort(-scores[rows], kind='stable')], scores